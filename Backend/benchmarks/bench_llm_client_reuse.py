@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Benchmark: per-call overhead of GeminiProvider against a local stub of the Gemini REST API
+
+Compares the previous pattern, where every report request re-ran
+genai.configure and every call built a new GenerativeModel and chat session,
+with the pooled client now used by GeminiProvider. Both sides construct a
+provider per request, as ReportAgent did. The stub server answers every
+generateContent call with a fixed response and counts the TCP connections
+it accepts, so no API key or network access is needed.
+
+Run with: python benchmarks/bench_llm_client_reuse.py [--calls 200]
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import google.generativeai as genai
+
+from llm.GeminiProvider import GeminiProvider
+from llm.GeminiClientPool import gemini_client_pool
+
+RESPONSE = json.dumps({
+    "candidates": [{
+        "content": {"role": "model", "parts": [{"text": "stub summary"}]},
+        "finishReason": "STOP",
+        "index": 0,
+    }]
+}).encode("utf-8")
+
+
+class StubGeminiHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    connections = 0
+
+    def setup(self):
+        StubGeminiHandler.connections += 1
+        super().setup()
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(RESPONSE)))
+        self.end_headers()
+        self.wfile.write(RESPONSE)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def per_request_client(endpoint: str, prompt: str) -> str:
+    """The previous GeminiProvider/ReportAgent behaviour"""
+    genai.configure(api_key="bench", transport="rest", client_options={"api_endpoint": endpoint})
+    model = genai.GenerativeModel("gemini-pro")
+    chat = model.start_chat(history=[])
+    response = chat.send_message(
+        prompt,
+        generation_config=genai.types.GenerationConfig(max_output_tokens=1500, temperature=0.7)
+    )
+    return response.text
+
+
+def pooled_client(endpoint: str, prompt: str) -> str:
+    provider = GeminiProvider(api_key="bench", transport="rest", api_endpoint=endpoint)
+    provider.set_generation_model("gemini-pro")
+    return provider.generate_text(prompt, max_output_tokens=1500, temperature=0.7)
+
+
+def measure(name: str, call, endpoint: str, calls: int):
+    # Warm up imports and lazy initialisation outside the timed loop
+    call(endpoint, "warm up")
+    StubGeminiHandler.connections = 0
+
+    timings = []
+    for i in range(calls):
+        start = time.perf_counter()
+        assert call(endpoint, f"report {i}") == "stub summary"
+        timings.append((time.perf_counter() - start) * 1000)
+
+    timings.sort()
+    print(f"  {name:12s} mean={sum(timings) / calls:7.2f} ms  p50={timings[calls // 2]:7.2f} ms  "
+          f"p95={timings[int(calls * 0.95)]:7.2f} ms  new_connections={StubGeminiHandler.connections}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=200, help="timed generate calls per pattern")
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubGeminiHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    endpoint = f"http://127.0.0.1:{server.server_port}"
+
+    try:
+        print(f"\n{args.calls} calls against {endpoint}")
+        measure("per-request", per_request_client, endpoint, args.calls)
+        gemini_client_pool.reset()
+        measure("pooled", pooled_client, endpoint, args.calls)
+        print(f"  pool: {gemini_client_pool.stats()}")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
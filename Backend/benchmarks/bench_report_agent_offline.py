@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Benchmark: end-to-end ReportAgent weekly reports with the offline LocalStubProvider
+
+Generates many reports concurrently against a seeded SQLite file. The LLM is
+replaced by LocalStubProvider, with a configurable latency distribution and
+failure rate, so the run needs no network or API key. For each report the
+time spent waiting on the LLM (including the wait for a concurrency slot) is
+measured separately, which leaves our own overhead: data loading, statistics,
+prompt building and saving.
+
+Run with: python benchmarks/bench_report_agent_offline.py [--users 20] [--reports 100] [--latency-ms 800]
+"""
+import argparse
+import asyncio
+import contextvars
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+# ReportAgent reads the settings; the database here is a local SQLite file
+for name in ("DATABASE_HOSTNAME", "DATABASE_PORT", "DATABASE_PASSWORD", "DATABASE_NAME", "DATABASE_USERNAME"):
+    os.environ.setdefault(name, "bench")
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+
+from agents.mcp_client import MCPClient
+from agents.report_agent import ReportAgent
+from llm.CachedProvider import CachedProvider
+from llm.LLMConcurrency import configure_llm_limiter
+from llm.LocalStubProvider import LocalStubProvider, LATENCY_DISTRIBUTIONS
+from models.db_schemes.schemes.base import Base
+from models.db_schemes.schemes.user import User
+from models.db_schemes.schemes.task import Task
+from models.db_schemes.schemes.task_status_history import Task_Status_History
+from models.enums.task_status import TaskStatus
+
+
+# Seconds the current report spent waiting on the LLM
+llm_seconds = contextvars.ContextVar("llm_seconds")
+
+
+class TimedProvider(CachedProvider):
+    """Records how long each report waited on the LLM, including the wait for a slot"""
+
+    async def agenerate_text(self, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return await super().agenerate_text(*args, **kwargs)
+        finally:
+            llm_seconds.get().append(time.perf_counter() - start)
+
+
+def seed(url: str, users: int, tasks_per_user: int):
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    user_ids = []
+    with sessionmaker(bind=engine)() as db:
+        now = datetime.utcnow()
+        for u in range(users):
+            user = User(name=f"Bench User {u}", email=f"bench{u}@example.com")
+            db.add(user)
+            db.flush()
+            user_ids.append(user.id)
+            for i in range(tasks_per_user):
+                task = Task(title=f"Task {i}", user_id=user.id, status=TaskStatus.COMPLETED,
+                            created_at=now - timedelta(hours=i % 150))
+                db.add(task)
+                db.flush()
+                db.add(Task_Status_History(task_id=task.id, status=TaskStatus.COMPLETED,
+                                           updated_at=task.created_at + timedelta(hours=1),
+                                           note=f"Finished task {i} after review " * 3))
+        db.commit()
+    engine.dispose()
+    return user_ids
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(int(len(values) * fraction), len(values) - 1)]
+
+
+async def run(session_factory, user_ids, provider, reports: int):
+    timed = TimedProvider(provider, None)
+    results = []
+
+    async def one(i):
+        # Each gathered task runs in its own copy of the context
+        waits = []
+        llm_seconds.set(waits)
+        start = time.perf_counter()
+        async with session_factory() as db:
+            agent = ReportAgent(MCPClient(db, session_factory=session_factory), use_llm_cache=False)
+            agent.llm_provider = timed
+            await agent.generate_weekly_report(user_ids[i % len(user_ids)])
+        results.append((time.perf_counter() - start, sum(waits)))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(reports)))
+    return time.perf_counter() - start, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=20, help="seeded users")
+    parser.add_argument("--tasks", type=int, default=200, help="tasks per user")
+    parser.add_argument("--reports", type=int, default=100, help="weekly reports generated concurrently")
+    parser.add_argument("--concurrency", type=int, default=8, help="LLM concurrency cap")
+    parser.add_argument("--latency-ms", type=float, default=800, help="mean stub LLM latency")
+    parser.add_argument("--jitter-ms", type=float, default=200, help="stub LLM latency spread")
+    parser.add_argument("--distribution", default="lognormal", choices=LATENCY_DISTRIBUTIONS)
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="share of stub calls that fail")
+    args = parser.parse_args()
+
+    configure_llm_limiter(args.concurrency, default_timeout=None)
+    provider = LocalStubProvider(latency_ms=args.latency_ms, latency_jitter_ms=args.jitter_ms,
+                                 latency_distribution=args.distribution, failure_rate=args.failure_rate)
+    provider.set_generation_model("gemini-pro")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{tmp}/bench.db"
+        user_ids = seed(url, args.users, args.tasks)
+        async_engine = create_async_engine(url.replace("sqlite://", "sqlite+aiosqlite://"), poolclass=NullPool)
+        session_factory = sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
+
+        wall, results = asyncio.run(run(session_factory, user_ids, provider, args.reports))
+
+    latencies = [total for total, _ in results]
+    waits = [llm for _, llm in results]
+    overhead = [total - llm for total, llm in results]
+    print(f"\n{args.reports} weekly reports, {args.users} users x {args.tasks} tasks, "
+          f"LLM cap {args.concurrency}, stub {args.distribution} {args.latency_ms:.0f}±{args.jitter_ms:.0f} ms")
+    print(f"  throughput   {args.reports / wall:8.2f} reports/s  (wall {wall:.2f} s)")
+    print(f"  report       p50={percentile(latencies, 0.5) * 1000:8.1f} ms  p95={percentile(latencies, 0.95) * 1000:8.1f} ms")
+    print(f"  llm wait     p50={percentile(waits, 0.5) * 1000:8.1f} ms  p95={percentile(waits, 0.95) * 1000:8.1f} ms")
+    print(f"  our overhead p50={percentile(overhead, 0.5) * 1000:8.1f} ms  p95={percentile(overhead, 0.95) * 1000:8.1f} ms")
+    print(f"  stub calls={provider.calls} failures={provider.failures} (failed calls use the template summary)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Benchmark: latency of /health and /tasks while AI report data is being loaded
+
+Compares the previous pattern (blocking SQLAlchemy Session queries inside an
+`async def` handler) with the AsyncSession-based MCPClient. Everything runs
+in one event loop through an in-process ASGI transport against a seeded
+SQLite file, so no server or PostgreSQL instance is needed.
+
+Run with: python benchmarks/bench_report_event_loop.py [--tasks 3000] [--reports 8]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import httpx
+from fastapi import FastAPI, Depends
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+
+from agents.mcp_client import MCPClient
+from models.db_schemes.schemes.base import Base
+from models.db_schemes.schemes.user import User
+from models.db_schemes.schemes.task import Task
+from models.db_schemes.schemes.task_status_history import Task_Status_History
+from models.enums.task_status import TaskStatus
+
+
+def seed(url: str, task_count: int) -> int:
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    with sessionmaker(bind=engine)() as db:
+        user = User(name="Bench User", email="bench@example.com")
+        db.add(user)
+        db.flush()
+        now = datetime.utcnow()
+        for i in range(task_count):
+            task = Task(title=f"Task {i}", description="Benchmark task " * 8, user_id=user.id,
+                        status=TaskStatus.COMPLETED, created_at=now - timedelta(minutes=i))
+            db.add(task)
+            db.flush()
+            for j, status in enumerate((TaskStatus.PENDING, TaskStatus.IN_PROGRESS, TaskStatus.COMPLETED)):
+                db.add(Task_Status_History(task_id=task.id, status=status, note=f"step {j}",
+                                           updated_at=task.created_at + timedelta(minutes=j)))
+        db.commit()
+        user_id = user.id
+    engine.dispose()
+    return user_id
+
+
+def build_app(url: str, user_id: int, mode: str) -> FastAPI:
+    engine = create_engine(url, connect_args={"check_same_thread": False})
+    SessionLocal = sessionmaker(bind=engine)
+    async_engine = create_async_engine(url.replace("sqlite://", "sqlite+aiosqlite://"))
+    AsyncSessionLocal = sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
+
+    def get_db():
+        with SessionLocal() as db:
+            yield db
+
+    async def get_async_db():
+        async with AsyncSessionLocal() as db:
+            yield db
+
+    app = FastAPI()
+
+    @app.get("/health")
+    def health_check():
+        return {"status": "healthy"}
+
+    @app.get("/tasks")
+    def read_tasks(db: Session = Depends(get_db)):
+        return [t.id for t in db.execute(select(Task).limit(100)).scalars()]
+
+    if mode == "blocking":
+        @app.post("/report")
+        async def report(db: Session = Depends(get_db)):
+            # Previous behaviour: synchronous queries inside an async handler
+            tasks = db.execute(select(Task).where(Task.user_id == user_id)).scalars().all()
+            history = db.execute(
+                select(Task_Status_History).join(Task, Task.id == Task_Status_History.task_id)
+                .where(Task.user_id == user_id)
+            ).scalars().all()
+            return {"tasks": len(tasks), "history": len(history)}
+    else:
+        @app.post("/report")
+        async def report(db: AsyncSession = Depends(get_async_db)):
+            snapshot = await MCPClient(db, session_factory=AsyncSessionLocal).load_report_snapshot(user_id, "all")
+            return {"tasks": len(snapshot.tasks), "history": len(snapshot.history)}
+
+    return app
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+async def run_mode(url: str, user_id: int, mode: str, reports: int, duration: float):
+    app = build_app(url, user_id, mode)
+    transport = httpx.ASGITransport(app=app)
+    latencies = {"/health": [], "/tasks": []}
+    completed_reports = 0
+    stop = asyncio.Event()
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def report_worker():
+            nonlocal completed_reports
+            while not stop.is_set():
+                response = await client.post("/report")
+                response.raise_for_status()
+                completed_reports += 1
+
+        async def probe(path):
+            while not stop.is_set():
+                start = time.perf_counter()
+                (await client.get(path)).raise_for_status()
+                latencies[path].append((time.perf_counter() - start) * 1000)
+                await asyncio.sleep(0.005)
+
+        workers = [asyncio.create_task(report_worker()) for _ in range(reports)]
+        probes = [asyncio.create_task(probe(path)) for path in latencies]
+        await asyncio.sleep(duration)
+        stop.set()
+        await asyncio.gather(*workers, *probes)
+
+    print(f"\n[{mode}] {completed_reports} report loads in {duration:.0f}s")
+    for path, values in latencies.items():
+        print(f"  {path:8s} n={len(values):5d}  p50={statistics.median(values):8.2f} ms  "
+              f"p99={percentile(values, 99):8.2f} ms  max={max(values):8.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=3000, help="tasks seeded for the report user")
+    parser.add_argument("--reports", type=int, default=8, help="concurrent report requests")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per mode")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{tmp}/bench.db"
+        user_id = seed(url, args.tasks)
+        for mode in ("blocking", "async"):
+            asyncio.run(run_mode(url, user_id, mode, args.reports, args.duration))
+
+
+if __name__ == "__main__":
+    main()
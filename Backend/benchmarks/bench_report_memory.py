@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Benchmark: memory and CPU of loading a report snapshot and computing its statistics
+
+Compares the previous pipeline (ORM instances serialized to ISO-string dicts,
+statistics parsing the strings back with fromisoformat) with the TaskRecord /
+StatusEvent records now used by MCPClient. Memory is measured with tracemalloc:
+`peak` is the high-water mark while loading, `retained` is what the loaded
+snapshot still holds afterwards. Runs against a seeded SQLite file.
+
+Run with: python benchmarks/bench_report_memory.py [--tasks 5000] [--history 4]
+"""
+import argparse
+import asyncio
+import gc
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+
+from agents.mcp_client import MCPClient
+from models.db_schemes.schemes.base import Base
+from models.db_schemes.schemes.user import User
+from models.db_schemes.schemes.task import Task
+from models.db_schemes.schemes.task_status_history import Task_Status_History
+from models.enums.task_status import TaskStatus
+
+STATUS_STEPS = (TaskStatus.PENDING, TaskStatus.IN_PROGRESS, TaskStatus.OVERDUE, TaskStatus.COMPLETED)
+
+
+def seed(url: str, task_count: int, history_per_task: int) -> int:
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    with sessionmaker(bind=engine)() as db:
+        user = User(name="Bench User", email="bench@example.com")
+        db.add(user)
+        db.flush()
+        now = datetime.utcnow()
+        for i in range(task_count):
+            steps = STATUS_STEPS[:history_per_task]
+            task = Task(title=f"Task {i}", description="Benchmark task " * 8, user_id=user.id,
+                        status=steps[-1], created_at=now - timedelta(minutes=i))
+            db.add(task)
+            db.flush()
+            for j, status in enumerate(steps):
+                db.add(Task_Status_History(task_id=task.id, status=status, note=f"step {j}" if j % 2 == 0 else None,
+                                           updated_at=task.created_at + timedelta(minutes=j)))
+        db.commit()
+        user_id = user.id
+    engine.dispose()
+    return user_id
+
+
+async def load_dicts(session_factory, user_id: int):
+    """Previous pipeline: ORM rows serialized to ISO-string dicts, stats parsed back from strings"""
+    async with session_factory() as db:
+        tasks = (await db.execute(select(Task).where(Task.user_id == user_id))).scalars().all()
+        history = (await db.execute(
+            select(Task_Status_History).join(Task, Task.id == Task_Status_History.task_id)
+            .where(Task.user_id == user_id)
+            .order_by(Task_Status_History.task_id, Task_Status_History.updated_at)
+        )).scalars().all()
+
+    history_by_task = {}
+    for h in history:
+        history_by_task.setdefault(h.task_id, []).append({
+            "id": h.id, "task_id": h.task_id, "status": h.status.value,
+            "updated_at": h.updated_at.isoformat() if h.updated_at else None, "note": h.note
+        })
+    task_dicts = []
+    for t in tasks:
+        entries = history_by_task.get(t.id, [])
+        task_dicts.append({
+            "id": t.id, "title": t.title, "description": t.description, "status": t.status.value,
+            "created_at": t.created_at.isoformat() if t.created_at else None,
+            "updated_at": t.updated_at.isoformat() if t.updated_at else None,
+            "status_history": entries, "all_notes": [e for e in entries if e["note"] is not None]
+        })
+    del tasks, history
+
+    day_counts, hours = {}, []
+    for task in task_dicts:
+        day = task["created_at"][:10]
+        day_counts[day] = day_counts.get(day, 0) + 1
+        if task["status"] == TaskStatus.COMPLETED.value:
+            completed_at = next(e["updated_at"] for e in task["status_history"]
+                                if e["status"] == TaskStatus.COMPLETED.value)
+            hours.append((datetime.fromisoformat(completed_at.replace("Z", "+00:00")) -
+                          datetime.fromisoformat(task["created_at"])).total_seconds() / 3600)
+    return task_dicts
+
+
+async def load_records(session_factory, user_id: int):
+    """Current pipeline: TaskRecord / StatusEvent records and in-memory statistics"""
+    async with session_factory() as db:
+        snapshot = await MCPClient(db, session_factory=session_factory).load_report_snapshot(user_id, "all")
+    snapshot.statistics()
+    return snapshot
+
+
+def measure(name: str, loader, session_factory, user_id: int, repeats: int):
+    gc.collect()
+    tracemalloc.start()
+    result = asyncio.run(loader(session_factory, user_id))
+    gc.collect()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        asyncio.run(loader(session_factory, user_id))
+        timings.append((time.perf_counter() - start) * 1000)
+
+    print(f"  {name:8s} peak={peak / 2**20:8.2f} MiB  retained={retained / 2**20:8.2f} MiB  "
+          f"best={min(timings):8.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=5000, help="tasks seeded for the report user")
+    parser.add_argument("--history", type=int, default=4, choices=range(1, 5), help="history entries per task")
+    parser.add_argument("--repeats", type=int, default=5, help="timed runs per pipeline")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{tmp}/bench.db"
+        user_id = seed(url, args.tasks, args.history)
+        async_engine = create_async_engine(url.replace("sqlite://", "sqlite+aiosqlite://"), poolclass=NullPool)
+        session_factory = sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
+
+        print(f"\n{args.tasks} tasks x {args.history} history entries")
+        measure("dicts", load_dicts, session_factory, user_id, args.repeats)
+        measure("records", load_records, session_factory, user_id, args.repeats)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,10 @@
 """
 Document Writer Agent for converting reports to Word documents
 """
+import io
 import os
-from typing import Dict, Any
+import threading
+from typing import Dict, Any, List, Optional
 from datetime import datetime
 from docx import Document
 from docx.shared import Inches, Pt
@@ -12,6 +14,8 @@ from docx.oxml import OxmlElement
 from docx.enum.style import WD_STYLE_TYPE
 from docx.shared import RGBColor
 
+from agents.report_records import TaskRecord, StatusEvent
+
 class DocWriterAgent:
     """Agent for converting reports to Word documents"""
     
@@ -26,6 +30,30 @@ class DocWriterAgent:
         # Create output directory if it doesn't exist
         if not os.path.exists(output_dir):
             os.makedirs(output_dir)
+        # Serialized empty document with the custom styles, see warm_up
+        self._base_document: Optional[bytes] = None
+        self._base_lock = threading.Lock()
+    
+    def warm_up(self):
+        """Build the base document every report starts from
+        
+        Loading python-docx's default template and adding the custom styles
+        takes about twice as long as reopening the saved result, so it is done
+        once. Runs on first use if it was not called at startup.
+        """
+        with self._base_lock:
+            if self._base_document is None:
+                doc = Document()
+                self._add_custom_styles(doc)
+                buffer = io.BytesIO()
+                doc.save(buffer)
+                self._base_document = buffer.getvalue()
+    
+    def _new_document(self) -> Document:
+        """A fresh document with the custom styles already added"""
+        if self._base_document is None:
+            self.warm_up()
+        return Document(io.BytesIO(self._base_document))
     
     def _add_custom_styles(self, doc: Document):
         """Add custom styles to the document"""
@@ -231,7 +259,11 @@ class DocWriterAgent:
                 row_cells[0].text = status
                 row_cells[1].text = str(count)
     
-    def _add_tasks_section(self, doc: Document, tasks: list):
+    def _format_date(self, value: Optional[datetime]) -> str:
+        """Format a timestamp as a calendar date for tables"""
+        return value.strftime('%Y-%m-%d') if value else 'N/A'
+    
+    def _add_tasks_section(self, doc: Document, tasks: List[TaskRecord]):
         """Add a tasks section with detailed information"""
         if not tasks:
             return
@@ -241,23 +273,23 @@ class DocWriterAgent:
         
         for i, task in enumerate(tasks[:20]):  # Limit to first 20 tasks
             # Add task header
-            task_title = doc.add_heading(f"{i+1}. {task.get('title', 'Untitled Task')}", 2)
+            task_title = doc.add_heading(f"{i+1}. {task.title or 'Untitled Task'}", 2)
             task_title.runs[0].font.size = Pt(14)
             
             # Add task details
             details_para = doc.add_paragraph()
             details_para.add_run('Status: ').bold = True
-            details_para.add_run(f"{task.get('status', 'N/A')}\n")
+            details_para.add_run(f"{task.status.value}\n")
             
             details_para.add_run('Created: ').bold = True
-            details_para.add_run(f"{task.get('created_at', 'N/A')[:10] if task.get('created_at') else 'N/A'}\n")
+            details_para.add_run(f"{self._format_date(task.created_at)}\n")
             
-            if task.get('description'):
+            if task.description:
                 details_para.add_run('Description: ').bold = True
-                details_para.add_run(f"{task.get('description', '')}\n")
+                details_para.add_run(f"{task.description}\n")
             
             # Add status history if available
-            if 'status_history' in task and task['status_history']:
+            if task.history:
                 doc.add_heading('Status History', 3)
                 history_table = doc.add_table(rows=1, cols=3)
                 history_table.style = 'Table Grid'
@@ -269,15 +301,15 @@ class DocWriterAgent:
                 hdr_cells[2].text = 'Note'
                 
                 # Add history data
-                for history in task['status_history']:
+                for event in task.history:
                     row_cells = history_table.add_row().cells
-                    row_cells[0].text = history.get('status', 'N/A')
-                    row_cells[1].text = history.get('updated_at', 'N/A')[:10] if history.get('updated_at') else 'N/A'
-                    row_cells[2].text = history.get('note', 'N/A') or 'N/A'
+                    row_cells[0].text = event.status.value
+                    row_cells[1].text = self._format_date(event.updated_at)
+                    row_cells[2].text = event.note or 'N/A'
             
             doc.add_paragraph()
     
-    def _add_notes_section(self, doc: Document, notes: list):
+    def _add_notes_section(self, doc: Document, notes: List[StatusEvent]):
         """Add a notes section"""
         if not notes:
             return
@@ -297,9 +329,9 @@ class DocWriterAgent:
         # Add notes data (limit to first 30 notes)
         for note in notes[:30]:
             row_cells = notes_table.add_row().cells
-            row_cells[0].text = note.get('updated_at', 'N/A')[:10] if note.get('updated_at') else 'N/A'
-            row_cells[1].text = note.get('status', 'N/A')
-            row_cells[2].text = note.get('note', 'N/A') or 'N/A'
+            row_cells[0].text = self._format_date(note.updated_at)
+            row_cells[1].text = note.status.value
+            row_cells[2].text = note.note or 'N/A'
     
     def _add_visualization_placeholder(self, doc: Document):
         """Add placeholder for data visualizations"""
@@ -341,17 +373,15 @@ class DocWriterAgent:
         Create a professionally formatted Word document from report data
         
         Args:
-            report_data (Dict): Report data from the report agent
+            report_data (Dict): Report data from the report agent, with TaskRecord
+                tasks and StatusEvent notes
             user_data (Dict): User data for the report header
             
         Returns:
             str: Path to the generated document
         """
-        # Create a new document
-        doc = Document()
-        
-        # Add custom styles
-        self._add_custom_styles(doc)
+        # Create a new document from the styled base document
+        doc = self._new_document()
         
         # Add professional header
         self._add_header(doc, f"{report_data.get('report_type', 'Productivity')} Report", user_data, report_data)
@@ -413,11 +443,8 @@ class DocWriterAgent:
         Returns:
             str: Path to the generated document
         """
-        # Create a new document
-        doc = Document()
-        
-        # Add custom styles
-        self._add_custom_styles(doc)
+        # Create a new document from the styled base document
+        doc = self._new_document()
         
         # Add professional header
         self._add_header(doc, f"{report_data.get('report_type', 'Custom')} Report", user_data, report_data)
@@ -480,4 +507,97 @@ class DocWriterAgent:
         # Save document
         doc.save(filepath)
         
-        return filepath
\ No newline at end of file
+        return filepath
+    
+    def _add_team_section(self, doc: Document, stats: Dict[str, Any]):
+        """Add completion time percentiles, daily load and member tables for a team report"""
+        doc.add_heading('Team Overview', 1)
+        overview = doc.add_paragraph()
+        overview.add_run('Members: ').bold = True
+        overview.add_run(f"{stats.get('member_count', 0)} ({stats.get('active_members', 0)} with tasks in the period)")
+        
+        percentiles = stats.get('completion_time_percentiles', {})
+        if percentiles:
+            doc.add_heading('Completion Time', 2)
+            table = doc.add_table(rows=1, cols=2)
+            table.style = 'Table Grid'
+            table.rows[0].cells[0].text = 'Percentile'
+            table.rows[0].cells[1].text = 'Hours'
+            for name, hours in percentiles.items():
+                row_cells = table.add_row().cells
+                row_cells[0].text = name.upper()
+                row_cells[1].text = str(hours)
+        
+        daily_load = stats.get('daily_load', {})
+        if daily_load:
+            doc.add_heading('Daily Load', 2)
+            table = doc.add_table(rows=1, cols=2)
+            table.style = 'Table Grid'
+            table.rows[0].cells[0].text = 'Day'
+            table.rows[0].cells[1].text = 'Tasks Created'
+            for day, count in daily_load.items():
+                row_cells = table.add_row().cells
+                row_cells[0].text = day
+                row_cells[1].text = str(count)
+        
+        for heading, key in (('Top Contributors', 'top_members'), ('Members With Overdue Tasks', 'members_with_overdue_tasks')):
+            members = stats.get(key, [])
+            if not members:
+                continue
+            doc.add_heading(heading, 2)
+            table = doc.add_table(rows=1, cols=4)
+            table.style = 'Table Grid'
+            hdr_cells = table.rows[0].cells
+            hdr_cells[0].text = 'Member'
+            hdr_cells[1].text = 'Tasks'
+            hdr_cells[2].text = 'Completed'
+            hdr_cells[3].text = 'Overdue'
+            for member in members:
+                row_cells = table.add_row().cells
+                row_cells[0].text = member['name']
+                row_cells[1].text = str(member['total_tasks'])
+                row_cells[2].text = str(member['completed_tasks'])
+                row_cells[3].text = str(member['overdue_tasks'])
+    
+    def create_team_report_document(self, report_data: Dict[str, Any], user_data: Dict[str, Any]) -> str:
+        """
+        Create a professionally formatted Word document from team report data
+        
+        Args:
+            report_data (Dict): Team report data from the report agent
+            user_data (Dict): Data of the admin the report is prepared for
+            
+        Returns:
+            str: Path to the generated document
+        """
+        # Create a new document from the styled base document
+        doc = self._new_document()
+        
+        # Add professional header
+        self._add_header(doc, "Team Report", user_data, report_data)
+        
+        # Add executive summary
+        if 'summary' in report_data:
+            self._add_executive_summary(doc, report_data['summary'])
+        
+        doc.add_page_break()
+        
+        # Add team metrics
+        if 'statistics' in report_data:
+            self._add_statistics_section(doc, report_data['statistics'])
+            self._add_team_section(doc, report_data['statistics'])
+            doc.add_page_break()
+        
+        # Add footer
+        self._add_footer(doc)
+        
+        # Generate filename
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        user_id = user_data.get('id', 'unknown')
+        filename = f"team_{timestamp}_{user_id}.docx"
+        filepath = os.path.join(self.output_dir, filename)
+        
+        # Save document
+        doc.save(filepath)
+        
+        return filepath
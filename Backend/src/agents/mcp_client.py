@@ -1,33 +1,109 @@
 """
 MCP Client for connecting to the database and retrieving data for AI report generation
 """
+import hashlib
 import json
-from typing import Dict, List, Any, Optional
-from datetime import datetime, timedelta
+from typing import Dict, List, Any, Optional, Callable, Sequence, Tuple
+from datetime import datetime, timedelta, time
+from contextlib import asynccontextmanager
 import asyncio
 import httpx
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func, update, and_, or_
 
 from models.db_schemes.schemes.task import Task
 from models.db_schemes.schemes.user import User
 from models.db_schemes.schemes.ai_report import AI_Report
 from models.db_schemes.schemes.task_status_history import Task_Status_History
-from models.enums.task_status import TaskStatus
 from models.enums.report_type import ReportType
+from models.enums.user_role import UserRole
+from models.enums.user_status import UserStatus
+from agents.stats_engine import TaskStatisticsEngine, period_to_days, ROLLUP_PERIODS
+from agents.report_snapshot import ReportDataSnapshot
+from agents.team_stats import TeamStatisticsEngine
+from agents.report_records import TaskRecord, StatusEvent, TASK_RECORD_COLUMNS, STATUS_EVENT_COLUMNS
+
+# Isolation of the transaction a snapshot is read in, by dialect. Under
+# PostgreSQL's default READ COMMITTED each statement sees the commits made
+# before it started, so the tasks and history of one snapshot could disagree.
+SNAPSHOT_ISOLATION_LEVELS = {"postgresql": "REPEATABLE READ"}
 
 class MCPClient:
     """Model Context Protocol Client for database access"""
     
-    def __init__(self, db_session: Session):
+    def __init__(self, db_session: AsyncSession, session_factory: Optional[Callable[[], AsyncSession]] = None,
+                 use_rollups: bool = False):
+        """
+        Initialize the client
+        
+        Args:
+            db_session (AsyncSession): Request-scoped session, used for writes
+            session_factory (Callable): Optional factory for extra sessions. When given,
+                independent reads each get their own session so they can run
+                concurrently with asyncio.gather; otherwise they share db_session
+                one at a time.
+            use_rollups (bool): Answer weekly and monthly statistics, in reports too,
+                from the user_daily_stats rollup table instead of the raw task tables.
+                Their windows then start at midnight.
+        """
         self.db = db_session
+        self.session_factory = session_factory
+        self.use_rollups = use_rollups
+        self._lock = asyncio.Lock()
+    
+    @asynccontextmanager
+    async def _reader(self):
+        """Yield a session for one independent read"""
+        if self.session_factory is not None:
+            async with self.session_factory() as session:
+                yield session
+        else:
+            # An AsyncSession does not support concurrent operations
+            async with self._lock:
+                yield self.db
+    
+    @asynccontextmanager
+    async def _snapshot_reader(self):
+        """Yield a session whose reads all see the same committed data
+        
+        Reads that have to agree with each other run one after the other on
+        this session, in a single transaction.
+        """
+        async with self._reader() as session:
+            isolation_level = SNAPSHOT_ISOLATION_LEVELS.get(session.get_bind().dialect.name)
+            # The shared request session may already be inside a transaction
+            if isolation_level and not session.in_transaction():
+                await session.connection(execution_options={"isolation_level": isolation_level})
+            yield session
+    
+    async def _scalars(self, statement, session: Optional[AsyncSession] = None) -> List:
+        """Execute a statement on the given or a reader session and return its ORM rows"""
+        if session is not None:
+            result = await session.execute(statement)
+            return list(result.scalars().all())
+        async with self._reader() as session:
+            result = await session.execute(statement)
+            return list(result.scalars().all())
+    
+    async def _rows(self, statement, session: Optional[AsyncSession] = None) -> List:
+        """Execute a column statement on the given or a reader session and return its rows"""
+        if session is not None:
+            result = await session.execute(statement)
+            return list(result.all())
+        async with self._reader() as session:
+            result = await session.execute(statement)
+            return list(result.all())
     
     async def get_user_data(self, user_id: int) -> Optional[Dict]:
         """Retrieve user data"""
-        user = self.db.query(User).filter(User.id == user_id).first()
-        if not user:
+        return await self._load_user_data(user_id)
+    
+    async def _load_user_data(self, user_id: int, session: Optional[AsyncSession] = None) -> Optional[Dict]:
+        users = await self._scalars(select(User).where(User.id == user_id), session)
+        if not users:
             return None
         
+        user = users[0]
         return {
             "id": user.id,
             "name": user.name,
@@ -36,211 +112,273 @@ class MCPClient:
             "created_at": user.created_at.isoformat() if user.created_at else None
         }
     
+    def _window_start(self, days: Optional[int]) -> Optional[datetime]:
+        """Return the start of a trailing window of the given number of days"""
+        if days:
+            return datetime.utcnow() - timedelta(days=days)
+        return None
+    
+    def _uses_rollups(self, period: str, extra_filters: Optional[List] = None) -> bool:
+        """Whether a report's statistics come from the rollups; they cannot apply extra filters"""
+        return self.use_rollups and period in ROLLUP_PERIODS and not extra_filters
+    
+    def _report_window_start(self, period: str, days: Optional[int], use_rollups: bool) -> Optional[datetime]:
+        """Start of a report's window, aligned to a whole day when the rollups answer its statistics"""
+        start_date = self._window_start(days)
+        if use_rollups and start_date is not None:
+            return datetime.combine(start_date.date(), time.min)
+        return start_date
+    
+    def _user_task_filters(self, user_id: int, start_date: Optional[datetime]) -> List:
+        """Build the WHERE clauses selecting a user's tasks inside a window"""
+        filters = [Task.user_id == user_id]
+        if start_date is not None:
+            filters.append(Task.created_at >= start_date)
+        return filters
+    
     async def get_user_tasks(self, user_id: int, days: Optional[int] = None) -> List[Dict]:
         """Retrieve user tasks, optionally filtered by date range"""
-        query = self.db.query(Task).filter(Task.user_id == user_id)
-        
-        if days:
-            start_date = datetime.utcnow() - timedelta(days=days)
-            query = query.filter(Task.created_at >= start_date)
-        
-        tasks = query.all()
+        tasks = await self._fetch_tasks(self._user_task_filters(user_id, self._window_start(days)))
+        return [task.to_dict(include_history=False) for task in tasks]
+    
+    async def _fetch_tasks(self, task_filters: List, session: Optional[AsyncSession] = None) -> List[TaskRecord]:
+        """Load the tasks matching the filters as records without history, in ID order"""
+        rows = await self._rows(select(*TASK_RECORD_COLUMNS).where(*task_filters).order_by(Task.id.asc()), session)
+        return [TaskRecord(*row) for row in rows]
+    
+    async def _fetch_history_by_task(self, task_filters: List,
+                                     session: Optional[AsyncSession] = None) -> Dict[int, List[StatusEvent]]:
+        """Load the status history of every matching task with a single query"""
+        rows = await self._rows(
+            select(*STATUS_EVENT_COLUMNS)
+            .join(Task, Task.id == Task_Status_History.task_id)
+            .where(*task_filters)
+            .order_by(Task_Status_History.task_id.asc(), Task_Status_History.updated_at.asc()),
+            session
+        )
         
-        return [
-            {
-                "id": task.id,
-                "title": task.title,
-                "description": task.description,
-                "status": task.status.value,
-                "created_at": task.created_at.isoformat() if task.created_at else None,
-                "updated_at": task.updated_at.isoformat() if task.updated_at else None
-            }
-            for task in tasks
-        ]
+        history_by_task: Dict[int, List[StatusEvent]] = {}
+        for row in rows:
+            event = StatusEvent._make(row)
+            history_by_task.setdefault(event.task_id, []).append(event)
+        return history_by_task
     
     async def get_task_status_history(self, task_id: int) -> List[Dict]:
         """Retrieve status history for a specific task"""
-        history = self.db.query(Task_Status_History)\
-                        .filter(Task_Status_History.task_id == task_id)\
-                        .order_by(Task_Status_History.updated_at.asc())\
-                        .all()
+        rows = await self._rows(
+            select(*STATUS_EVENT_COLUMNS)
+            .where(Task_Status_History.task_id == task_id)
+            .order_by(Task_Status_History.updated_at.asc())
+        )
         
-        return [
-            {
-                "id": h.id,
-                "task_id": h.task_id,
-                "status": h.status.value,
-                "updated_at": h.updated_at.isoformat() if h.updated_at else None,
-                "note": h.note
-            }
-            for h in history
-        ]
+        return [StatusEvent._make(row).to_dict() for row in rows]
     
     async def get_all_status_notes(self, task_id: int) -> List[Dict]:
         """Retrieve all notes from task status history for a specific task"""
-        history = self.db.query(Task_Status_History)\
-                        .filter(
-                            and_(
-                                Task_Status_History.task_id == task_id,
-                                Task_Status_History.note.isnot(None)
-                            )
-                        )\
-                        .order_by(Task_Status_History.updated_at.asc())\
-                        .all()
+        rows = await self._rows(
+            select(*STATUS_EVENT_COLUMNS)
+            .where(
+                and_(
+                    Task_Status_History.task_id == task_id,
+                    Task_Status_History.note.isnot(None)
+                )
+            )
+            .order_by(Task_Status_History.updated_at.asc())
+        )
         
-        return [
-            {
-                "id": h.id,
-                "task_id": h.task_id,
-                "status": h.status.value,
-                "updated_at": h.updated_at.isoformat() if h.updated_at else None,
-                "note": h.note
-            }
-            for h in history
-        ]
+        return [StatusEvent._make(row).to_dict() for row in rows]
     
     async def get_user_tasks_with_history(self, user_id: int, days: Optional[int] = None) -> List[Dict]:
-        """Retrieve user tasks with their status history"""
-        tasks = await self.get_user_tasks(user_id, days)
+        """Retrieve user tasks with their status history
         
-        # Add status history to each task
-        for task in tasks:
-            # Ensure task is a dictionary before modifying it
-            if isinstance(task, dict):
-                task_id = task.get("id")
-                if task_id is not None:
-                    task["status_history"] = await self.get_task_status_history(task_id)
-                    task["all_notes"] = await self.get_all_status_notes(task_id)
+        History for all tasks is loaded in one set-based query and grouped by
+        task ID, so the number of statements does not grow with the task count.
+        """
+        task_filters = self._user_task_filters(user_id, self._window_start(days))
+        tasks = await self._fetch_tasks_with_history(task_filters)
+        return [task.to_dict() for task in tasks]
+    
+    async def _fetch_tasks_with_history(self, task_filters: List,
+                                        session: Optional[AsyncSession] = None) -> List[TaskRecord]:
+        """Load matching tasks and their history in one transaction and attach history to each task"""
+        if session is None:
+            async with self._snapshot_reader() as session:
+                return await self._fetch_tasks_with_history(task_filters, session)
         
-        return tasks
+        tasks = await self._fetch_tasks(task_filters, session)
+        history_by_task = await self._fetch_history_by_task(task_filters, session)
+        return [task._replace(history=tuple(history_by_task.get(task.id, ()))) for task in tasks]
     
-    async def get_task_statistics(self, user_id: int, period: str) -> Dict:
-        """Get task statistics for a given period"""
-        # Determine date range based on period
-        if period == "daily":
-            days = 1
-        elif period == "weekly":
-            days = 7
-        elif period == "monthly":
-            days = 30
-        else:
-            days = None  # All time
+    async def load_report_snapshot(self, user_id: int, period: str, days: Optional[int] = None,
+                                   extra_filters: Optional[List] = None) -> Optional[ReportDataSnapshot]:
+        """Load the user, tasks, history and notes for one report in a fixed number of queries
         
-        tasks = await self.get_user_tasks(user_id, days)
+        Args:
+            user_id (int): ID of the user the report is for
+            period (str): Report period name ("daily", "weekly", "monthly", ...)
+            days (Optional[int]): Window length in days; defaults to the period's window
+            extra_filters (Optional[List]): Additional WHERE clauses over Task, such as
+                those built by agents.task_filters.compile_task_filters
         
-        # Calculate statistics
-        total_tasks = len(tasks)
-        status_counts = {}
-        completed_tasks = 0
+        Returns:
+            Optional[ReportDataSnapshot]: The snapshot, or None if the user does not exist
+        """
+        if days is None:
+            days = period_to_days(period)
+        use_rollups = self._uses_rollups(period, extra_filters) and days is not None
+        start_date = self._report_window_start(period, days, use_rollups)
+        task_filters = self._user_task_filters(user_id, start_date)
+        if extra_filters:
+            task_filters.extend(extra_filters)
         
-        # Get status history for more detailed analysis
-        status_changes = 0
-        avg_completion_time = 0
-        completion_times = []
-        all_notes = []
+        # One transaction, so the user, tasks, history and rollups are all read as of the same moment
+        aggregates = None
+        async with self._snapshot_reader() as session:
+            user_data = await self._load_user_data(user_id, session)
+            if not user_data:
+                return None
+            tasks = await self._fetch_tasks_with_history(task_filters, session)
+            if use_rollups:
+                aggregates = await TaskStatisticsEngine(session).aggregate_from_rollups(user_id, start_date.date())
         
-        for task in tasks:
-            # Ensure task is a dictionary
-            if not isinstance(task, dict):
-                continue
-                
-            status = task.get("status", "UNKNOWN")
-            status_counts[status] = status_counts.get(status, 0) + 1
-            if status == TaskStatus.COMPLETED.value:
-                completed_tasks += 1
-                
-            # Get status history for this task
-            try:
-                history = await self.get_task_status_history(task["id"])
-                status_changes += len(history) - 1  # Exclude initial status
-                
-                # Get all status notes
-                task_all_notes = await self.get_all_status_notes(task["id"])
-                all_notes.extend(task_all_notes)
-                
-                # Calculate completion time if task is completed
-                if status == TaskStatus.COMPLETED.value and len(history) > 1:
-                    created_at_str = task.get("created_at")
-                    if created_at_str:
-                        try:
-                            created_at = datetime.fromisoformat(created_at_str.replace("Z", "+00:00"))
-                            completed_at = None
-                            for h in history:
-                                if isinstance(h, dict) and h.get("status") == TaskStatus.COMPLETED.value:
-                                    updated_at_str = h.get("updated_at")
-                                    if updated_at_str:
-                                        try:
-                                            completed_at = datetime.fromisoformat(updated_at_str.replace("Z", "+00:00"))
-                                            break
-                                        except (ValueError, TypeError):
-                                            continue
-                            
-                            if created_at and completed_at:
-                                completion_time = (completed_at - created_at).total_seconds() / 3600  # In hours
-                                completion_times.append(completion_time)
-                        except (ValueError, TypeError):
-                            pass  # Skip invalid date formats
-            except Exception as e:
-                print(f"Error processing task {task.get('id', 'unknown')}: {e}")
-                # Continue with other tasks if there's an error with this one
-                continue
+        return ReportDataSnapshot(user_data, tasks, period, days, aggregates)
+    
+    async def load_period_snapshots(self, user_id: int,
+                                    periods: Sequence[str]) -> Optional[Dict[str, ReportDataSnapshot]]:
+        """Load the snapshots of several report periods with a single fetch over the longest window
         
-        completion_rate = (completed_tasks / total_tasks * 100) if total_tasks > 0 else 0
-        avg_completion_time = sum(completion_times) / len(completion_times) if completion_times else 0
+        Each period is cut from that fetch at the start load_report_snapshot
+        would use and, where the rollups answer its statistics, reads its
+        aggregates in the same transaction. Every snapshot therefore matches
+        the one its single-period report and its fingerprint are built from.
         
-        # Additional statistics for weekly and monthly reports
-        most_productive_day = ("N/A", 0)
-        least_productive_day = ("N/A", 0)
-        avg_tasks_per_day = 0
+        Args:
+            user_id (int): ID of the user the reports are for
+            periods (Sequence[str]): Period names with a bounded window ("daily", "weekly", "monthly")
         
-        if days:
-            # Group tasks by day
-            tasks_by_day = {}
-            for task in tasks:
-                if not isinstance(task, dict):
-                    continue
-                created_at_str = task.get("created_at")
-                if created_at_str:
-                    try:
-                        created_at = datetime.fromisoformat(created_at_str.replace("Z", "+00:00"))
-                        day_key = created_at.date().isoformat()
-                        if day_key not in tasks_by_day:
-                            tasks_by_day[day_key] = []
-                        tasks_by_day[day_key].append(task)
-                    except (ValueError, TypeError):
-                        continue
-            
-            # Find most and least productive days
-            if tasks_by_day:
-                day_counts = {day: len(task_list) for day, task_list in tasks_by_day.items()}
-                most_productive_day = max(day_counts.items(), key=lambda x: x[1]) if day_counts else ("N/A", 0)
-                least_productive_day = min(day_counts.items(), key=lambda x: x[1]) if day_counts else ("N/A", 0)
-                avg_tasks_per_day = sum(day_counts.values()) / len(day_counts) if day_counts else 0
+        Returns:
+            Optional[Dict[str, ReportDataSnapshot]]: Snapshots keyed by period, or None if the user does not exist
+        """
+        windows = {}
+        for period in periods:
+            days = period_to_days(period)
+            use_rollups = self._uses_rollups(period) and days is not None
+            windows[period] = (days, use_rollups, self._report_window_start(period, days, use_rollups))
+        widest = min(windows, key=lambda period: windows[period][2] or datetime.min)
         
-        return {
-            "period": period,
-            "total_tasks": total_tasks,
-            "completed_tasks": completed_tasks,
-            "in_progress_tasks": status_counts.get(TaskStatus.IN_PROGRESS.value, 0),
-            "pending_tasks": status_counts.get(TaskStatus.PENDING.value, 0),
-            "overdue_tasks": status_counts.get(TaskStatus.OVERDUE.value, 0),
-            "completion_rate": round(completion_rate, 2),
-            "status_distribution": status_counts,
-            "status_changes": status_changes,
-            "avg_completion_time_hours": round(avg_completion_time, 2),
-            "all_notes": all_notes,
-            "most_productive_day": most_productive_day,
-            "least_productive_day": least_productive_day,
-            "avg_tasks_per_day": round(avg_tasks_per_day, 1)
-        }
+        snapshots = {}
+        async with self._snapshot_reader() as session:
+            user_data = await self._load_user_data(user_id, session)
+            if not user_data:
+                return None
+            tasks = await self._fetch_tasks_with_history(self._user_task_filters(user_id, windows[widest][2]), session)
+            full_snapshot = ReportDataSnapshot(user_data, tasks, widest, windows[widest][0])
+            for period, (days, use_rollups, start_date) in windows.items():
+                aggregates = None
+                if use_rollups:
+                    aggregates = await TaskStatisticsEngine(session).aggregate_from_rollups(user_id, start_date.date())
+                snapshots[period] = full_snapshot.within(period, days, start_date, aggregates)
+        
+        return snapshots
+    
+    async def get_data_fingerprint(self, user_id: int, report_type: ReportType, period: str,
+                                   extra_filters: Optional[List] = None,
+                                   parameters: Optional[Dict[str, Any]] = None) -> str:
+        """Digest of the data a report would be generated from, in two aggregate queries
+        
+        Covers the row counts and latest updated_at of the tasks and status
+        history in the report's window, the user's updated_at (the profile is
+        part of the prompt), the report type and, for custom reports, the
+        parameters. Any edit, new status change or row entering or leaving
+        the window changes it.
+        """
+        days = period_to_days(period)
+        start_date = self._report_window_start(period, days, self._uses_rollups(period, extra_filters))
+        task_filters = self._user_task_filters(user_id, start_date)
+        if extra_filters:
+            task_filters.extend(extra_filters)
+        
+        user_updated_at = select(User.updated_at).where(User.id == user_id).scalar_subquery()
+        (tasks,), (history,) = await asyncio.gather(
+            self._rows(select(func.count(Task.id), func.max(Task.updated_at), user_updated_at).where(*task_filters)),
+            self._rows(
+                select(func.count(Task_Status_History.id), func.max(Task_Status_History.updated_at))
+                .join(Task, Task.id == Task_Status_History.task_id)
+                .where(*task_filters)
+            )
+        )
+        
+        key = json.dumps([report_type.name, period, list(tasks), list(history), parameters],
+                         sort_keys=True, default=str)
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()
+    
+    async def _fetch_notes(self, task_filters: List) -> List[StatusEvent]:
+        """Load every status note attached to the tasks matching the filters"""
+        rows = await self._rows(
+            select(*STATUS_EVENT_COLUMNS)
+            .join(Task, Task.id == Task_Status_History.task_id)
+            .where(*task_filters, Task_Status_History.note.isnot(None))
+            .order_by(Task_Status_History.task_id.asc(), Task_Status_History.updated_at.asc())
+        )
+        
+        return [StatusEvent._make(row) for row in rows]
+    
+    async def get_task_statistics(self, user_id: int, period: str) -> Dict:
+        """Get task statistics for a given period
+        
+        Counting, per-day grouping and completion times are aggregated in the
+        database, so the number of queries does not depend on the task count.
+        Notes in the result are StatusEvent records.
+        """
+        days = period_to_days(period)
+        use_rollups = self._uses_rollups(period)
+        start_date = self._report_window_start(period, days, use_rollups)
+        task_filters = self._user_task_filters(user_id, start_date)
+        
+        async def aggregate():
+            async with self._reader() as session:
+                engine = TaskStatisticsEngine(session)
+                if use_rollups:
+                    return await engine.aggregate_from_rollups(user_id, start_date.date())
+                return await engine.aggregate(task_filters, by_day=days is not None)
+        
+        notes, aggregates = await asyncio.gather(self._fetch_notes(task_filters), aggregate())
+        return aggregates.to_statistics(period, notes)
+    
+    async def get_team_members(self, role: Optional[UserRole] = None,
+                               user_ids: Optional[List[int]] = None) -> List[Tuple[int, str]]:
+        """ID and name of the active users a team report covers: all of them, or those with a role or ID"""
+        filters = [User.status == UserStatus.ACTIVE]
+        if role is not None:
+            filters.append(User.role == role)
+        if user_ids is not None:
+            filters.append(User.id.in_(user_ids))
+        return [tuple(row) for row in await self._rows(select(User.id, User.name).where(*filters).order_by(User.id))]
+    
+    async def get_team_statistics(self, period: str, role: Optional[UserRole] = None,
+                                  user_ids: Optional[List[int]] = None, chunk_size: int = 500,
+                                  concurrency: int = 4) -> Dict:
+        """Get the statistics of a team's tasks for a given period
+        
+        Members are aggregated in chunks of chunk_size users, up to
+        concurrency chunks at a time when the client has a session factory
+        (see agents/team_stats.py).
+        """
+        members = await self.get_team_members(role, user_ids)
+        days = period_to_days(period)
+        engine = TeamStatisticsEngine(self.session_factory or self._reader, chunk_size=chunk_size,
+                                      concurrency=concurrency)
+        aggregates = await engine.aggregate(members, self._window_start(days), by_day=days is not None)
+        return aggregates.to_statistics(period)
     
     async def get_recent_reports(self, user_id: int, limit: int = 5) -> List[Dict]:
         """Get recent reports for a user"""
-        reports = self.db.query(AI_Report)\
-            .filter(AI_Report.user_id == user_id)\
-            .order_by(AI_Report.generated_at.desc())\
-            .limit(limit)\
-            .all()
+        reports = await self._scalars(
+            select(AI_Report)
+            .where(AI_Report.user_id == user_id)
+            .order_by(AI_Report.generated_at.desc())
+            .limit(limit)
+        )
         
         return [
             {
@@ -252,28 +390,51 @@ class MCPClient:
             for report in reports
         ]
     
-    async def save_report(self, user_id: int, report_type: ReportType, summary_text: str, file_path: str = None) -> Dict:
+    async def get_latest_report(self, user_id: int, report_type: ReportType) -> Optional[Dict]:
+        """Get the user's most recent report of a type, with its data fingerprint"""
+        reports = await self._scalars(
+            select(AI_Report)
+            .where(AI_Report.user_id == user_id, AI_Report.report_type == report_type)
+            .order_by(AI_Report.generated_at.desc(), AI_Report.id.desc())
+            .limit(1)
+        )
+        return self._report_to_dict(reports[0]) if reports else None
+    
+    async def save_report(self, user_id: int, report_type: ReportType, summary_text: str, file_path: str = None,
+                          data_fingerprint: Optional[str] = None) -> Dict:
         """Save a generated report to the database"""
         report = AI_Report(
             user_id=user_id,
             report_type=report_type,
             summary_text=summary_text,
-            file_path=file_path
+            file_path=file_path,
+            data_fingerprint=data_fingerprint
         )
         
-        self.db.add(report)
-        self.db.commit()
-        self.db.refresh(report)
+        async with self._lock:
+            self.db.add(report)
+            await self.db.commit()
+            await self.db.refresh(report)
         
+        return self._report_to_dict(report)
+    
+    async def set_report_file_path(self, report_id: int, file_path: str):
+        """Record the Word document written for a saved report"""
+        async with self._lock:
+            await self.db.execute(update(AI_Report).where(AI_Report.id == report_id).values(file_path=file_path))
+            await self.db.commit()
+    
+    def _report_to_dict(self, report: AI_Report) -> Dict:
         return {
             "id": report.id,
             "user_id": report.user_id,
             "report_type": report.report_type.value,
             "generated_at": report.generated_at.isoformat() if report.generated_at else None,
             "summary_text": report.summary_text,
-            "file_path": report.file_path
+            "file_path": report.file_path,
+            "data_fingerprint": report.data_fingerprint
         }
 
 # Example usage
 if __name__ == "__main__":
-    pass
\ No newline at end of file
+    pass
@@ -0,0 +1,137 @@
+"""
+Builds LLM prompts that fit a token budget
+
+Sections are laid out in the order they are added but filled in priority
+order: fixed sections (instructions, headline statistics) always go in,
+then list sections take lines until the budget is spent. Token counts are
+estimated from the text length, which is close enough to keep prompts
+inside a predictable size without calling the model's tokenizer.
+"""
+import textwrap
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional
+
+from agents.report_records import StatusEvent, TaskRecord
+# Same estimate as the LLM call metrics, so prompt sizes and token counts agree
+from llm.LLMInstrumentation import estimate_tokens
+
+
+def truncate(text: str, max_chars: int) -> str:
+    """Shorten text to max_chars, collapsing whitespace and marking the cut with an ellipsis"""
+    text = " ".join(text.split())
+    if len(text) <= max_chars:
+        return text
+    return text[:max_chars - 1].rstrip() + "…"
+
+
+def format_task_line(task: TaskRecord) -> str:
+    return f"{task.title or 'Untitled Task'} [{task.status.value}]"
+
+
+def format_note_line(note: StatusEvent, max_chars: int) -> str:
+    updated_at = note.updated_at.date().isoformat() if note.updated_at else 'Unknown date'
+    return f"[{note.status.value}] {updated_at}: {truncate(note.note or 'No note provided', max_chars)}"
+
+
+def recent_notes_first(notes: Iterable[StatusEvent]) -> List[StatusEvent]:
+    """Order notes newest first so the budget is spent on the most recent ones"""
+    return sorted(notes, key=lambda note: (note.updated_at is not None, note.updated_at), reverse=True)
+
+
+class BuiltPrompt(NamedTuple):
+    text: str
+    estimated_tokens: int
+    budget_tokens: int
+    # Per list section: lines included and lines available
+    sections: Dict[str, Dict[str, int]]
+
+    def size(self) -> Dict[str, Any]:
+        """Prompt size summary for logs and API responses"""
+        return {
+            "estimated_tokens": self.estimated_tokens,
+            "budget_tokens": self.budget_tokens,
+            "sections": self.sections,
+        }
+
+
+class _Section(NamedTuple):
+    name: str
+    text: Optional[str]
+    heading: Optional[str]
+    lines: List[str]
+    priority: int
+    empty_text: str
+
+
+class PromptBuilder:
+
+    def __init__(self, budget_tokens: int):
+        """
+        Args:
+            budget_tokens (int): Estimated tokens the whole prompt may use. Fixed
+                sections are always included, even if they alone exceed it.
+        """
+        self.budget_tokens = budget_tokens
+        self._sections: List[_Section] = []
+
+    def add_text(self, name: str, text: str) -> "PromptBuilder":
+        """Add a section that is always included"""
+        self._sections.append(_Section(name, textwrap.dedent(text).strip(), None, [], 0, ""))
+        return self
+
+    def add_list(self, name: str, heading: str, items: Iterable, formatter: Callable[[Any], str],
+                 priority: int, empty_text: str = "None.") -> "PromptBuilder":
+        """Add a numbered list that takes lines, in item order, while the budget allows
+
+        Lower priority values are filled first.
+        """
+        lines = [formatter(item) for item in items]
+        self._sections.append(_Section(name, None, heading, lines, priority, empty_text))
+        return self
+
+    def build(self) -> BuiltPrompt:
+        # Blank line between sections
+        separator_tokens = estimate_tokens("\n\n")
+        lists = [section for section in self._sections if section.text is None]
+
+        def marker(section: _Section, shown: int) -> str:
+            omitted = len(section.lines) - shown
+            return f"(+{omitted} more not shown)" if omitted else section.empty_text
+
+        # Fixed sections, list headings and the worst-case marker line of each list are reserved up front
+        used = sum(estimate_tokens(section.text) + separator_tokens
+                   for section in self._sections if section.text is not None)
+        reserved = {section.name: estimate_tokens(marker(section, 0)) + 1 for section in lists}
+        used += sum(estimate_tokens(section.heading) + separator_tokens for section in lists)
+        used += sum(reserved.values())
+
+        included: Dict[str, List[str]] = {}
+        counts: Dict[str, Dict[str, int]] = {}
+        for section in sorted(lists, key=lambda s: s.priority):
+            chosen = []
+            for i, line in enumerate(section.lines, 1):
+                cost = estimate_tokens(f"{i}. {line}\n")
+                # The last line makes the marker unnecessary, so its reservation can be spent on it
+                available = self.budget_tokens - used + (reserved[section.name] if i == len(section.lines) else 0)
+                if cost > available:
+                    break
+                chosen.append(f"{i}. {line}")
+                used += cost
+            counts[section.name] = {"included": len(chosen), "available": len(section.lines)}
+            if not section.lines or len(chosen) < len(section.lines):
+                # Tell the model the list is empty or incomplete
+                chosen.append(marker(section, len(chosen)))
+            else:
+                # Complete lists need no marker; later sections may use its reservation
+                used -= reserved[section.name]
+            included[section.name] = chosen
+
+        parts = []
+        for section in self._sections:
+            if section.text is not None:
+                parts.append(section.text)
+            else:
+                body = "\n".join(included[section.name])
+                parts.append(f"{section.heading}\n{body}")
+        text = "\n\n".join(parts)
+
+        return BuiltPrompt(text, estimate_tokens(text), self.budget_tokens, counts)
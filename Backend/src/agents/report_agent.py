@@ -2,17 +2,31 @@
 AI Report Agent that uses MCP to access data and generate reports
 """
 import asyncio
-from typing import Dict, Any, Optional, List
+import copy
+from typing import Awaitable, Callable, Dict, Any, Optional, List, Sequence, Tuple
 from datetime import datetime
-import json
+import logging
 import os
+import re
 
 # Import MCP client
 from agents.mcp_client import MCPClient
+from agents.report_snapshot import ReportDataSnapshot
+from agents.report_records import TaskRecord, StatusEvent
+from agents.task_filters import compile_custom_report_filters
+from agents.report_templates import ReportProfile, ReportStats, ReportTemplates, get_report_templates
+from agents.prompt_builder import BuiltPrompt, PromptBuilder, format_note_line, format_task_line, recent_notes_first
 from models.enums.report_type import ReportType
+from models.enums.user_role import UserRole
 
 # Import LLM module
-from llm.GeminiProvider import GeminiProvider
+from llm.LLMInterface import LLMInterface
+from llm.LLMProviderFactory import LLMProviderFactory
+from llm.ResilientProvider import ResilientProvider, CircuitBreaker, CircuitOpenError, LLMUnavailableError
+from llm.LLMMetrics import llm_metrics
+from llm.LLMInstrumentation import llm_call_labels
+from llm.CachedProvider import CachedProvider
+from llm.ResponseCache import ResponseCache
 
 # Import document writer
 from agents.doc_writer_agent import DocWriterAgent
@@ -20,681 +34,631 @@ from agents.doc_writer_agent import DocWriterAgent
 # Import config
 from config import settings
 
+logger = logging.getLogger(__name__)
+
+# Receives progress events (name, payload) while a report is generated
+ReportEventHandler = Callable[[str, Dict[str, Any]], Awaitable[None]]
+
+# Period name of each report type built from a trailing window of tasks
+PERIOD_REPORTS = {ReportType.DAILY: "daily", ReportType.WEEKLY: "weekly", ReportType.MONTHLY: "monthly"}
+
+# Line starting each report's summary in the response to a combined LLM call
+COMBINED_SUMMARY_MARKER = "=== {} REPORT ==="
+_COMBINED_SUMMARY_MARKER_RE = re.compile(r"^[ \t]*=== (DAILY|WEEKLY|MONTHLY) REPORT ===[ \t]*$", re.MULTILINE)
+
+# Shared by every ReportAgent so identical prompts are answered from the cache
+_response_cache: Optional[ResponseCache] = None
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """Return the process-wide LLM response cache, creating it on first use"""
+    global _response_cache
+    if _response_cache is None and settings.llm_cache_enabled:
+        _response_cache = ResponseCache(
+            max_memory_entries=settings.llm_cache_memory_entries,
+            disk_path=settings.llm_cache_path,
+            max_disk_entries=settings.llm_cache_disk_entries,
+            ttl_seconds=settings.llm_cache_ttl_seconds
+        )
+    return _response_cache
+
+# Built once so the provider's client and pooled models outlive a single request
+_llm_provider: Optional[LLMInterface] = None
+
+def get_llm_provider() -> Optional[LLMInterface]:
+    """Return the process-wide provider selected by settings.llm_provider, or None when it is not configured"""
+    global _llm_provider
+    if _llm_provider is None:
+        provider = LLMProviderFactory(settings).create(settings.llm_provider)
+        if provider is not None:
+            provider.set_generation_model("gemini-pro")
+            # Retries and the circuit breaker are shared by every report in the process
+            _llm_provider = ResilientProvider(
+                provider,
+                max_attempts=settings.llm_retry_attempts,
+                base_delay=settings.llm_retry_base_delay_seconds,
+                max_delay=settings.llm_retry_max_delay_seconds,
+                breaker=CircuitBreaker(failure_threshold=settings.llm_breaker_failure_threshold,
+                                       reset_seconds=settings.llm_breaker_reset_seconds)
+            )
+    return _llm_provider
+
 
 class ReportAgent:
-    """AI Agent for generating different types of reports"""
+    """AI Agent for generating different types of reports
+    
+    The LLM provider, document writer and templates are shared; build the
+    agent once per application and call bind() for each request's MCPClient.
+    """
+    
+    # Output token limit of each report type's summary
+    SUMMARY_MAX_OUTPUT_TOKENS = {"daily": 1500, "weekly": 2000, "monthly": 2500, "custom": 2000, "team": 2500}
+    # Prompt headings of the task list and status notes of each report type's summary
+    SUMMARY_HEADINGS = {
+        "daily": ("TODAY'S TASK PORTFOLIO:", "CRITICAL INSIGHTS FROM STATUS NOTES:"),
+        "weekly": ("SIGNIFICANT TASKS THIS WEEK:", "CRITICAL INSIGHTS FROM STATUS NOTES:"),
+        "monthly": ("NOTABLE MONTHLY ACHIEVEMENTS:", "CRITICAL INSIGHTS FROM STATUS NOTES:"),
+        "custom": ("IDENTIFIED TASKS:", None),
+    }
     
-    def __init__(self, mcp_client: MCPClient):
+    def __init__(self, mcp_client: Optional[MCPClient] = None, use_llm_cache: bool = True,
+                 llm_provider: Optional[LLMInterface] = None, doc_writer: Optional[DocWriterAgent] = None,
+                 templates: Optional[ReportTemplates] = None):
+        """
+        Args:
+            mcp_client (Optional[MCPClient]): Data access for the current request; see bind()
+            use_llm_cache (bool): Answer repeated prompts from the LLM response cache
+            llm_provider (Optional[LLMInterface]): Provider to use; by default the
+                process-wide provider behind the response cache, if one is configured
+            doc_writer (Optional[DocWriterAgent]): Writer for Word documents
+            templates (Optional[ReportTemplates]): Prompt and fallback templates
+        """
         self.mcp = mcp_client
-        self.llm_provider = None
-        self.doc_writer = DocWriterAgent(output_dir="reports")
+        self.llm_provider = llm_provider
+        self.use_llm_cache = use_llm_cache
+        self.doc_writer = doc_writer or DocWriterAgent(output_dir="reports")
+        self.templates = templates or get_report_templates()
+        self.prompt_token_budget = settings.llm_prompt_token_budget
+        self.prompt_note_chars = settings.llm_prompt_note_chars
+        # Total time a report may spend on its LLM call, retries included, before the template is used
+        self.llm_deadline_seconds = settings.llm_report_deadline_seconds
+        # Size of the most recent LLM prompt, reported with the report details
+        self.last_prompt: Optional[BuiltPrompt] = None
+        # Whether the most recent summary came from the LLM rather than the fallback template
+        self.last_summary_from_llm = False
         
         # Initialize LLM provider if API key is available
-        api_key = settings.gemini_api_key
-        if api_key:
+        if self.llm_provider is None:
             try:
-                self.llm_provider = GeminiProvider(api_key=api_key)
-                self.llm_provider.set_generation_model("gemini-pro")
+                provider = get_llm_provider()
+                if provider:
+                    self.llm_provider = CachedProvider(provider, get_response_cache())
             except Exception as e:
                 print(f"Failed to initialize LLM provider: {e}")
                 self.llm_provider = None
     
-    async def generate_daily_report(self, user_id: int, generate_doc: bool = False) -> Dict[str, Any]:
-        """Generate a daily report for the user"""
-        # Get user data
-        user_data = await self.mcp.get_user_data(user_id)
-        if not user_data:
+    def bind(self, mcp_client: MCPClient, use_llm_cache: bool = True) -> "ReportAgent":
+        """Return a copy for one request, sharing this agent's provider, document writer and templates"""
+        agent = copy.copy(self)
+        agent.mcp = mcp_client
+        agent.use_llm_cache = use_llm_cache
+        agent.last_prompt = None
+        agent.last_summary_from_llm = False
+        return agent
+    
+    def warm_up(self):
+        """Prepare the document writer and the LLM client so the first report is not slower than the rest"""
+        self.doc_writer.warm_up()
+        if self.llm_provider:
+            try:
+                self.llm_provider.warm_up(set(self.SUMMARY_MAX_OUTPUT_TOKENS.values()), temperature=0.7)
+            except Exception as e:
+                print(f"Failed to warm up LLM provider: {e}")
+    
+    async def _emit(self, on_event: Optional[ReportEventHandler], event: str, data: Dict[str, Any]):
+        if on_event is not None:
+            await on_event(event, data)
+    
+    async def _complete(self, prompt: str, max_output_tokens: int, report_type: str,
+                        on_event: Optional[ReportEventHandler] = None) -> Optional[str]:
+        """Ask the LLM for a summary, emitting each chunk as a "token" event when on_event is given
+        
+        Failures are counted in llm_fallbacks_total, since the caller then
+        falls back to the template summary.
+        """
+        try:
+            # Every call and cache hit below is recorded under this report type
+            with llm_call_labels(report_type=report_type):
+                if on_event is None:
+                    response = await self.llm_provider.agenerate_text(prompt, max_output_tokens=max_output_tokens, temperature=0.7,
+                                                                      timeout=self.llm_deadline_seconds, use_cache=self.use_llm_cache)
+                else:
+                    chunks = []
+                    async for chunk in self.llm_provider.astream_text(prompt, max_output_tokens=max_output_tokens, temperature=0.7,
+                                                                      timeout=self.llm_deadline_seconds, use_cache=self.use_llm_cache):
+                        chunks.append(chunk)
+                        await on_event("token", {"text": chunk})
+                    response = "".join(chunks)
+        except CircuitOpenError:
+            llm_metrics.increment("llm_fallbacks_total", report_type=report_type, reason="circuit_open")
+            raise
+        except (asyncio.TimeoutError, LLMUnavailableError):
+            llm_metrics.increment("llm_fallbacks_total", report_type=report_type, reason="unavailable")
+            raise
+        except Exception:
+            llm_metrics.increment("llm_fallbacks_total", report_type=report_type, reason="error")
+            raise
+        
+        if not response:
+            llm_metrics.increment("llm_fallbacks_total", report_type=report_type, reason="empty_response")
+        return response
+    
+    def _build_prompt(self, context: str, tasks_heading: str, tasks: List[TaskRecord], instructions: str,
+                      notes_heading: Optional[str] = None, notes: List[StatusEvent] = ()) -> str:
+        """Fit a summary prompt into the token budget
+        
+        The context (profile and statistics) and instructions are always
+        included; the most recent notes are added next, then tasks, for as
+        long as the budget allows. Long notes are truncated.
+        """
+        builder = PromptBuilder(self.prompt_token_budget)
+        builder.add_text("context", context)
+        builder.add_list("tasks", tasks_heading, tasks, format_task_line,
+                         priority=2, empty_text="No tasks found.")
+        if notes_heading:
+            builder.add_list("notes", notes_heading, recent_notes_first(notes),
+                             lambda note: format_note_line(note, self.prompt_note_chars),
+                             priority=1, empty_text="No status notes available.")
+        builder.add_text("instructions", instructions)
+        
+        self.last_prompt = builder.build()
+        logger.info(f"Report prompt: {self.last_prompt.size()}")
+        return self.last_prompt.text
+    
+    async def _load_snapshot(self, user_id: int, period: str, extra_filters: Optional[List] = None) -> ReportDataSnapshot:
+        """Load the data snapshot for a report, failing if the user does not exist"""
+        snapshot = await self.mcp.load_report_snapshot(user_id, period, extra_filters=extra_filters)
+        if snapshot is None:
             raise ValueError(f"User with ID {user_id} not found")
-        
-        # Get today's statistics
-        stats = await self.mcp.get_task_statistics(user_id, "daily")
-        
-        # Get today's tasks with history
-        tasks = await self.mcp.get_user_tasks_with_history(user_id, 1)
-        
-        # Generate AI summary
-        summary = self._generate_daily_summary(user_data, stats, tasks)
-        
-        # Save report
-        report = await self.mcp.save_report(
-            user_id=user_id,
-            report_type=ReportType.DAILY,
-            summary_text=summary
+        return snapshot
+    
+    async def _find_unchanged_report(self, user_id: int, report_type: ReportType, period: str, generate_doc: bool,
+                                     force: bool = False, extra_filters: Optional[List] = None,
+                                     parameters: Optional[Dict[str, Any]] = None) -> Tuple[str, Optional[Dict]]:
+        """Fingerprint the data of a report and look for a stored report generated from the same data
+        
+        Returns:
+            Tuple[str, Optional[Dict]]: The fingerprint, and the latest report of the
+                type if its fingerprint matches and, when a document is requested,
+                its document still exists; None if a new report is needed
+        """
+        if force:
+            return await self.mcp.get_data_fingerprint(user_id, report_type, period, extra_filters, parameters), None
+        
+        fingerprint, latest = await asyncio.gather(
+            self.mcp.get_data_fingerprint(user_id, report_type, period, extra_filters, parameters),
+            self.mcp.get_latest_report(user_id, report_type)
         )
-        
+        if latest is None or latest["data_fingerprint"] != fingerprint:
+            return fingerprint, None
+        if generate_doc and not (latest["file_path"] and os.path.exists(latest["file_path"])):
+            return fingerprint, None
+        return fingerprint, latest
+    
+    def _reusable_fingerprint(self, fingerprint: str) -> Optional[str]:
+        """The fingerprint to store with a new report
+        
+        Template summaries written while the LLM was failing are not stored
+        with one, so the next request for the same data tries the LLM again.
+        """
+        if self.llm_provider and not self.last_summary_from_llm:
+            return None
+        return fingerprint
+    
+    async def _reuse_report(self, report: Dict, generate_doc: bool,
+                            on_event: Optional[ReportEventHandler] = None) -> Dict[str, Any]:
+        """Result for a stored report whose data has not changed, without loading the data or calling the LLM"""
+        llm_metrics.increment("reports_reused_total", report_type=report["report_type"].lower())
         result = {
             "report_id": report["id"],
-            "report_type": "Daily",
+            "report_type": report["report_type"],
             "generated_at": report["generated_at"],
-            "summary": summary,
-            "statistics": stats,
-            "tasks": tasks
+            "summary": report["summary_text"],
+            "reused": True
         }
-        
-        # Generate Word document if requested
+        await self._emit(on_event, "summary", {"summary": result["summary"]})
+        await self._emit(on_event, "saved", {"report_id": result["report_id"], "generated_at": result["generated_at"]})
         if generate_doc:
-            try:
-                doc_path = self.doc_writer.create_report_document(result, user_data)
-                result["document_path"] = doc_path
-            except Exception as e:
-                print(f"Failed to generate Word document: {e}")
-        
+            result["document_path"] = report["file_path"]
+            await self._emit(on_event, "document", {"document_path": result["document_path"]})
         return result
     
-    async def generate_weekly_report(self, user_id: int, generate_doc: bool = False) -> Dict[str, Any]:
-        """Generate a weekly report for the user"""
-        # Get user data
-        user_data = await self.mcp.get_user_data(user_id)
-        if not user_data:
+    async def generate_daily_report(self, user_id: int, generate_doc: bool = False,
+                                    on_event: Optional[ReportEventHandler] = None, force: bool = False) -> Dict[str, Any]:
+        """Generate a daily report for the user, or return the latest one if its data has not changed since"""
+        return await self._generate_period_report(user_id, ReportType.DAILY, generate_doc, on_event, force)
+    
+    async def generate_weekly_report(self, user_id: int, generate_doc: bool = False,
+                                     on_event: Optional[ReportEventHandler] = None, force: bool = False) -> Dict[str, Any]:
+        """Generate a weekly report for the user, or return the latest one if its data has not changed since"""
+        return await self._generate_period_report(user_id, ReportType.WEEKLY, generate_doc, on_event, force)
+    
+    async def generate_monthly_report(self, user_id: int, generate_doc: bool = False,
+                                      on_event: Optional[ReportEventHandler] = None, force: bool = False) -> Dict[str, Any]:
+        """Generate a monthly report for the user, or return the latest one if its data has not changed since"""
+        return await self._generate_period_report(user_id, ReportType.MONTHLY, generate_doc, on_event, force)
+    
+    async def generate_period_reports(self, user_id: int,
+                                      report_types: Sequence[ReportType] = (ReportType.DAILY, ReportType.WEEKLY, ReportType.MONTHLY),
+                                      generate_doc: bool = False, combine_llm_calls: bool = False,
+                                      force: bool = False) -> Dict[str, Dict[str, Any]]:
+        """Generate several of the daily, weekly and monthly reports from a single data fetch
+        
+        The tasks and history of the longest window are loaded once and each
+        shorter period is cut from them in memory, at the same window start
+        and with the same rollup statistics as its single-period report. Reports whose data has not changed are reused as in
+        generate_daily_report and friends.
+        
+        Args:
+            user_id (int): ID of the user the reports are for
+            report_types (Sequence[ReportType]): Any of DAILY, WEEKLY and MONTHLY
+            generate_doc (bool): Also write a Word document for each report
+            combine_llm_calls (bool): Ask for every summary in one LLM call; summaries
+                missing from its response are generated with a call of their own
+            force (bool): Generate new reports even if the data has not changed
+        
+        Returns:
+            Dict[str, Dict[str, Any]]: Each report's result, keyed by period name
+        """
+        periods = {report_type: PERIOD_REPORTS[report_type] for report_type in report_types}
+        checks = await asyncio.gather(*(self._find_unchanged_report(user_id, report_type, period, generate_doc, force)
+                                        for report_type, period in periods.items()))
+        
+        results: Dict[str, Dict[str, Any]] = {}
+        pending = {}
+        for (report_type, period), (fingerprint, unchanged) in zip(periods.items(), checks):
+            if unchanged:
+                results[period] = await self._reuse_report(unchanged, generate_doc)
+            else:
+                pending[report_type] = fingerprint
+        if not pending:
+            return results
+        
+        # One fetch over the longest window; the shorter periods are cut from it
+        period_snapshots = await self.mcp.load_period_snapshots(user_id, [PERIOD_REPORTS[report_type]
+                                                                          for report_type in pending])
+        if period_snapshots is None:
             raise ValueError(f"User with ID {user_id} not found")
+        snapshots = {report_type: period_snapshots[PERIOD_REPORTS[report_type]] for report_type in pending}
         
-        # Get weekly statistics
-        stats = await self.mcp.get_task_statistics(user_id, "weekly")
+        combined = {}
+        if combine_llm_calls and self.llm_provider and len(pending) > 1:
+            combined = await self._generate_combined_summaries(snapshots)
         
-        # Get weekly tasks with history
-        tasks = await self.mcp.get_user_tasks_with_history(user_id, 7)
+        for report_type, fingerprint in pending.items():
+            summary, self.last_prompt = combined.get(report_type, (None, None))
+            results[PERIOD_REPORTS[report_type]] = await self._report_from_snapshot(
+                user_id, report_type, snapshots[report_type], fingerprint, generate_doc, summary=summary)
+        return results
+    
+    async def _generate_period_report(self, user_id: int, report_type: ReportType, generate_doc: bool,
+                                      on_event: Optional[ReportEventHandler], force: bool) -> Dict[str, Any]:
+        period = PERIOD_REPORTS[report_type]
+        fingerprint, unchanged = await self._find_unchanged_report(user_id, report_type, period, generate_doc, force)
+        if unchanged:
+            return await self._reuse_report(unchanged, generate_doc, on_event)
+        
+        # Load user, tasks, history and notes once for the whole report
+        snapshot = await self._load_snapshot(user_id, period)
+        return await self._report_from_snapshot(user_id, report_type, snapshot, fingerprint, generate_doc, on_event)
+    
+    async def _report_from_snapshot(self, user_id: int, report_type: ReportType, snapshot: ReportDataSnapshot,
+                                    fingerprint: str, generate_doc: bool,
+                                    on_event: Optional[ReportEventHandler] = None,
+                                    summary: Optional[str] = None) -> Dict[str, Any]:
+        """Summarize, save and optionally document a daily, weekly or monthly report
+        
+        summary, when given, is an LLM summary generated beforehand.
+        """
+        user_data = snapshot.user
+        stats = snapshot.statistics()
+        tasks = snapshot.tasks
+        await self._emit(on_event, "stats", {"report_type": report_type.value, "statistics": stats, "task_count": len(tasks)})
         
         # Generate AI summary
-        summary = self._generate_weekly_summary(user_data, tasks, stats)
+        if summary is not None:
+            self.last_summary_from_llm = True
+        elif report_type == ReportType.DAILY:
+            summary = await self._generate_daily_summary(user_data, stats, tasks, on_event)
+        elif report_type == ReportType.WEEKLY:
+            summary = await self._generate_weekly_summary(user_data, tasks, stats, on_event)
+        else:
+            summary = await self._generate_monthly_summary(user_data, stats, tasks, on_event)
+        await self._emit(on_event, "summary", {"summary": summary})
         
         # Save report
         report = await self.mcp.save_report(
             user_id=user_id,
-            report_type=ReportType.WEEKLY,
-            summary_text=summary
+            report_type=report_type,
+            summary_text=summary,
+            data_fingerprint=self._reusable_fingerprint(fingerprint)
         )
         
         result = {
             "report_id": report["id"],
-            "report_type": "Weekly",
+            "report_type": report_type.value,
             "generated_at": report["generated_at"],
             "summary": summary,
+            "reused": False,
+            "prompt_size": self.last_prompt.size() if self.last_prompt else None,
             "statistics": stats,
             "tasks": tasks
         }
+        await self._emit(on_event, "saved", {"report_id": result["report_id"], "generated_at": result["generated_at"]})
         
         # Generate Word document if requested
         if generate_doc:
             try:
                 doc_path = self.doc_writer.create_report_document(result, user_data)
                 result["document_path"] = doc_path
+                await self.mcp.set_report_file_path(result["report_id"], doc_path)
+                await self._emit(on_event, "document", {"document_path": doc_path})
             except Exception as e:
                 print(f"Failed to generate Word document: {e}")
         
         return result
     
-    async def generate_monthly_report(self, user_id: int, generate_doc: bool = False) -> Dict[str, Any]:
-        """Generate a monthly report for the user"""
-        # Get user data
-        user_data = await self.mcp.get_user_data(user_id)
-        if not user_data:
-            raise ValueError(f"User with ID {user_id} not found")
-        
-        # Get monthly statistics
-        stats = await self.mcp.get_task_statistics(user_id, "monthly")
-        
-        # Get monthly tasks with history
-        tasks = await self.mcp.get_user_tasks_with_history(user_id, 30)
+    async def generate_custom_report(self, user_id: int, parameters: Dict[str, Any], generate_doc: bool = False,
+                                     on_event: Optional[ReportEventHandler] = None, force: bool = False) -> Dict[str, Any]:
+        """Generate a custom report based on parameters
+        
+        start_date, end_date and task_filters are compiled into SQL so only the
+        matching tasks are loaded; invalid filters raise TaskFilterError. As
+        with the other report types, the latest custom report is returned
+        instead if it was generated with the same parameters from unchanged data.
+        """
+        extra_filters = compile_custom_report_filters(parameters)
+        fingerprint, unchanged = await self._find_unchanged_report(user_id, ReportType.CUSTOM, "custom", generate_doc, force,
+                                                                   extra_filters, parameters)
+        if unchanged:
+            return await self._reuse_report(unchanged, generate_doc, on_event)
+        snapshot = await self._load_snapshot(user_id, "custom", extra_filters)
+        user_data = snapshot.user
+        tasks = snapshot.tasks
+        await self._emit(on_event, "stats", {"report_type": "Custom", "parameters": parameters, "task_count": len(tasks)})
         
         # Generate AI summary
-        summary = self._generate_monthly_summary(user_data, stats, tasks)
+        summary = await self._generate_custom_summary(user_data, tasks, parameters, on_event)
+        await self._emit(on_event, "summary", {"summary": summary})
         
         # Save report
         report = await self.mcp.save_report(
             user_id=user_id,
-            report_type=ReportType.MONTHLY,
-            summary_text=summary
+            report_type=ReportType.CUSTOM,
+            summary_text=summary,
+            data_fingerprint=self._reusable_fingerprint(fingerprint)
         )
         
         result = {
             "report_id": report["id"],
-            "report_type": "Monthly",
+            "report_type": "Custom",
             "generated_at": report["generated_at"],
             "summary": summary,
-            "statistics": stats,
+            "reused": False,
+            "prompt_size": self.last_prompt.size() if self.last_prompt else None,
+            "parameters": parameters,
             "tasks": tasks
         }
+        await self._emit(on_event, "saved", {"report_id": result["report_id"], "generated_at": result["generated_at"]})
         
         # Generate Word document if requested
         if generate_doc:
             try:
-                doc_path = self.doc_writer.create_report_document(result, user_data)
+                doc_path = self.doc_writer.create_custom_report_document(result, user_data)
                 result["document_path"] = doc_path
+                await self.mcp.set_report_file_path(result["report_id"], doc_path)
+                await self._emit(on_event, "document", {"document_path": doc_path})
             except Exception as e:
                 print(f"Failed to generate Word document: {e}")
         
         return result
     
-    async def generate_custom_report(self, user_id: int, parameters: Dict[str, Any], generate_doc: bool = False) -> Dict[str, Any]:
-        """Generate a custom report based on parameters"""
-        # Get user data
-        user_data = await self.mcp.get_user_data(user_id)
+    async def generate_team_report(self, user_id: int, period: str = "weekly", role: Optional[UserRole] = None,
+                                   user_ids: Optional[List[int]] = None, generate_doc: bool = False,
+                                   on_event: Optional[ReportEventHandler] = None,
+                                   chunk_size: int = 500, concurrency: int = 4) -> Dict[str, Any]:
+        """Generate a report across the active users selected by role or ID, or all of them
+        
+        The team's statistics are aggregated in parallel chunks of users and
+        merged (see agents/team_stats.py); no task lists are loaded.
+        
+        Args:
+            user_id (int): ID of the admin the report is prepared for and saved under
+            period (str): "daily", "weekly" or "monthly"
+            role (Optional[UserRole]): Only include users with this role
+            user_ids (Optional[List[int]]): Only include these users
+            generate_doc (bool): Also write a Word document
+            chunk_size (int): Users aggregated per statement
+            concurrency (int): Chunks aggregated at the same time
+        """
+        if period not in PERIOD_REPORTS.values():
+            raise ValueError(f"Unsupported team report period: {period}")
+        
+        user_data, stats = await asyncio.gather(
+            self.mcp.get_user_data(user_id),
+            self.mcp.get_team_statistics(period, role, user_ids, chunk_size=chunk_size, concurrency=concurrency)
+        )
         if not user_data:
             raise ValueError(f"User with ID {user_id} not found")
-        
-        # Extract custom parameters
-        start_date = parameters.get("start_date")
-        end_date = parameters.get("end_date")
-        task_filters = parameters.get("task_filters", {})
-        
-        # Get tasks based on custom parameters
-        # This would need to be implemented in the MCP client
-        tasks = await self.mcp.get_user_tasks_with_history(user_id)  # Simplified
+        parameters = {"period": period, "role": role.value if role else None, "user_ids": user_ids}
+        await self._emit(on_event, "stats", {"report_type": "Team", "statistics": stats,
+                                             "member_count": stats["member_count"]})
         
         # Generate AI summary
-        summary = self._generate_custom_summary(user_data, tasks, parameters)
+        summary = await self._generate_team_summary(user_data, stats, parameters, on_event)
+        await self._emit(on_event, "summary", {"summary": summary})
         
         # Save report
         report = await self.mcp.save_report(
             user_id=user_id,
-            report_type=ReportType.CUSTOM,
+            report_type=ReportType.TEAM,
             summary_text=summary
         )
         
         result = {
             "report_id": report["id"],
-            "report_type": "Custom",
+            "report_type": "Team",
             "generated_at": report["generated_at"],
             "summary": summary,
+            "reused": False,
+            "prompt_size": self.last_prompt.size() if self.last_prompt else None,
             "parameters": parameters,
-            "tasks": tasks
+            "statistics": stats
         }
+        await self._emit(on_event, "saved", {"report_id": result["report_id"], "generated_at": result["generated_at"]})
         
         # Generate Word document if requested
         if generate_doc:
             try:
-                doc_path = self.doc_writer.create_custom_report_document(result, user_data)
+                doc_path = self.doc_writer.create_team_report_document(result, user_data)
                 result["document_path"] = doc_path
+                await self.mcp.set_report_file_path(result["report_id"], doc_path)
+                await self._emit(on_event, "document", {"document_path": doc_path})
             except Exception as e:
                 print(f"Failed to generate Word document: {e}")
         
         return result
     
-    def _generate_daily_summary(self, user_data: Dict, stats: Dict, tasks: List[Dict]) -> str:
+    async def _generate_daily_summary(self, user_data: Dict, stats: Dict, tasks: List[Dict],
+                                      on_event: Optional[ReportEventHandler] = None) -> str:
         """Generate a daily summary using AI logic"""
-        # Use LLM if available
-        if self.llm_provider:
-            try:
-                # Safely access user data
-                user_name = user_data.get('name', 'User') if isinstance(user_data, dict) else 'User'
-                
-                # Enhanced prompt with more context and structured analysis
-                prompt = f"""
-                As an AI Productivity Analyst, generate a comprehensive daily productivity report for {user_name}.
-                
-                USER PROFILE:
-                Name: {user_name}
-                Role: {user_data.get('role', 'N/A') if isinstance(user_data, dict) else 'N/A'}
-                
-                TODAY'S PRODUCTIVITY SNAPSHOT:
-                - Total Tasks: {stats.get('total_tasks', 0) if isinstance(stats, dict) else 0}
-                - Completed Tasks: {stats.get('completed_tasks', 0) if isinstance(stats, dict) else 0}
-                - Completion Rate: {stats.get('completion_rate', 0) if isinstance(stats, dict) else 0}%
-                - Status Distribution: {stats.get('status_distribution', {}) if isinstance(stats, dict) else {}}
-                - Status Changes: {stats.get('status_changes', 0) if isinstance(stats, dict) else 0}
-                
-                TODAY'S TASK PORTFOLIO:
-                {self._format_tasks_briefly(tasks[:10] if isinstance(tasks, list) else [])}
-                
-                CRITICAL INSIGHTS FROM STATUS NOTES:
-                {self._format_all_notes(stats.get('all_notes', [])[:20] if isinstance(stats, dict) else [])}
-                
-                INSTRUCTIONS:
-                1. Provide a professional executive summary (2-3 sentences) highlighting today's key achievements and areas for improvement
-                2. Analyze productivity patterns and identify factors contributing to success or challenges
-                3. Offer 3 specific, actionable recommendations for tomorrow based on today's performance
-                4. Predict potential challenges for tomorrow based on today's unfinished tasks
-                5. Suggest a focus area for tomorrow that aligns with the user's role and current task load
-                6. Use a professional, encouraging tone with data-driven insights
-                7. Format the response with clear sections: Executive Summary, Performance Analysis, Tomorrow's Recommendations, Focus Area
-                """
-                
-                response = self.llm_provider.generate_text(prompt, max_output_tokens=1500, temperature=0.7)
-                if response:
-                    return response
-            except Exception as e:
-                print(f"Error generating summary with LLM: {e}")
-        
-        # Fallback to template-based summary
-        # Safely access user data
-        user_name = user_data.get('name', 'User') if isinstance(user_data, dict) else 'User'
-        user_email = user_data.get('email', 'user@example.com') if isinstance(user_data, dict) else 'user@example.com'
-        user_role = user_data.get('role', 'N/A') if isinstance(user_data, dict) else 'N/A'
-        
-        # Safely access stats data
-        total_tasks = stats.get('total_tasks', 0) if isinstance(stats, dict) else 0
-        completed_tasks = stats.get('completed_tasks', 0) if isinstance(stats, dict) else 0
-        completion_rate = stats.get('completion_rate', 0) if isinstance(stats, dict) else 0
-        status_distribution = stats.get('status_distribution', {}) if isinstance(stats, dict) else {}
-        status_changes = stats.get('status_changes', 0) if isinstance(stats, dict) else 0
-        all_notes = stats.get('all_notes', []) if isinstance(stats, dict) else []
-        
-        return f"""
-DAILY PRODUCTIVITY REPORT
-=========================
-
-Prepared for: {user_name} ({user_email})
-Role: {user_role}
-Date: {datetime.now().strftime('%B %d, %Y')}
-Report Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-
-EXECUTIVE SUMMARY
------------------
-Today's productivity snapshot shows {total_tasks} active tasks with {completed_tasks} completed, 
-resulting in a {completion_rate}% completion rate. There have been {status_changes} status 
-updates across all tasks today.
-
-TASK METRICS
-------------
-• Total Tasks: {total_tasks}
-• Completed Tasks: {completed_tasks}
-• In Progress: {status_distribution.get('In Progress', 0)}
-• Pending: {status_distribution.get('Pending', 0)}
-• Overdue: {status_distribution.get('Overdue', 0)}
-• Completion Rate: {completion_rate}%
-
-RECENT ACTIVITIES
------------------
-{self._format_tasks_briefly(tasks[:10] if isinstance(tasks, list) else [])}
-
-STATUS NOTES
-------------
-{self._format_all_notes(all_notes[:15])}
-
-KEY INSIGHTS
-------------
-1. Current focus should be on completing pending tasks to improve completion rate
-2. Maintain momentum on in-progress tasks to ensure timely completion
-3. Review any overdue tasks and adjust priorities if necessary
-
-RECOMMENDATIONS
----------------
-• Prioritize tasks that are closest to their deadline
-• Break down complex tasks into smaller, manageable subtasks
-• Schedule focused work time for high-priority items
-        """.strip()
+        return await self._generate_summary("daily", ReportProfile.from_user(user_data), ReportStats.from_statistics(stats),
+                                            tasks if isinstance(tasks, list) else [], on_event=on_event)
     
-    def _generate_weekly_summary(self, user_data: Dict, tasks: list, stats: Dict) -> str:
+    async def _generate_weekly_summary(self, user_data: Dict, tasks: list, stats: Dict,
+                                       on_event: Optional[ReportEventHandler] = None) -> str:
         """Generate a weekly summary using AI logic"""
-        # Use LLM if available
-        if self.llm_provider:
-            try:
-                # Safely access user data
-                user_name = user_data.get('name', 'User') if isinstance(user_data, dict) else 'User'
-                user_role = user_data.get('role', 'N/A') if isinstance(user_data, dict) else 'N/A'
-                
-                # Enhanced prompt with more context and structured analysis
-                prompt = f"""
-                As an AI Productivity Consultant, generate a comprehensive weekly productivity analysis for {user_name}, who works as a {user_role}.
-                
-                USER PROFILE:
-                Name: {user_name}
-                Role: {user_role}
-                
-                WEEKLY PERFORMANCE DASHBOARD:
-                - Total Tasks Managed: {stats.get('total_tasks', 0) if isinstance(stats, dict) else 0}
-                - Tasks Completed: {stats.get('completed_tasks', 0) if isinstance(stats, dict) else 0}
-                - Completion Rate: {stats.get('completion_rate', 0) if isinstance(stats, dict) else 0}%
-                - Status Distribution: {stats.get('status_distribution', {}) if isinstance(stats, dict) else {}}
-                - Status Updates: {stats.get('status_changes', 0) if isinstance(stats, dict) else 0}
-                - Average Completion Time: {stats.get('avg_completion_time_hours', 0) if isinstance(stats, dict) else 0} hours
-                
-                PRODUCTIVITY PATTERNS ANALYSIS:
-                - Most Productive Day: {stats.get('most_productive_day', ('N/A', 0))[0] if isinstance(stats, dict) and isinstance(stats.get('most_productive_day'), tuple) else 'N/A'} ({stats.get('most_productive_day', ('N/A', 0))[1] if isinstance(stats, dict) and isinstance(stats.get('most_productive_day'), tuple) else '0'} tasks)
-                - Least Productive Day: {stats.get('least_productive_day', ('N/A', 0))[0] if isinstance(stats, dict) and isinstance(stats.get('least_productive_day'), tuple) else 'N/A'} ({stats.get('least_productive_day', ('N/A', 0))[1] if isinstance(stats, dict) and isinstance(stats.get('least_productive_day'), tuple) else '0'} tasks)
-                - Average Daily Task Load: {stats.get('avg_tasks_per_day', 0) if isinstance(stats, dict) else 0:.1f} tasks
-                
-                SIGNIFICANT TASKS THIS WEEK:
-                {self._format_tasks_briefly(tasks[:15] if isinstance(tasks, list) else [])}
-                
-                CRITICAL INSIGHTS FROM STATUS NOTES:
-                {self._format_all_notes(stats.get('all_notes', [])[:30] if isinstance(stats, dict) else [])}
-                
-                INSTRUCTIONS:
-                1. Provide a professional executive summary (3-4 sentences) highlighting this week's key achievements and productivity trends
-                2. Analyze productivity patterns and identify factors contributing to peak performance days vs. low performance days
-                3. Offer 4 specific, actionable recommendations for next week based on this week's performance
-                4. Identify skill development opportunities based on task types and challenges encountered
-                5. Predict potential challenges for next week based on unfinished tasks and patterns
-                6. Suggest a strategic focus area for next week that aligns with the user's role and long-term goals
-                7. Include a brief SWOT analysis (Strengths, Weaknesses, Opportunities, Threats) based on the week's data
-                8. Use a professional, data-driven tone with insights tailored to the user's role
-                9. Format the response with clear sections: Executive Summary, Productivity Analysis, Next Week Recommendations, Strategic Focus, SWOT Analysis
-                """
-                
-                response = self.llm_provider.generate_text(prompt, max_output_tokens=2000, temperature=0.7)
-                if response:
-                    return response
-            except Exception as e:
-                print(f"Error generating summary with LLM: {e}")
-        
-        # Fallback to template-based summary
-        # Safely access user data
-        user_name = user_data.get('name', 'User') if isinstance(user_data, dict) else 'User'
-        user_email = user_data.get('email', 'user@example.com') if isinstance(user_data, dict) else 'user@example.com'
-        user_role = user_data.get('role', 'N/A') if isinstance(user_data, dict) else 'N/A'
-        
-        # Safely access stats data
-        total_tasks = stats.get('total_tasks', 0) if isinstance(stats, dict) else 0
-        completed_tasks = stats.get('completed_tasks', 0) if isinstance(stats, dict) else 0
-        in_progress_tasks = stats.get('in_progress_tasks', 0) if isinstance(stats, dict) else 0
-        pending_tasks = stats.get('pending_tasks', 0) if isinstance(stats, dict) else 0
-        overdue_tasks = stats.get('overdue_tasks', 0) if isinstance(stats, dict) else 0
-        completion_rate = stats.get('completion_rate', 0) if isinstance(stats, dict) else 0
-        status_distribution = stats.get('status_distribution', {}) if isinstance(stats, dict) else {}
-        status_changes = stats.get('status_changes', 0) if isinstance(stats, dict) else 0
-        avg_completion_time = stats.get('avg_completion_time_hours', 0) if isinstance(stats, dict) else 0
-        most_productive_day = stats.get('most_productive_day', ('N/A', 0)) if isinstance(stats, dict) else ('N/A', 0)
-        least_productive_day = stats.get('least_productive_day', ('N/A', 0)) if isinstance(stats, dict) else ('N/A', 0)
-        avg_tasks_per_day = stats.get('avg_tasks_per_day', 0) if isinstance(stats, dict) else 0
-        all_notes = stats.get('all_notes', []) if isinstance(stats, dict) else []
-        
-        return f"""
-WEEKLY PRODUCTIVITY REPORT
-==========================
-
-Prepared for: {user_name} ({user_email})
-Role: {user_role}
-Period: Last 7 Days
-Report Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-
-EXECUTIVE SUMMARY
------------------
-This week, you managed {total_tasks} tasks with {completed_tasks} completed, 
-achieving a {completion_rate}% completion rate. You made {status_changes} status 
-updates across all tasks, with an average completion time of {avg_completion_time} hours.
-
-PRODUCTIVITY ANALYSIS
----------------------
-• Most Productive Day: {most_productive_day[0]} ({most_productive_day[1]} tasks)
-• Least Productive Day: {least_productive_day[0]} ({least_productive_day[1]} tasks)
-• Average Daily Task Load: {avg_tasks_per_day} tasks
-• In Progress: {in_progress_tasks}
-• Pending: {pending_tasks}
-• Overdue: {overdue_tasks}
-
-SIGNIFICANT TASKS
------------------
-{self._format_tasks_briefly(tasks[:15] if isinstance(tasks, list) else [])}
-
-STATUS NOTES
-------------
-{self._format_all_notes(all_notes[:30])}
-
-KEY INSIGHTS
-------------
-1. Your productivity peaks on {most_productive_day[0]}, consider scheduling important tasks on this day
-2. Focus on reducing pending tasks ({pending_tasks}) to improve completion rate
-3. Monitor overdue tasks ({overdue_tasks}) to prevent further delays
-4. Your average completion time of {avg_completion_time} hours suggests good time management
-
-RECOMMENDATIONS
----------------
-• Schedule challenging tasks on your most productive day ({most_productive_day[0]})
-• Set aside dedicated time each day to address pending tasks
-• Implement a system to track and reduce overdue tasks
-• Consider delegating or breaking down tasks that take longer than average
-• Plan next week's tasks in advance to maintain consistent productivity
-        """.strip()
+        return await self._generate_summary("weekly", ReportProfile.from_user(user_data), ReportStats.from_statistics(stats),
+                                            tasks if isinstance(tasks, list) else [], on_event=on_event)
     
-    def _generate_monthly_summary(self, user_data: Dict, stats: Dict, tasks: List[Dict]) -> str:
+    async def _generate_monthly_summary(self, user_data: Dict, stats: Dict, tasks: List[Dict],
+                                        on_event: Optional[ReportEventHandler] = None) -> str:
         """Generate a monthly summary using AI logic"""
-        # Use LLM if available
+        return await self._generate_summary("monthly", ReportProfile.from_user(user_data), ReportStats.from_statistics(stats),
+                                            tasks if isinstance(tasks, list) else [], on_event=on_event)
+    
+    async def _generate_custom_summary(self, user_data: Dict, tasks: List[Dict], parameters: Dict[str, Any],
+                                       on_event: Optional[ReportEventHandler] = None) -> str:
+        """Generate a custom summary using AI logic"""
+        return await self._generate_summary("custom", ReportProfile.from_user(user_data), ReportStats(),
+                                            tasks if isinstance(tasks, list) else [], parameters=parameters,
+                                            on_event=on_event)
+    
+    async def _generate_team_summary(self, user_data: Dict, stats: Dict, parameters: Dict[str, Any],
+                                     on_event: Optional[ReportEventHandler] = None) -> str:
+        """Generate a team summary using AI logic"""
+        if parameters["user_ids"] is not None:
+            scope = f"{stats['member_count']} selected team members"
+        elif parameters["role"]:
+            scope = f"all active members with the {parameters['role']} role"
+        else:
+            scope = "the whole organization"
+        context = {"profile": ReportProfile.from_user(user_data), "team": stats, "scope": scope}
+        
+        self.last_summary_from_llm = False
+        
         if self.llm_provider:
             try:
-                # Safely access user data
-                user_name = user_data.get('name', 'User') if isinstance(user_data, dict) else 'User'
-                user_role = user_data.get('role', 'N/A') if isinstance(user_data, dict) else 'N/A'
-                
-                # Enhanced prompt with more context and structured analysis
-                prompt = f"""
-                As an AI Productivity Strategist, generate a comprehensive monthly productivity review for {user_name}, who works as a {user_role}.
-                
-                USER PROFILE:
-                Name: {user_name}
-                Role: {user_role}
-                
-                MONTHLY PERFORMANCE OVERVIEW:
-                - Total Tasks Managed: {stats.get('total_tasks', 0) if isinstance(stats, dict) else 0}
-                - Tasks Completed: {stats.get('completed_tasks', 0) if isinstance(stats, dict) else 0}
-                - Completion Rate: {stats.get('completion_rate', 0) if isinstance(stats, dict) else 0}%
-                - Status Distribution: {stats.get('status_distribution', {}) if isinstance(stats, dict) else {}}
-                - Status Updates: {stats.get('status_changes', 0) if isinstance(stats, dict) else 0}
-                - Average Completion Time: {stats.get('avg_completion_time_hours', 0) if isinstance(stats, dict) else 0} hours
-                
-                PRODUCTIVITY TREND ANALYSIS:
-                - Most Productive Day: {stats.get('most_productive_day', ('N/A', 0))[0] if isinstance(stats, dict) and isinstance(stats.get('most_productive_day'), tuple) else 'N/A'} ({stats.get('most_productive_day', ('N/A', 0))[1] if isinstance(stats, dict) and isinstance(stats.get('most_productive_day'), tuple) else '0'} tasks)
-                - Least Productive Day: {stats.get('least_productive_day', ('N/A', 0))[0] if isinstance(stats, dict) and isinstance(stats.get('least_productive_day'), tuple) else 'N/A'} ({stats.get('least_productive_day', ('N/A', 0))[1] if isinstance(stats, dict) and isinstance(stats.get('least_productive_day'), tuple) else '0'} tasks)
-                - Average Daily Task Load: {stats.get('avg_tasks_per_day', 0) if isinstance(stats, dict) else 0:.1f} tasks
-                
-                NOTABLE MONTHLY ACHIEVEMENTS:
-                {self._format_tasks_briefly(tasks[:20] if isinstance(tasks, list) else [])}
-                
-                CRITICAL INSIGHTS FROM STATUS NOTES:
-                {self._format_all_notes(stats.get('all_notes', [])[:50] if isinstance(stats, dict) else [])}
-                
-                INSTRUCTIONS:
-                1. Provide a professional executive summary (4-5 sentences) highlighting this month's key achievements and overall productivity trends
-                2. Analyze monthly productivity patterns and identify consistent high-performance and low-performance periods
-                3. Offer 5 specific, strategic recommendations for next month based on this month's performance
-                4. Identify skill development opportunities based on task types and challenges encountered
-                5. Predict potential challenges for next month based on unfinished tasks and patterns
-                6. Suggest quarterly goals that align with the user's role and long-term objectives
-                7. Include a comprehensive SWOT analysis (Strengths, Weaknesses, Opportunities, Threats) based on the month's data
-                8. Recommend process improvements to enhance productivity and efficiency
-                9. Use a professional, strategic tone with insights tailored to the user's role
-                10. Format the response with clear sections: Executive Summary, Monthly Analysis, Strategic Recommendations, Quarterly Goals, SWOT Analysis, Process Improvements
-                """
-                
-                response = self.llm_provider.generate_text(prompt, max_output_tokens=2500, temperature=0.7)
+                builder = PromptBuilder(self.prompt_token_budget)
+                builder.add_text("context", self.templates.render("team", "context", **context))
+                builder.add_text("instructions", self.templates.render("team", "instructions", **context))
+                self.last_prompt = builder.build()
+                response = await self._complete(self.last_prompt.text, max_output_tokens=self.SUMMARY_MAX_OUTPUT_TOKENS["team"],
+                                                report_type="team", on_event=on_event)
                 if response:
+                    self.last_summary_from_llm = True
                     return response
             except Exception as e:
                 print(f"Error generating summary with LLM: {e}")
         
         # Fallback to template-based summary
-        # Safely access user data
-        user_name = user_data.get('name', 'User') if isinstance(user_data, dict) else 'User'
-        user_email = user_data.get('email', 'user@example.com') if isinstance(user_data, dict) else 'user@example.com'
-        user_role = user_data.get('role', 'N/A') if isinstance(user_data, dict) else 'N/A'
-        
-        # Safely access stats data
-        total_tasks = stats.get('total_tasks', 0) if isinstance(stats, dict) else 0
-        completed_tasks = stats.get('completed_tasks', 0) if isinstance(stats, dict) else 0
-        in_progress_tasks = stats.get('in_progress_tasks', 0) if isinstance(stats, dict) else 0
-        pending_tasks = stats.get('pending_tasks', 0) if isinstance(stats, dict) else 0
-        overdue_tasks = stats.get('overdue_tasks', 0) if isinstance(stats, dict) else 0
-        completion_rate = stats.get('completion_rate', 0) if isinstance(stats, dict) else 0
-        status_distribution = stats.get('status_distribution', {}) if isinstance(stats, dict) else {}
-        status_changes = stats.get('status_changes', 0) if isinstance(stats, dict) else 0
-        avg_completion_time = stats.get('avg_completion_time_hours', 0) if isinstance(stats, dict) else 0
-        most_productive_day = stats.get('most_productive_day', ('N/A', 0)) if isinstance(stats, dict) else ('N/A', 0)
-        least_productive_day = stats.get('least_productive_day', ('N/A', 0)) if isinstance(stats, dict) else ('N/A', 0)
-        avg_tasks_per_day = stats.get('avg_tasks_per_day', 0) if isinstance(stats, dict) else 0
-        all_notes = stats.get('all_notes', []) if isinstance(stats, dict) else []
-        
-        return f"""
-MONTHLY PRODUCTIVITY REPORT
-===========================
-
-Prepared for: {user_name} ({user_email})
-Role: {user_role}
-Period: Last 30 Days
-Report Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-
-EXECUTIVE SUMMARY
------------------
-Over the past month, you managed {total_tasks} tasks with {completed_tasks} completed, 
-achieving a {completion_rate}% completion rate. With {status_changes} status updates 
-and an average completion time of {avg_completion_time} hours, your productivity has 
-been consistent throughout the month.
-
-MONTHLY ANALYSIS
-----------------
-• Most Productive Day: {most_productive_day[0]} ({most_productive_day[1]} tasks)
-• Least Productive Day: {least_productive_day[0]} ({least_productive_day[1]} tasks)
-• Average Daily Task Load: {avg_tasks_per_day} tasks
-• In Progress: {in_progress_tasks}
-• Pending: {pending_tasks}
-• Overdue: {overdue_tasks}
-
-NOTABLE ACHIEVEMENTS
---------------------
-{self._format_tasks_briefly(tasks[:20] if isinstance(tasks, list) else [])}
-
-STATUS NOTES
-------------
-{self._format_all_notes(all_notes[:50])}
-
-SWOT ANALYSIS
--------------
-Strengths:
-• Consistent daily task management with an average of {avg_tasks_per_day} tasks per day
-• Strong completion rate of {completion_rate}%
-• Effective time management with average completion time of {avg_completion_time} hours
-
-Weaknesses:
-• {pending_tasks} pending tasks that need attention
-• {overdue_tasks} overdue tasks that require immediate action
-• Inconsistent productivity on {least_productive_day[0]}
-
-Opportunities:
-• Leverage peak productivity on {most_productive_day[0]} for challenging tasks
-• Implement systems to reduce pending and overdue tasks
-• Develop skills in areas where tasks take longer than average
-
-Threats:
-• Accumulation of pending tasks may impact future productivity
-• Overdue tasks may create additional stress and pressure
-• Inconsistent daily productivity may affect long-term goals
-
-STRATEGIC RECOMMENDATIONS
--------------------------
-1. Schedule your most challenging tasks on {most_productive_day[0]} to maximize efficiency
-2. Implement a daily review system to prevent tasks from becoming overdue
-3. Dedicate 30 minutes each day to address pending tasks
-4. Analyze tasks with longer completion times to identify improvement opportunities
-5. Set weekly mini-goals to maintain consistent progress toward monthly objectives
-
-QUARTERLY GOALS
----------------
-• Increase completion rate to 85% or higher
-• Reduce pending tasks to under 5 at any given time
-• Eliminate overdue tasks entirely
-• Improve average completion time by 15%
-• Complete at least 90% of tasks before their deadline
-        """.strip()
+        return self.templates.render("team", "fallback", now=datetime.now(), **context).strip()
     
-    def _generate_custom_summary(self, user_data: Dict, tasks: List[Dict], parameters: Dict[str, Any]) -> str:
-        """Generate a custom summary using AI logic"""
+    def _summary_prompt(self, report_type: str, context: Dict[str, Any]) -> str:
+        """Render a summary's prompt from the report type's templates and fit it into the token budget"""
+        tasks_heading, notes_heading = self.SUMMARY_HEADINGS[report_type]
+        return self._build_prompt(
+            self.templates.render(report_type, "context", **context),
+            tasks_heading=tasks_heading,
+            tasks=context["tasks"],
+            notes_heading=notes_heading,
+            notes=context["stats"].notes,
+            instructions=self.templates.render(report_type, "instructions", **context)
+        )
+    
+    async def _generate_summary(self, report_type: str, profile: ReportProfile, stats: ReportStats,
+                                tasks: List[TaskRecord], parameters: Optional[Dict[str, Any]] = None,
+                                on_event: Optional[ReportEventHandler] = None) -> str:
+        """Ask the LLM for a summary, falling back to the report type's template summary
+        
+        The prompt and the fallback are rendered from the report type's
+        templates (see report_templates.py).
+        """
+        context = {"profile": profile, "stats": stats, "tasks": tasks, "parameters": parameters}
+        
+        self.last_summary_from_llm = False
+        
         # Use LLM if available
         if self.llm_provider:
             try:
-                # Safely access user data
-                user_name = user_data.get('name', 'User') if isinstance(user_data, dict) else 'User'
-                user_role = user_data.get('role', 'N/A') if isinstance(user_data, dict) else 'N/A'
-                
-                # Enhanced prompt with more context and structured analysis
-                prompt = f"""
-                As an AI Productivity Analyst, generate a custom productivity report for {user_name}, who works as a {user_role}.
-                
-                USER PROFILE:
-                Name: {user_name}
-                Role: {user_role}
-                
-                CUSTOM REPORT PARAMETERS:
-                {json.dumps(parameters, indent=2)}
-                
-                IDENTIFIED TASKS:
-                {self._format_tasks_briefly(tasks[:20] if isinstance(tasks, list) else [])}
-                
-                INSTRUCTIONS:
-                1. Provide a professional executive summary (3-4 sentences) highlighting key findings based on the custom parameters
-                2. Analyze the tasks according to the specified parameters
-                3. Offer specific, actionable recommendations based on the custom analysis
-                4. Identify patterns or trends in the filtered task set
-                5. Suggest improvements or next steps based on the custom parameters
-                6. Use a professional, analytical tone with insights tailored to the custom parameters
-                7. Format the response with clear sections: Executive Summary, Parameter Analysis, Recommendations, Next Steps
-                """
-                
-                response = self.llm_provider.generate_text(prompt, max_output_tokens=2000, temperature=0.7)
+                prompt = self._summary_prompt(report_type, context)
+                response = await self._complete(prompt, max_output_tokens=self.SUMMARY_MAX_OUTPUT_TOKENS[report_type],
+                                                report_type=report_type, on_event=on_event)
                 if response:
+                    self.last_summary_from_llm = True
                     return response
             except Exception as e:
                 print(f"Error generating summary with LLM: {e}")
         
         # Fallback to template-based summary
-        # Safely access user data
-        user_name = user_data.get('name', 'User') if isinstance(user_data, dict) else 'User'
-        user_email = user_data.get('email', 'user@example.com') if isinstance(user_data, dict) else 'user@example.com'
-        user_role = user_data.get('role', 'N/A') if isinstance(user_data, dict) else 'N/A'
-        
-        return f"""
-CUSTOM PRODUCTIVITY REPORT
-==========================
-
-Prepared for: {user_name} ({user_email})
-Role: {user_role}
-Parameters: {json.dumps(parameters, indent=2)}
-Report Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-
-EXECUTIVE SUMMARY
------------------
-This custom report analyzes your tasks based on the specified parameters. 
-The analysis covers {len(tasks)} tasks that match your criteria.
-
-PARAMETER ANALYSIS
-------------------
-Based on your custom parameters, the following tasks were identified:
-{self._format_tasks_briefly(tasks[:20] if isinstance(tasks, list) else [])}
-
-KEY INSIGHTS
-------------
-1. Custom parameter analysis reveals unique productivity patterns
-2. Filtered task set shows specific areas requiring attention
-3. Opportunity for targeted skill development in identified areas
-
-RECOMMENDATIONS
----------------
-• Review the filtered task set to identify common characteristics
-• Implement strategies specific to the tasks matching your parameters
-• Set goals based on the patterns identified in this custom analysis
-• Consider adjusting parameters for future custom reports to gain deeper insights
-        """.strip()
-    
-    def _format_tasks_briefly(self, tasks: List[Dict]) -> str:
-        """Format tasks for brief display in summaries"""
-        if not tasks:
-            return "No tasks found."
-        
-        formatted_tasks = []
-        for i, task in enumerate(tasks[:10], 1):  # Limit to first 10 tasks
-            if isinstance(task, dict):
-                title = task.get('title', 'Untitled Task')
-                status = task.get('status', 'Unknown')
-                formatted_tasks.append(f"{i}. {title} [{status}]")
-            else:
-                formatted_tasks.append(f"{i}. Unknown Task Format")
-        
-        return "\n".join(formatted_tasks)
+        return self.templates.render(report_type, "fallback", now=datetime.now(), **context).strip()
     
-    def _format_all_notes(self, notes: List[Dict]) -> str:
-        """Format all status notes for display in summaries"""
-        if not notes:
-            return "No status notes available."
-        
-        formatted_notes = []
-        for i, note in enumerate(notes[:10], 1):  # Limit to first 10 notes
-            if isinstance(note, dict):
-                status = note.get('status', 'Unknown')
-                note_text = note.get('note', 'No note provided')
-                updated_at = note.get('updated_at', 'Unknown date')
-                # Extract just the date part
-                if updated_at and 'T' in updated_at:
-                    updated_at = updated_at.split('T')[0]
-                formatted_notes.append(f"{i}. [{status}] {updated_at}: {note_text}")
-            else:
-                formatted_notes.append(f"{i}. Unknown Note Format")
-        
-        return "\n".join(formatted_notes)
\ No newline at end of file
+    async def _generate_combined_summaries(self, snapshots: Dict[ReportType, ReportDataSnapshot]
+                                           ) -> Dict[ReportType, Tuple[str, BuiltPrompt]]:
+        """Ask for the summaries of several period reports in a single LLM call
+        
+        Each report's prompt is built as for its own call and placed under a
+        marker line; the response is split on the same markers.
+        
+        Returns:
+            Dict[ReportType, Tuple[str, BuiltPrompt]]: The summaries found in the
+                response, with the prompt each was written from; empty if the call failed
+        """
+        prompts = {}
+        sections = []
+        for report_type, snapshot in snapshots.items():
+            period = PERIOD_REPORTS[report_type]
+            context = {"profile": ReportProfile.from_user(snapshot.user),
+                       "stats": ReportStats.from_statistics(snapshot.statistics()),
+                       "tasks": snapshot.tasks, "parameters": None}
+            sections.append(f"{COMBINED_SUMMARY_MARKER.format(report_type.name)}\n{self._summary_prompt(period, context)}")
+            prompts[report_type] = self.last_prompt
+        
+        markers = [COMBINED_SUMMARY_MARKER.format(report_type.name) for report_type in snapshots]
+        prompt = "\n\n".join([self.templates.render("combined", "instructions", markers=markers), *sections])
+        max_output_tokens = sum(self.SUMMARY_MAX_OUTPUT_TOKENS[PERIOD_REPORTS[report_type]] for report_type in snapshots)
+        try:
+            response = await self._complete(prompt, max_output_tokens=max_output_tokens, report_type="combined")
+        except Exception as e:
+            print(f"Error generating combined summaries with LLM: {e}")
+            return {}
+        
+        summaries = {}
+        matches = list(_COMBINED_SUMMARY_MARKER_RE.finditer(response or ""))
+        for match, following in zip(matches, matches[1:] + [None]):
+            report_type = ReportType[match.group(1)]
+            summary = response[match.end():following.start() if following else len(response)].strip()
+            if report_type in snapshots and summary:
+                summaries[report_type] = (summary, prompts[report_type])
+        if len(summaries) < len(snapshots):
+            llm_metrics.increment("llm_combined_summaries_missing_total", len(snapshots) - len(summaries))
+        return summaries
@@ -0,0 +1,260 @@
+"""
+Background report generation jobs
+
+A job is a row in report_jobs, so queued and finished jobs outlive the
+process that created them. ReportJobQueue is the in-process worker backend:
+a few asyncio tasks on the application's event loop claim queued jobs and run
+them through the shared ReportAgent, recording progress as the agent emits
+events. Claims are a conditional UPDATE, so several processes can work on the
+same table without running a job twice.
+"""
+import asyncio
+import json
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from agents.mcp_client import MCPClient
+from agents.report_agent import ReportAgent, ReportEventHandler
+from agents.report_records import report_to_dict
+from models.db_schemes.schemes.report_job import Report_Job
+from models.enums.job_status import JobStatus
+from models.enums.report_type import ReportType
+
+logger = logging.getLogger(__name__)
+
+# Progress, in percent, once the agent has emitted each event
+PROGRESS = {"stats": 25, "summary": 70, "saved": 85, "document": 95}
+
+
+def job_to_dict(job: Report_Job) -> Dict[str, Any]:
+    """Serialize a job for the polling endpoint"""
+    def isoformat(value: Optional[datetime]) -> Optional[str]:
+        return value.isoformat() if value else None
+
+    return {
+        "job_id": job.id,
+        "report_type": job.report_type.value,
+        "status": job.status.value,
+        "progress": job.progress,
+        "stage": job.stage,
+        "attempts": job.attempts,
+        "max_attempts": job.max_attempts,
+        "result": job.result,
+        "error": job.error,
+        "created_at": isoformat(job.created_at),
+        "started_at": isoformat(job.started_at),
+        "finished_at": isoformat(job.finished_at)
+    }
+
+
+def _result_to_json(result: Dict[str, Any]) -> Dict[str, Any]:
+    """The stored result: the report details without the task list, which can be large"""
+    data = report_to_dict({key: value for key, value in result.items() if key != "tasks"})
+    if "tasks" in result:
+        data["task_count"] = len(result["tasks"])
+    return json.loads(json.dumps(data, default=str))
+
+
+class ReportJobQueue:
+    """Persistent report job queue with an in-process pool of workers"""
+
+    def __init__(self, session_factory: Callable[[], AsyncSession], report_agent: ReportAgent,
+                 workers: int = 2, max_attempts: int = 3, retry_delay_seconds: float = 30.0,
+                 stale_seconds: float = 600.0, poll_seconds: float = 2.0, use_rollups: bool = False):
+        """
+        Args:
+            session_factory (Callable): Creates the sessions jobs are stored and run with
+            report_agent (ReportAgent): Application-scoped agent; each job runs on a bound copy
+            workers (int): Jobs run at the same time by this process
+            max_attempts (int): Attempts per job before it is marked failed
+            retry_delay_seconds (float): Delay before the first retry; doubles with each attempt
+            stale_seconds (float): A running job without progress for this long is
+                assumed lost with its worker and queued again
+            poll_seconds (float): How often idle workers look for jobs queued by other processes
+            use_rollups (bool): Passed to the MCPClient of each job
+        """
+        self.session_factory = session_factory
+        self.report_agent = report_agent
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.retry_delay_seconds = retry_delay_seconds
+        self.stale_seconds = stale_seconds
+        self.poll_seconds = poll_seconds
+        self.use_rollups = use_rollups
+        self._wakeup = asyncio.Event()
+        self._tasks: List[asyncio.Task] = []
+
+    async def enqueue(self, user_id: int, report_type: ReportType, parameters: Optional[Dict[str, Any]] = None,
+                      generate_document: bool = False, use_cache: bool = True, force: bool = False) -> Dict[str, Any]:
+        """Store a new job and wake a worker"""
+        now = datetime.utcnow()
+        job = Report_Job(user_id=user_id, report_type=report_type, parameters=parameters,
+                         generate_document=generate_document, use_cache=use_cache, force=force,
+                         status=JobStatus.QUEUED, progress=0, attempts=0, max_attempts=self.max_attempts,
+                         created_at=now, available_at=now)
+        async with self.session_factory() as db:
+            db.add(job)
+            await db.commit()
+            await db.refresh(job)
+        self._wakeup.set()
+        return job_to_dict(job)
+
+    async def get(self, job_id: int, user_id: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """Return a job, or None if it does not exist or belongs to another user"""
+        async with self.session_factory() as db:
+            job = await db.get(Report_Job, job_id)
+        if job is None or (user_id is not None and job.user_id != user_id):
+            return None
+        return job_to_dict(job)
+
+    async def start(self):
+        """Queue jobs orphaned by a previous process, then start the workers"""
+        try:
+            await self.requeue_stale()
+        except Exception:
+            # The reaper tries again; the database may simply not be up yet
+            logger.exception("Failed to requeue stale report jobs")
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._reaper()))
+
+    async def stop(self):
+        """Stop the workers; jobs they were running go back to the queue"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def run_pending(self) -> int:
+        """Run queued jobs on the calling task until none is available; returns how many ran"""
+        count = 0
+        while await self.run_next():
+            count += 1
+        return count
+
+    async def run_next(self) -> bool:
+        """Claim and run one available job; False if there was none"""
+        job = await self._claim()
+        if job is None:
+            return False
+        await self._run(job)
+        return True
+
+    async def requeue_stale(self) -> int:
+        """Queue running jobs whose worker stopped reporting progress, or fail them if out of attempts"""
+        now = datetime.utcnow()
+        stale = (Report_Job.status == JobStatus.RUNNING) & (Report_Job.heartbeat_at < now - timedelta(seconds=self.stale_seconds))
+        async with self.session_factory() as db:
+            retried = await db.execute(
+                update(Report_Job).where(stale, Report_Job.attempts < Report_Job.max_attempts)
+                .values(status=JobStatus.QUEUED, available_at=now, error="Worker stopped while running the job")
+            )
+            failed = await db.execute(
+                update(Report_Job).where(stale)
+                .values(status=JobStatus.FAILED, finished_at=now, error="Worker stopped while running the job")
+            )
+            await db.commit()
+        if retried.rowcount or failed.rowcount:
+            logger.warning(f"Report jobs left running: {retried.rowcount} queued again, {failed.rowcount} failed")
+        return retried.rowcount + failed.rowcount
+
+    async def _worker(self):
+        while True:
+            try:
+                # Cleared before looking, so a job queued meanwhile still wakes us
+                self._wakeup.clear()
+                if await self.run_next():
+                    continue
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_seconds)
+                except asyncio.TimeoutError:
+                    pass
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Report job worker failed")
+                await asyncio.sleep(self.poll_seconds)
+
+    async def _reaper(self):
+        while True:
+            await asyncio.sleep(max(self.stale_seconds / 4, self.poll_seconds))
+            try:
+                await self.requeue_stale()
+            except Exception:
+                logger.exception("Failed to requeue stale report jobs")
+
+    async def _claim(self) -> Optional[Report_Job]:
+        async with self.session_factory() as db:
+            while True:
+                now = datetime.utcnow()
+                job_id = await db.scalar(
+                    select(Report_Job.id)
+                    .where(Report_Job.status == JobStatus.QUEUED, Report_Job.available_at <= now)
+                    .order_by(Report_Job.available_at, Report_Job.id)
+                    .limit(1)
+                )
+                if job_id is None:
+                    return None
+                claimed = await db.execute(
+                    update(Report_Job).where(Report_Job.id == job_id, Report_Job.status == JobStatus.QUEUED)
+                    .values(status=JobStatus.RUNNING, attempts=Report_Job.attempts + 1, progress=0, stage=None,
+                            started_at=now, heartbeat_at=now)
+                )
+                await db.commit()
+                # Another worker claimed it first; look for the next one
+                if claimed.rowcount == 1:
+                    return await db.get(Report_Job, job_id)
+
+    async def _update(self, job_id: int, **values):
+        async with self.session_factory() as db:
+            await db.execute(update(Report_Job).where(Report_Job.id == job_id).values(**values))
+            await db.commit()
+
+    async def _generate(self, agent: ReportAgent, job: Report_Job, on_event: ReportEventHandler) -> Dict[str, Any]:
+        if job.report_type == ReportType.DAILY:
+            return await agent.generate_daily_report(job.user_id, job.generate_document, on_event=on_event,
+                                                     force=job.force)
+        if job.report_type == ReportType.WEEKLY:
+            return await agent.generate_weekly_report(job.user_id, job.generate_document, on_event=on_event,
+                                                      force=job.force)
+        if job.report_type == ReportType.MONTHLY:
+            return await agent.generate_monthly_report(job.user_id, job.generate_document, on_event=on_event,
+                                                       force=job.force)
+        if job.report_type == ReportType.CUSTOM:
+            return await agent.generate_custom_report(job.user_id, job.parameters or {}, job.generate_document,
+                                                      on_event=on_event, force=job.force)
+        raise ValueError(f"Unsupported report type for jobs: {job.report_type.value}")
+
+    async def _run(self, job: Report_Job):
+        async def on_event(event: str, data: Dict[str, Any]):
+            if event in PROGRESS:
+                await self._update(job.id, stage=event, progress=PROGRESS[event], heartbeat_at=datetime.utcnow())
+
+        try:
+            async with self.session_factory() as db:
+                mcp_client = MCPClient(db, session_factory=self.session_factory, use_rollups=self.use_rollups)
+                result = await self._generate(self.report_agent.bind(mcp_client, use_llm_cache=job.use_cache),
+                                              job, on_event)
+        except asyncio.CancelledError:
+            # Shutting down: the attempt was not the job's fault
+            await self._update(job.id, status=JobStatus.QUEUED, attempts=job.attempts - 1,
+                               available_at=datetime.utcnow())
+            raise
+        except Exception as e:
+            now = datetime.utcnow()
+            # ValueError covers a missing user and invalid custom filters, which fail the same way every time
+            if job.attempts < job.max_attempts and not isinstance(e, ValueError):
+                delay = self.retry_delay_seconds * 2 ** (job.attempts - 1)
+                await self._update(job.id, status=JobStatus.QUEUED, error=str(e),
+                                   available_at=now + timedelta(seconds=delay))
+                logger.warning(f"Report job {job.id} failed (attempt {job.attempts}), retrying in {delay:.0f}s: {e}")
+            else:
+                await self._update(job.id, status=JobStatus.FAILED, error=str(e), finished_at=now)
+                logger.error(f"Report job {job.id} failed: {e}")
+            return
+
+        await self._update(job.id, status=JobStatus.SUCCEEDED, progress=100, stage="done", error=None,
+                           result=_result_to_json(result), finished_at=datetime.utcnow())
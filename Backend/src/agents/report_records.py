@@ -0,0 +1,91 @@
+"""
+Compact typed records used inside the report pipeline
+
+Tasks and status events keep native datetimes and TaskStatus values while a
+report is being built; they are converted to JSON-friendly dicts only when a
+result leaves the API.
+"""
+from typing import Dict, List, Any, Optional, NamedTuple, Tuple
+from datetime import datetime
+
+from models.db_schemes.schemes.task import Task
+from models.db_schemes.schemes.task_status_history import Task_Status_History
+from models.enums.task_status import TaskStatus
+
+
+def _isoformat(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value else None
+
+
+class StatusEvent(NamedTuple):
+    """A single task status history entry"""
+    id: int
+    task_id: int
+    status: TaskStatus
+    updated_at: Optional[datetime]
+    note: Optional[str]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize to the dict shape returned by the API"""
+        return {
+            "id": self.id,
+            "task_id": self.task_id,
+            "status": self.status.value,
+            "updated_at": _isoformat(self.updated_at),
+            "note": self.note
+        }
+
+
+class TaskRecord(NamedTuple):
+    """A task with its status history ordered by update time"""
+    id: int
+    title: str
+    description: Optional[str]
+    status: TaskStatus
+    created_at: Optional[datetime]
+    updated_at: Optional[datetime]
+    history: Tuple[StatusEvent, ...] = ()
+
+    @property
+    def notes(self) -> List[StatusEvent]:
+        """History entries that carry a note"""
+        return [event for event in self.history if event.note is not None]
+
+    def to_dict(self, include_history: bool = True) -> Dict[str, Any]:
+        """Serialize to the dict shape returned by the API"""
+        data = {
+            "id": self.id,
+            "title": self.title,
+            "description": self.description,
+            "status": self.status.value,
+            "created_at": _isoformat(self.created_at),
+            "updated_at": _isoformat(self.updated_at)
+        }
+        if include_history:
+            data["status_history"] = [event.to_dict() for event in self.history]
+            data["all_notes"] = [event.to_dict() for event in self.notes]
+        return data
+
+
+# Columns selected for each record, in field order, so rows map straight onto
+# the records without building ORM instances
+TASK_RECORD_COLUMNS = (Task.id, Task.title, Task.description, Task.status, Task.created_at, Task.updated_at)
+STATUS_EVENT_COLUMNS = (Task_Status_History.id, Task_Status_History.task_id, Task_Status_History.status,
+                        Task_Status_History.updated_at, Task_Status_History.note)
+
+
+def statistics_to_dict(stats: Dict[str, Any]) -> Dict[str, Any]:
+    """Serialize a statistics dict whose notes are StatusEvent records"""
+    data = dict(stats)
+    data["all_notes"] = [note.to_dict() for note in stats.get("all_notes", [])]
+    return data
+
+
+def report_to_dict(report: Dict[str, Any]) -> Dict[str, Any]:
+    """Serialize a report result built by ReportAgent for an API response"""
+    data = dict(report)
+    if "tasks" in report:
+        data["tasks"] = [task.to_dict() for task in report["tasks"]]
+    if "statistics" in report:
+        data["statistics"] = statistics_to_dict(report["statistics"])
+    return data
@@ -0,0 +1,341 @@
+"""
+Scheduled bulk report generation
+
+ReportScheduler generates one report type for every active user. Users are
+read in ascending id order in batches (keyset pagination), and each batch
+runs through the shared ReportAgent with a bounded number of reports in
+flight. Report starts are paced twice: by an LLM rate limit shared by every
+run of the scheduler, and by spreading a run's users evenly over an off-peak
+window, so the nightly run never competes with the morning traffic.
+
+Progress is checkpointed in report_schedule_runs after each batch. A run
+that stops part way, whether it failed or its process died, resumes after
+the last finished batch; users of the unfinished batch who already got their
+report are skipped. Users whose report failed are retried a bounded number of
+times before their batch is checkpointed.
+
+Reports are built from the data up to the moment they are generated, so only
+the current period of a report type can be run.
+"""
+import asyncio
+import logging
+from datetime import date, datetime, time, timedelta
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from sqlalchemy import func, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from agents.mcp_client import MCPClient
+from agents.report_agent import ReportAgent
+from models.db_schemes.schemes.ai_report import AI_Report
+from models.db_schemes.schemes.report_schedule_run import Report_Schedule_Run
+from models.db_schemes.schemes.user import User
+from models.enums.job_status import JobStatus
+from models.enums.report_type import ReportType
+from models.enums.user_status import UserStatus
+
+logger = logging.getLogger(__name__)
+
+# Report types that can be scheduled, and the ReportAgent method generating each
+SCHEDULED_REPORT_TYPES = {
+    ReportType.DAILY: "generate_daily_report",
+    ReportType.WEEKLY: "generate_weekly_report",
+    ReportType.MONTHLY: "generate_monthly_report",
+}
+
+
+def parse_report_types(value: str) -> List[ReportType]:
+    """Parse a comma-separated list such as "daily,weekly"
+
+    Raises:
+        ValueError: If a name is not a schedulable report type
+    """
+    report_types = []
+    for name in filter(None, (part.strip().upper() for part in value.split(","))):
+        report_type = ReportType.__members__.get(name)
+        if report_type not in SCHEDULED_REPORT_TYPES:
+            raise ValueError(f"Cannot schedule report type: {name.lower()}")
+        report_types.append(report_type)
+    return report_types
+
+
+def period_start(report_type: ReportType, day: date) -> date:
+    """First day of the period a run on this day belongs to"""
+    if report_type == ReportType.WEEKLY:
+        return day - timedelta(days=day.weekday())
+    if report_type == ReportType.MONTHLY:
+        return day.replace(day=1)
+    return day
+
+
+def check_run_day(report_type: ReportType, day: date) -> date:
+    """Return the start of the period containing day, which must be the current period
+
+    Raises:
+        ValueError: If day is in a past or future period; its reports would be
+            built from today's data
+    """
+    period = period_start(report_type, day)
+    current = period_start(report_type, datetime.utcnow().date())
+    if period != current:
+        raise ValueError(f"Cannot run {report_type.value.lower()} reports for {day}: reports are built from "
+                         f"the current data, so only the period starting {current} can be run")
+    return period
+
+
+def run_to_dict(run: Report_Schedule_Run) -> Dict[str, Any]:
+    return {
+        "report_type": run.report_type.value,
+        "period_start": run.period_start.isoformat(),
+        "status": run.status.value,
+        "last_user_id": run.last_user_id,
+        "users_succeeded": run.users_succeeded,
+        "users_failed": run.users_failed,
+        "users_skipped": run.users_skipped,
+        "error": run.error,
+        "started_at": run.started_at.isoformat(),
+        "finished_at": run.finished_at.isoformat() if run.finished_at else None
+    }
+
+
+class RequestPacer:
+    """Spaces out starts so that consecutive ones are at least `interval` seconds apart"""
+
+    def __init__(self, interval: float = 0.0):
+        self.interval = interval
+        self._next_slot = 0.0
+
+    async def wait(self):
+        """Wait for the next free slot"""
+        if self.interval <= 0:
+            return
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        # Slots are reserved before sleeping, so concurrent callers queue up in order
+        slot = max(now, self._next_slot)
+        self._next_slot = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+class ReportScheduler:
+    """Generates a report type for every active user, resumably and at a controlled pace"""
+
+    def __init__(self, session_factory: Callable[[], AsyncSession], report_agent: ReportAgent,
+                 batch_size: int = 100, concurrency: int = 4, llm_calls_per_minute: float = 60.0,
+                 window_seconds: float = 0.0, generate_documents: bool = False,
+                 retry_attempts: int = 2, retry_delay_seconds: float = 30.0,
+                 stale_seconds: float = 600.0, use_rollups: bool = False):
+        """
+        Args:
+            session_factory (Callable): Creates the sessions runs are checkpointed and reports generated with
+            report_agent (ReportAgent): Application-scoped agent; each report runs on a bound copy
+            batch_size (int): Users read and checkpointed at a time
+            concurrency (int): Reports generated at the same time, across runs
+            llm_calls_per_minute (float): Reports started per minute, across runs; each
+                makes one LLM call. 0 disables the limit
+            window_seconds (float): Spread the users of a run evenly over this long after
+                it starts; 0 runs them as fast as the other limits allow
+            generate_documents (bool): Also write the Word document of each report
+            retry_attempts (int): Extra attempts for each user whose report failed,
+                made before the batch is checkpointed
+            retry_delay_seconds (float): Delay before the first retry; doubles with each attempt
+            stale_seconds (float): A running run without a heartbeat for this long is
+                assumed dead and may be resumed by another process
+            use_rollups (bool): Passed to the MCPClient of each report
+        """
+        self.session_factory = session_factory
+        self.report_agent = report_agent
+        self.batch_size = batch_size
+        self.window_seconds = window_seconds
+        self.generate_documents = generate_documents
+        self.retry_attempts = retry_attempts
+        self.retry_delay_seconds = retry_delay_seconds
+        self.stale_seconds = stale_seconds
+        self.use_rollups = use_rollups
+        self.rate_limit = RequestPacer(60.0 / llm_calls_per_minute if llm_calls_per_minute > 0 else 0.0)
+        self._semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(self, report_type: ReportType, day: Optional[date] = None) -> Dict[str, Any]:
+        """Generate the report type for every active user, for the period containing day (default today)
+
+        Returns the run's checkpoint. When the period's run has already
+        succeeded, or another process is running it, that run is returned
+        unchanged.
+
+        Raises:
+            ValueError: If the report type cannot be scheduled or day is not in its current period
+        """
+        if report_type not in SCHEDULED_REPORT_TYPES:
+            raise ValueError(f"Cannot schedule report type: {report_type.value}")
+        period = check_run_day(report_type, day or datetime.utcnow().date())
+
+        run, claimed = await self._claim(report_type, period)
+        if not claimed:
+            return run_to_dict(run)
+
+        heartbeat = asyncio.create_task(self._heartbeat(run.id))
+        try:
+            await self._process(run)
+        except Exception as e:
+            await self._update(run, status=JobStatus.FAILED, error=str(e), finished_at=datetime.utcnow())
+            raise
+        finally:
+            heartbeat.cancel()
+
+        await self._update(run, status=JobStatus.SUCCEEDED, finished_at=datetime.utcnow())
+        logger.info(f"Scheduled {report_type.value.lower()} reports for {period}: {run.users_succeeded} "
+                    f"generated, {run.users_failed} failed, {run.users_skipped} already generated")
+        return run_to_dict(run)
+
+    async def run_scheduled(self, report_types: List[ReportType], start_hour: int):
+        """Run the report types every day from start_hour (UTC), until cancelled
+
+        Runs that did not finish, e.g. because another process that was
+        running them died, are tried again after stale_seconds.
+        """
+        while True:
+            now = datetime.utcnow()
+            next_day = datetime.combine(now.date() + timedelta(days=1), time(start_hour))
+            wake_at = datetime.combine(now.date(), time(start_hour))
+            if now >= wake_at:
+                statuses = await asyncio.gather(*(self._run_logged(report_type, now.date()) for report_type in report_types))
+                unfinished = any(status != JobStatus.SUCCEEDED.value for status in statuses)
+                wake_at = min(next_day, datetime.utcnow() + timedelta(seconds=self.stale_seconds)) if unfinished else next_day
+            await asyncio.sleep(max((wake_at - datetime.utcnow()).total_seconds(), 1))
+
+    async def _run_logged(self, report_type: ReportType, day: date) -> Optional[str]:
+        try:
+            return (await self.run(report_type, day))["status"]
+        except Exception:
+            logger.exception(f"Scheduled {report_type.value.lower()} reports failed")
+            return None
+
+    async def _process(self, run: Report_Schedule_Run):
+        spread = RequestPacer()
+        if self.window_seconds > 0:
+            # A resumed run spreads the users it has left over what is left of its window
+            remaining = await self._count_remaining(run.last_user_id)
+            window_left = (run.started_at + timedelta(seconds=self.window_seconds) - datetime.utcnow()).total_seconds()
+            if remaining and window_left > 0:
+                spread.interval = window_left / remaining
+
+        while True:
+            user_ids = await self._next_batch(run.last_user_id)
+            if not user_ids:
+                return
+            done = await self._already_generated(run, user_ids)
+            pending = [user_id for user_id in user_ids if user_id not in done]
+            succeeded = 0
+            for attempt in range(self.retry_attempts + 1):
+                pacer = spread
+                if attempt:
+                    await asyncio.sleep(self.retry_delay_seconds * 2 ** (attempt - 1))
+                    # Retries are not spread over the window again; the rate limit still applies
+                    pacer = RequestPacer()
+                results = await asyncio.gather(*(self._generate(run.report_type, user_id, pacer)
+                                                 for user_id in pending))
+                succeeded += sum(results)
+                pending = [user_id for user_id, ok in zip(pending, results) if not ok]
+                if not pending:
+                    break
+            await self._update(
+                run, last_user_id=user_ids[-1],
+                users_succeeded=run.users_succeeded + succeeded,
+                users_failed=run.users_failed + len(pending),
+                users_skipped=run.users_skipped + len(done),
+                heartbeat_at=datetime.utcnow()
+            )
+
+    async def _generate(self, report_type: ReportType, user_id: int, spread: RequestPacer) -> bool:
+        async with self._semaphore:
+            await spread.wait()
+            await self.rate_limit.wait()
+            try:
+                async with self.session_factory() as db:
+                    mcp_client = MCPClient(db, session_factory=self.session_factory, use_rollups=self.use_rollups)
+                    agent = self.report_agent.bind(mcp_client)
+                    await getattr(agent, SCHEDULED_REPORT_TYPES[report_type])(user_id, self.generate_documents)
+                return True
+            except Exception as e:
+                logger.warning(f"Scheduled {report_type.value.lower()} report for user {user_id} failed: {e}")
+                return False
+
+    async def _claim(self, report_type: ReportType, period: date):
+        """Return the period's run and whether this process now owns it"""
+        now = datetime.utcnow()
+        async with self.session_factory() as db:
+            run = await db.scalar(select(Report_Schedule_Run).where(
+                Report_Schedule_Run.report_type == report_type, Report_Schedule_Run.period_start == period))
+            if run is None:
+                run = Report_Schedule_Run(report_type=report_type, period_start=period, status=JobStatus.RUNNING,
+                                          last_user_id=0, users_succeeded=0, users_failed=0, users_skipped=0,
+                                          started_at=now, heartbeat_at=now)
+                db.add(run)
+                try:
+                    await db.commit()
+                    return run, True
+                except IntegrityError:
+                    # Another process started the same run first
+                    await db.rollback()
+                    return await self._claim(report_type, period)
+
+            # Failed runs, and running ones whose process stopped sending heartbeats, are resumed
+            claimed = await db.execute(
+                update(Report_Schedule_Run)
+                .where(Report_Schedule_Run.id == run.id, Report_Schedule_Run.status != JobStatus.SUCCEEDED,
+                       or_(Report_Schedule_Run.status != JobStatus.RUNNING,
+                           Report_Schedule_Run.heartbeat_at < now - timedelta(seconds=self.stale_seconds)))
+                .values(status=JobStatus.RUNNING, error=None, finished_at=None, heartbeat_at=now)
+            )
+            await db.commit()
+            await db.refresh(run)
+            if claimed.rowcount == 1 and run.last_user_id:
+                logger.info(f"Resuming scheduled {report_type.value.lower()} reports for {period} after user {run.last_user_id}")
+            return run, claimed.rowcount == 1
+
+    async def _next_batch(self, after_user_id: int) -> List[int]:
+        async with self.session_factory() as db:
+            result = await db.scalars(
+                select(User.id)
+                .where(User.status == UserStatus.ACTIVE, User.id > after_user_id)
+                .order_by(User.id)
+                .limit(self.batch_size)
+            )
+            return list(result)
+
+    async def _count_remaining(self, after_user_id: int) -> int:
+        async with self.session_factory() as db:
+            return await db.scalar(
+                select(func.count(User.id)).where(User.status == UserStatus.ACTIVE, User.id > after_user_id)
+            )
+
+    async def _already_generated(self, run: Report_Schedule_Run, user_ids: List[int]) -> Set[int]:
+        """Users of the batch who got this report since the run started, i.e. before it was interrupted"""
+        async with self.session_factory() as db:
+            result = await db.scalars(
+                select(AI_Report.user_id).distinct()
+                .where(AI_Report.user_id.in_(user_ids), AI_Report.report_type == run.report_type,
+                       AI_Report.generated_at >= run.started_at)
+            )
+            return set(result)
+
+    async def _update(self, run: Report_Schedule_Run, **values):
+        async with self.session_factory() as db:
+            await db.execute(update(Report_Schedule_Run).where(Report_Schedule_Run.id == run.id).values(**values))
+            await db.commit()
+        for key, value in values.items():
+            setattr(run, key, value)
+
+    async def _heartbeat(self, run_id: int):
+        """Keep the run's heartbeat fresh while a slow batch, e.g. one spread over a long window, is running"""
+        while True:
+            await asyncio.sleep(self.stale_seconds / 4)
+            try:
+                async with self.session_factory() as db:
+                    await db.execute(update(Report_Schedule_Run).where(Report_Schedule_Run.id == run_id)
+                                     .values(heartbeat_at=datetime.utcnow()))
+                    await db.commit()
+            except Exception:
+                logger.exception("Failed to record the scheduled run heartbeat")
@@ -0,0 +1,71 @@
+"""
+Report-scoped data snapshot shared between statistics and task listing
+"""
+from typing import Dict, List, Any, Optional
+from datetime import datetime
+
+from agents.stats_engine import StatisticsAggregates, compute_statistics_in_memory
+from agents.report_records import TaskRecord, StatusEvent
+
+
+class ReportDataSnapshot:
+    """User, tasks, status history and notes loaded once for a single report
+
+    Statistics and the prompt/document builders all read from the same
+    snapshot, so they always describe the same rows.
+    """
+
+    def __init__(self, user: Dict[str, Any], tasks: List[TaskRecord], period: str, days: Optional[int],
+                 aggregates: Optional[StatisticsAggregates] = None):
+        """
+        Initialize the snapshot
+
+        Args:
+            user (Dict): Serialized user data
+            tasks (List[TaskRecord]): Tasks with their status history attached
+            period (str): Report period name
+            days (Optional[int]): Window length in days, None for all time
+            aggregates (Optional[StatisticsAggregates]): Counts read with the tasks, such as
+                from the user_daily_stats rollups; computed from the tasks if None
+        """
+        self.user = user
+        self.tasks = tasks
+        self.period = period
+        self.days = days
+        self.aggregates = aggregates
+        self.loaded_at = datetime.utcnow()
+        self._statistics = None
+
+    @property
+    def history(self) -> List[StatusEvent]:
+        """Every status history entry in the snapshot, grouped by task"""
+        return [event for task in self.tasks for event in task.history]
+
+    @property
+    def notes(self) -> List[StatusEvent]:
+        """Every status note in the snapshot, grouped by task"""
+        return [event for task in self.tasks for event in task.notes]
+
+    def statistics(self) -> Dict[str, Any]:
+        """Statistics for the snapshot, computed once without further queries"""
+        if self._statistics is None and self.aggregates is not None:
+            self._statistics = self.aggregates.to_statistics(self.period, self.notes)
+        elif self._statistics is None:
+            self._statistics = compute_statistics_in_memory(self.period, self.tasks, by_day=self.days is not None)
+        return self._statistics
+
+    def within(self, period: str, days: Optional[int], start: Optional[datetime],
+               aggregates: Optional[StatisticsAggregates] = None) -> "ReportDataSnapshot":
+        """The tasks created since start, as a snapshot of their own, without further queries
+
+        Args:
+            period (str): Report period name of the new snapshot
+            days (Optional[int]): Its window length in days, None for all time
+            start (Optional[datetime]): Start of its window; None keeps every task
+            aggregates (Optional[StatisticsAggregates]): Counts for that window, as in __init__
+        """
+        tasks = self.tasks if start is None else [task for task in self.tasks
+                                                  if task.created_at is not None and task.created_at >= start]
+        snapshot = ReportDataSnapshot(self.user, tasks, period, days, aggregates)
+        snapshot.loaded_at = self.loaded_at
+        return snapshot
@@ -0,0 +1,171 @@
+"""
+Jinja2 templates for report prompts and fallback summaries
+
+Each report type has a directory under templates/ with three templates:
+context.j2 (profile and statistics at the top of the LLM prompt),
+instructions.j2 (the end of the prompt) and fallback.j2 (the summary used
+when no LLM response is available). Every template is compiled once when
+ReportTemplates is created, and is rendered from a ReportProfile and a
+ReportStats rather than the raw statistics dict.
+
+Set report_templates_dir to a directory with the same layout to replace any
+of them; templates missing there are taken from the defaults.
+"""
+import json
+import os
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence
+
+from jinja2 import ChoiceLoader, Environment, FileSystemLoader, StrictUndefined, Template
+
+from agents.report_records import StatusEvent, TaskRecord
+from config import settings
+from models.enums.task_status import TaskStatus
+
+DEFAULT_TEMPLATES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates")
+
+# Enum .value goes through a descriptor; a dict lookup is several times faster in the list formatters
+_STATUS_LABELS = {status: status.value for status in TaskStatus}
+
+
+class DayCount(NamedTuple):
+    day: str
+    count: int
+
+
+class ReportProfile(NamedTuple):
+    """The user a report is prepared for"""
+    name: str = "User"
+    email: str = "user@example.com"
+    role: str = "N/A"
+
+    @classmethod
+    def from_user(cls, user_data: Any) -> "ReportProfile":
+        if not isinstance(user_data, dict):
+            return cls()
+        return cls(name=user_data.get("name", "User"),
+                   email=user_data.get("email", "user@example.com"),
+                   role=user_data.get("role", "N/A"))
+
+
+class ReportStats(NamedTuple):
+    """The statistics dict with every key present, for templates"""
+    total_tasks: int = 0
+    completed_tasks: int = 0
+    in_progress_tasks: int = 0
+    pending_tasks: int = 0
+    overdue_tasks: int = 0
+    completion_rate: float = 0
+    status_distribution: Dict[str, int] = {}
+    status_changes: int = 0
+    avg_completion_time_hours: float = 0
+    most_productive_day: DayCount = DayCount("N/A", 0)
+    least_productive_day: DayCount = DayCount("N/A", 0)
+    avg_tasks_per_day: float = 0
+    notes: Sequence[StatusEvent] = ()
+
+    @classmethod
+    def from_statistics(cls, stats: Any) -> "ReportStats":
+        if not isinstance(stats, dict):
+            return cls()
+
+        def day(key: str) -> DayCount:
+            value = stats.get(key)
+            return DayCount(*value) if isinstance(value, tuple) else DayCount("N/A", 0)
+
+        return cls(
+            total_tasks=stats.get("total_tasks", 0),
+            completed_tasks=stats.get("completed_tasks", 0),
+            in_progress_tasks=stats.get("in_progress_tasks", 0),
+            pending_tasks=stats.get("pending_tasks", 0),
+            overdue_tasks=stats.get("overdue_tasks", 0),
+            completion_rate=stats.get("completion_rate", 0),
+            status_distribution=stats.get("status_distribution", {}),
+            status_changes=stats.get("status_changes", 0),
+            avg_completion_time_hours=stats.get("avg_completion_time_hours", 0),
+            most_productive_day=day("most_productive_day"),
+            least_productive_day=day("least_productive_day"),
+            avg_tasks_per_day=stats.get("avg_tasks_per_day", 0),
+            notes=stats.get("all_notes", [])
+        )
+
+
+def format_tasks_briefly(tasks: List[TaskRecord], limit: int = 10) -> str:
+    """Numbered task lines for fallback summaries"""
+    if not tasks:
+        return "No tasks found."
+    return "\n".join(
+        f"{i}. {task.title or 'Untitled Task'} [{_STATUS_LABELS[task.status]}]" if isinstance(task, TaskRecord)
+        else f"{i}. Unknown Task Format"
+        for i, task in enumerate(tasks[:limit], 1)
+    )
+
+
+def format_members(members: List[Dict[str, Any]]) -> str:
+    """Numbered member workload lines, from the member dicts of the team statistics"""
+    if not members:
+        return "None."
+    return "\n".join(
+        f"{i}. {member['name']}: {member['completed_tasks']} of {member['total_tasks']} tasks completed, "
+        f"{member['overdue_tasks']} overdue"
+        for i, member in enumerate(members, 1)
+    )
+
+
+def format_notes(notes: List[StatusEvent], limit: int = 10) -> str:
+    """Numbered status note lines for fallback summaries"""
+    if not notes:
+        return "No status notes available."
+    lines = []
+    for i, note in enumerate(notes[:limit], 1):
+        if isinstance(note, StatusEvent):
+            updated_at = note.updated_at.date().isoformat() if note.updated_at else 'Unknown date'
+            lines.append(f"{i}. [{_STATUS_LABELS[note.status]}] {updated_at}: {note.note or 'No note provided'}")
+        else:
+            lines.append(f"{i}. Unknown Note Format")
+    return "\n".join(lines)
+
+
+class ReportTemplates:
+    """Compiled prompt and fallback templates, looked up by "<report type>/<part>" """
+
+    def __init__(self, templates_dir: Optional[str] = None):
+        """
+        Args:
+            templates_dir (Optional[str]): Directory whose templates replace the
+                defaults of the same name; None uses the defaults only
+        """
+        loaders = [FileSystemLoader(DEFAULT_TEMPLATES_DIR)]
+        if templates_dir:
+            loaders.insert(0, FileSystemLoader(templates_dir))
+
+        # Templates never change while the process runs, so they are not re-checked on disk
+        self.environment = Environment(loader=ChoiceLoader(loaders), autoescape=False, auto_reload=False,
+                                       undefined=StrictUndefined, keep_trailing_newline=False)
+        self.environment.filters["tasks_briefly"] = format_tasks_briefly
+        self.environment.filters["notes"] = format_notes
+        self.environment.filters["members"] = format_members
+        self.environment.filters["json"] = lambda value, indent=None: json.dumps(value, indent=indent)
+
+        self._templates: Dict[str, Template] = {
+            name[:-len(".j2")]: self.environment.get_template(name)
+            for name in self.environment.list_templates(extensions=["j2"])
+        }
+
+    def render(self, report_type: str, part: str, **context) -> str:
+        """Render one part of a report type's templates
+
+        Raises:
+            KeyError: If there is no such template
+        """
+        return self._templates[f"{report_type}/{part}"].render(**context)
+
+
+# Compiled once per process; main.py loads them at startup
+_report_templates: Optional[ReportTemplates] = None
+
+def get_report_templates() -> ReportTemplates:
+    """Return the process-wide templates, compiling them on first use"""
+    global _report_templates
+    if _report_templates is None:
+        _report_templates = ReportTemplates(settings.report_templates_dir)
+    return _report_templates
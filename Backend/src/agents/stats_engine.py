@@ -0,0 +1,269 @@
+"""
+Statistics engine that computes report statistics with aggregate queries in the database
+"""
+from typing import Dict, List, Any, Optional, Tuple
+from datetime import date
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func, case, and_
+
+from models.db_schemes.schemes.task import Task
+from models.db_schemes.schemes.task_status_history import Task_Status_History
+from models.db_schemes.schemes.user_daily_stats import User_Daily_Stats
+from models.enums.task_status import TaskStatus
+from agents.report_records import TaskRecord, StatusEvent
+
+# Number of trailing days covered by each report period (None means all time)
+PERIOD_DAYS = {
+    "daily": 1,
+    "weekly": 7,
+    "monthly": 30,
+}
+
+# Periods whose statistics can be answered from the user_daily_stats rollup table
+ROLLUP_PERIODS = ("weekly", "monthly")
+
+
+def period_to_days(period: str) -> Optional[int]:
+    """Map a report period name to its window length in days"""
+    return PERIOD_DAYS.get(period)
+
+
+class TaskStatisticsEngine:
+    """Computes task statistics with GROUP BY and window queries instead of per-task Python loops"""
+
+    def __init__(self, db_session: AsyncSession):
+        self.db = db_session
+
+    @property
+    def dialect(self) -> str:
+        """Name of the SQL dialect the session is bound to"""
+        return self.db.bind.dialect.name
+
+    def _day_bucket(self, column):
+        """Truncate a timestamp column to its calendar day"""
+        if self.dialect == "postgresql":
+            return func.date_trunc("day", column)
+        # SQLite (used for local testing) has no date_trunc
+        return func.date(column)
+
+    def _hours_between(self, start, end):
+        """Elapsed hours between two timestamp expressions"""
+        if self.dialect == "postgresql":
+            return func.extract("epoch", end - start) / 3600.0
+        return (func.julianday(end) - func.julianday(start)) * 24.0
+
+    async def _task_counts(self, task_filters: List, by_day: bool) -> List[Tuple]:
+        """Count tasks grouped by status and, optionally, by creation day"""
+        if by_day:
+            day = self._day_bucket(Task.created_at).label("day")
+            result = await self.db.execute(
+                select(Task.status, day, func.count(Task.id))
+                .where(*task_filters)
+                .group_by(Task.status, day)
+                .order_by(day)
+            )
+            return result.all()
+
+        result = await self.db.execute(
+            select(Task.status, func.count(Task.id))
+            .where(*task_filters)
+            .group_by(Task.status)
+        )
+        return [(status, None, count) for status, count in result.all()]
+
+    def _completion_hours(self, task_filters: List):
+        """The ranked history subquery and, per history row, the completion time in hours or NULL
+
+        A window function ranks each task's history rows per status so the first
+        COMPLETED entry can be paired with the task's creation time in SQL.
+        """
+        ranked = select(
+            Task_Status_History.status.label("status"),
+            Task_Status_History.updated_at.label("updated_at"),
+            Task.created_at.label("task_created_at"),
+            Task.status.label("task_status"),
+            func.row_number().over(
+                partition_by=(Task_Status_History.task_id, Task_Status_History.status),
+                order_by=Task_Status_History.updated_at
+            ).label("status_rank"),
+            func.count().over(partition_by=Task_Status_History.task_id).label("task_history_rows"),
+        ).join(Task, Task.id == Task_Status_History.task_id)\
+         .where(*task_filters)\
+         .subquery()
+
+        first_completion = and_(
+            ranked.c.status == TaskStatus.COMPLETED,
+            ranked.c.status_rank == 1,
+            ranked.c.task_status == TaskStatus.COMPLETED,
+            ranked.c.task_history_rows > 1,
+        )
+        return ranked, case((first_completion, self._hours_between(ranked.c.task_created_at, ranked.c.updated_at)))
+
+    async def _history_aggregates(self, task_filters: List) -> Tuple[int, float, int]:
+        """Count history rows and sum completion times in a single statement"""
+        ranked, completion_hours = self._completion_hours(task_filters)
+        result = await self.db.execute(
+            select(
+                func.count(),
+                func.sum(completion_hours),
+                func.count(completion_hours),
+            ).select_from(ranked)
+        )
+        history_rows, hours_sum, hours_count = result.one()
+        return history_rows or 0, float(hours_sum or 0), hours_count or 0
+
+    async def completion_times(self, task_filters: List) -> List[float]:
+        """Completion time in hours of every completed task matching the filters, in ascending order"""
+        ranked, completion_hours = self._completion_hours(task_filters)
+        hours = completion_hours.label("hours")
+        inner = select(hours).select_from(ranked).subquery()
+        result = await self.db.execute(
+            select(inner.c.hours).where(inner.c.hours.isnot(None)).order_by(inner.c.hours)
+        )
+        return [float(value) for value in result.scalars().all()]
+
+    async def aggregate(self, task_filters: List, by_day: bool) -> "StatisticsAggregates":
+        """Aggregate the tasks matching the filters with two statements
+
+        Args:
+            task_filters (List): WHERE clauses over Task selecting the tasks to analyse
+            by_day (bool): Whether to compute per-day productivity figures
+        """
+        status_counts: Dict[str, int] = {}
+        day_counts: Dict[str, int] = {}
+        for status, day, count in await self._task_counts(task_filters, by_day):
+            status_counts[status.value] = status_counts.get(status.value, 0) + count
+            if day is not None:
+                day_key = str(day)[:10]
+                day_counts[day_key] = day_counts.get(day_key, 0) + count
+
+        history_rows, hours_sum, hours_count = await self._history_aggregates(task_filters)
+        return StatisticsAggregates(status_counts, day_counts, history_rows, hours_sum, hours_count)
+
+
+    async def aggregate_from_rollups(self, user_id: int, start_day: date) -> "StatisticsAggregates":
+        """Aggregate a user's window from the user_daily_stats rollup table
+
+        Reads one row per day (at most 30 for a monthly window) instead of
+        scanning tasks and their history. Windows are aligned to whole days.
+        """
+        result = await self.db.execute(
+            select(User_Daily_Stats)
+            .where(User_Daily_Stats.user_id == user_id, User_Daily_Stats.day >= start_day)
+            .order_by(User_Daily_Stats.day.asc())
+        )
+
+        status_counts: Dict[str, int] = {}
+        day_counts: Dict[str, int] = {}
+        history_rows = 0
+        hours_sum = 0.0
+        hours_count = 0
+        for row in result.scalars().all():
+            for status, count in ((TaskStatus.COMPLETED, row.completed_count),
+                                  (TaskStatus.IN_PROGRESS, row.in_progress_count),
+                                  (TaskStatus.PENDING, row.pending_count),
+                                  (TaskStatus.OVERDUE, row.overdue_count)):
+                if count:
+                    status_counts[status.value] = status_counts.get(status.value, 0) + count
+            if row.created_count:
+                day_counts[row.day.isoformat()] = row.created_count
+            history_rows += row.status_change_count + row.created_count
+            hours_sum += row.completion_hours_sum
+            hours_count += row.completion_hours_count
+
+        return StatisticsAggregates(status_counts, day_counts, history_rows, hours_sum, hours_count)
+
+
+class StatisticsAggregates:
+    """Pre-aggregated counts from which the report statistics dict is built"""
+
+    def __init__(self, status_counts: Dict[str, int], day_counts: Dict[str, int],
+                 history_rows: int, hours_sum: float, hours_count: int):
+        self.status_counts = status_counts
+        self.day_counts = day_counts
+        self.history_rows = history_rows
+        self.hours_sum = hours_sum
+        self.hours_count = hours_count
+
+    def to_statistics(self, period: str, notes: List[StatusEvent]) -> Dict[str, Any]:
+        """Build the statistics dict used by the report summaries"""
+        return build_statistics(period, self.status_counts, self.day_counts, self.history_rows,
+                                self.hours_sum, self.hours_count, notes)
+
+
+def compute_statistics_in_memory(period: str, tasks: List[TaskRecord], by_day: bool) -> Dict[str, Any]:
+    """Compute the statistics dict from tasks that were already loaded with their history
+
+    Mirrors TaskStatisticsEngine.aggregate for callers that hold the task list
+    anyway, such as a report snapshot, so no further queries are needed.
+    """
+    status_counts: Dict[str, int] = {}
+    day_counts: Dict[str, int] = {}
+    history_rows = 0
+    hours_sum = 0.0
+    hours_count = 0
+    notes: List[StatusEvent] = []
+
+    for task in tasks:
+        status = task.status.value
+        status_counts[status] = status_counts.get(status, 0) + 1
+        if by_day and task.created_at:
+            day_key = task.created_at.date().isoformat()
+            day_counts[day_key] = day_counts.get(day_key, 0) + 1
+
+        history = task.history
+        history_rows += len(history)
+        notes.extend(event for event in history if event.note is not None)
+
+        if task.status == TaskStatus.COMPLETED and len(history) > 1 and task.created_at:
+            completed_at = next((event.updated_at for event in history
+                                 if event.status == TaskStatus.COMPLETED and event.updated_at), None)
+            if completed_at:
+                hours_sum += (completed_at - task.created_at).total_seconds() / 3600
+                hours_count += 1
+
+    aggregates = StatisticsAggregates(status_counts, dict(sorted(day_counts.items())), history_rows,
+                                      hours_sum, hours_count)
+    return aggregates.to_statistics(period, notes)
+
+
+def build_statistics(period: str, status_counts: Dict[str, int], day_counts: Dict[str, int],
+                     history_rows: int, hours_sum: float, hours_count: int,
+                     notes: List[StatusEvent]) -> Dict[str, Any]:
+    """Assemble the statistics dict from pre-aggregated counts
+
+    Notes stay StatusEvent records; use report_records.statistics_to_dict to
+    serialize the result for an API response.
+    """
+    total_tasks = sum(status_counts.values())
+    completed_tasks = status_counts.get(TaskStatus.COMPLETED.value, 0)
+
+    # Each task's initial status entry is not counted as a change
+    status_changes = history_rows - total_tasks
+    completion_rate = (completed_tasks / total_tasks * 100) if total_tasks > 0 else 0
+    avg_completion_time = hours_sum / hours_count if hours_count else 0
+
+    most_productive_day = ("N/A", 0)
+    least_productive_day = ("N/A", 0)
+    avg_tasks_per_day = 0
+    if day_counts:
+        most_productive_day = max(day_counts.items(), key=lambda x: x[1])
+        least_productive_day = min(day_counts.items(), key=lambda x: x[1])
+        avg_tasks_per_day = sum(day_counts.values()) / len(day_counts)
+
+    return {
+        "period": period,
+        "total_tasks": total_tasks,
+        "completed_tasks": completed_tasks,
+        "in_progress_tasks": status_counts.get(TaskStatus.IN_PROGRESS.value, 0),
+        "pending_tasks": status_counts.get(TaskStatus.PENDING.value, 0),
+        "overdue_tasks": status_counts.get(TaskStatus.OVERDUE.value, 0),
+        "completion_rate": round(completion_rate, 2),
+        "status_distribution": status_counts,
+        "status_changes": status_changes,
+        "avg_completion_time_hours": round(avg_completion_time, 2),
+        "all_notes": notes,
+        "most_productive_day": most_productive_day,
+        "least_productive_day": least_productive_day,
+        "avg_tasks_per_day": round(avg_tasks_per_day, 1)
+    }
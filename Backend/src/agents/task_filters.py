@@ -0,0 +1,215 @@
+"""
+Compiles custom report filters into SQL WHERE clauses over tasks and their subtype tables
+"""
+from typing import Dict, List, Any, Optional, Tuple
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import and_, or_, exists
+
+from models.db_schemes.schemes.task import Task
+from models.db_schemes.schemes.student_task import Student_Task
+from models.db_schemes.schemes.business_task import Business_Task
+from models.db_schemes.schemes.employment_task import Employment_Task
+from models.db_schemes.schemes.certification_task import Certification_Task
+from models.enums.task_status import TaskStatus
+from models.enums.priority import Priority
+from schemas.task import TaskType
+
+# Subtype table and its deadline-like column for every task type
+TASK_TYPE_TABLES = {
+    TaskType.STUDENT: (Student_Task, Student_Task.deadline),
+    TaskType.BUSINESS: (Business_Task, Business_Task.due_date),
+    TaskType.EMPLOYMENT: (Employment_Task, Employment_Task.deadline),
+    TaskType.CERTIFICATION: (Certification_Task, Certification_Task.expiry_date),
+}
+
+MAX_LIST_VALUES = 20
+MAX_TEXT_LENGTH = 200
+MAX_DEADLINE_DAYS = 3650
+
+
+class TaskFilterError(ValueError):
+    """Raised when a custom report filter is unknown or has an invalid value"""
+
+
+def _as_list(name: str, value: Any) -> List:
+    values = value if isinstance(value, (list, tuple)) else [value]
+    if not values or len(values) > MAX_LIST_VALUES:
+        raise TaskFilterError(f"'{name}' must have between 1 and {MAX_LIST_VALUES} values")
+    return list(values)
+
+
+def _parse_enum(name: str, value: Any, enum_cls) -> List:
+    parsed = []
+    for item in _as_list(name, value):
+        try:
+            parsed.append(enum_cls(item))
+        except ValueError:
+            allowed = ", ".join(member.value for member in enum_cls)
+            raise TaskFilterError(f"Invalid value {item!r} for '{name}'; expected one of: {allowed}")
+    return parsed
+
+
+def _parse_datetime(name: str, value: Any, end_of_day: bool = False) -> datetime:
+    """Parse an ISO date or datetime; a bare date used as an upper bound covers the whole day"""
+    if isinstance(value, datetime):
+        parsed = value
+    elif isinstance(value, str):
+        try:
+            parsed = datetime.fromisoformat(value)
+        except ValueError:
+            raise TaskFilterError(f"'{name}' must be an ISO 8601 date or datetime, got {value!r}")
+        if end_of_day and len(value) == 10:
+            parsed += timedelta(days=1) - timedelta(microseconds=1)
+    else:
+        raise TaskFilterError(f"'{name}' must be an ISO 8601 date or datetime")
+
+    # Timestamps are stored as naive UTC
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def _parse_range(filters: Dict[str, Any], prefix: str) -> Tuple[Optional[datetime], Optional[datetime]]:
+    start = filters.get(f"{prefix}_after")
+    end = filters.get(f"{prefix}_before")
+    start = _parse_datetime(f"{prefix}_after", start) if start is not None else None
+    end = _parse_datetime(f"{prefix}_before", end, end_of_day=True) if end is not None else None
+    if start and end and start > end:
+        raise TaskFilterError(f"'{prefix}_after' must not be later than '{prefix}_before'")
+    return start, end
+
+
+def _between(column, start: Optional[datetime], end: Optional[datetime]) -> List:
+    clauses = []
+    if start is not None:
+        clauses.append(column >= start)
+    if end is not None:
+        clauses.append(column <= end)
+    return clauses
+
+
+def _subtype_exists(table, *conditions):
+    """EXISTS clause correlating a subtype table with the outer task row"""
+    return exists().where(table.task_id == Task.id, *conditions)
+
+
+def _escape_like(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _status_filter(filters, value):
+    return Task.status.in_(_parse_enum("status", value, TaskStatus))
+
+
+def _task_type_filter(filters, value):
+    types = _parse_enum("task_type", value, TaskType)
+    return or_(*(_subtype_exists(TASK_TYPE_TABLES[task_type][0]) for task_type in types))
+
+
+def _priority_filter(filters, value):
+    # Only business tasks carry a priority
+    return _subtype_exists(Business_Task, Business_Task.priority.in_(_parse_enum("priority", value, Priority)))
+
+
+def _text_filter(filters, value):
+    if not isinstance(value, str) or not value.strip() or len(value) > MAX_TEXT_LENGTH:
+        raise TaskFilterError(f"'text' must be a non-empty string of at most {MAX_TEXT_LENGTH} characters")
+    pattern = f"%{_escape_like(value.strip())}%"
+    return or_(Task.title.ilike(pattern, escape="\\"), Task.description.ilike(pattern, escape="\\"))
+
+
+def _deadline_filter(filters, value):
+    start, end = _parse_range(filters, "deadline")
+    within_days = filters.get("deadline_within_days")
+    if within_days is not None:
+        if isinstance(within_days, bool) or not isinstance(within_days, int) or not 0 <= within_days <= MAX_DEADLINE_DAYS:
+            raise TaskFilterError(f"'deadline_within_days' must be an integer between 0 and {MAX_DEADLINE_DAYS}")
+        now = datetime.utcnow()
+        start = max(start, now) if start else now
+        window_end = now + timedelta(days=within_days)
+        end = min(end, window_end) if end else window_end
+
+    task_types = TASK_TYPE_TABLES.keys()
+    if "task_type" in filters:
+        task_types = _parse_enum("task_type", filters["task_type"], TaskType)
+    return or_(*(
+        _subtype_exists(table, column.isnot(None), *_between(column, start, end))
+        for table, column in (TASK_TYPE_TABLES[task_type] for task_type in task_types)
+    ))
+
+
+def _created_filter(filters, value):
+    return and_(*_between(Task.created_at, *_parse_range(filters, "created")))
+
+
+def _updated_filter(filters, value):
+    return and_(*_between(Task.updated_at, *_parse_range(filters, "updated")))
+
+
+# Whitelisted filter keys. Keys that share a compiler (the two ends of a range)
+# produce a single clause.
+FILTER_COMPILERS = {
+    "status": _status_filter,
+    "task_type": _task_type_filter,
+    "priority": _priority_filter,
+    "text": _text_filter,
+    "created_after": _created_filter,
+    "created_before": _created_filter,
+    "updated_after": _updated_filter,
+    "updated_before": _updated_filter,
+    "deadline_after": _deadline_filter,
+    "deadline_before": _deadline_filter,
+    "deadline_within_days": _deadline_filter,
+}
+
+
+def compile_task_filters(filters: Optional[Dict[str, Any]]) -> List:
+    """Compile a task filter dict into SQLAlchemy WHERE clauses over Task
+
+    Supported keys:
+        status: one or more TaskStatus values
+        task_type: one or more of student, business, employment, certification
+        priority: one or more Priority values (business tasks)
+        text: case-insensitive match on the title or description
+        created_after / created_before, updated_after / updated_before: ISO dates
+        deadline_after / deadline_before: ISO dates matched against the subtype's
+            deadline, due date or expiry date
+        deadline_within_days: deadline between now and the given number of days ahead
+
+    Raises:
+        TaskFilterError: If a key is not supported or a value is invalid
+    """
+    if not filters:
+        return []
+    if not isinstance(filters, dict):
+        raise TaskFilterError("Task filters must be an object")
+
+    unknown = sorted(set(filters) - set(FILTER_COMPILERS))
+    if unknown:
+        raise TaskFilterError(f"Unsupported task filters: {', '.join(unknown)}; "
+                              f"supported filters: {', '.join(FILTER_COMPILERS)}")
+
+    clauses = []
+    compiled = set()
+    for name, value in filters.items():
+        compiler = FILTER_COMPILERS[name]
+        if compiler in compiled:
+            continue
+        compiled.add(compiler)
+        clauses.append(compiler(filters, value))
+    return clauses
+
+
+def compile_custom_report_filters(parameters: Dict[str, Any]) -> List:
+    """Compile the parameters of a custom report request into WHERE clauses
+
+    start_date and end_date bound the task creation time; task_filters is
+    compiled with compile_task_filters.
+    """
+    task_filters = dict(parameters.get("task_filters") or {})
+    for parameter, key in (("start_date", "created_after"), ("end_date", "created_before")):
+        if parameters.get(parameter) is not None:
+            if key in task_filters:
+                raise TaskFilterError(f"Use either '{parameter}' or task_filters['{key}'], not both")
+            task_filters[key] = parameters[parameter]
+    return compile_task_filters(task_filters)
@@ -0,0 +1,177 @@
+"""
+Team statistics computed as a map-reduce over chunks of users
+
+TeamStatisticsEngine splits a team's members into chunks of user IDs. Each
+chunk is aggregated in the database by a few GROUP BY statements on its own
+session (the map), with a bounded number of chunks in flight, and the
+partial TeamAggregates are merged in memory (the reduce). Each statement
+covers at most chunk_size users, so the time for a team grows with its size
+divided by the concurrency rather than with one query per user.
+"""
+import asyncio
+import heapq
+from datetime import datetime
+from functools import reduce
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from sqlalchemy import select, func, case
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from agents.stats_engine import TaskStatisticsEngine
+from models.db_schemes.schemes.task import Task
+from models.enums.task_status import TaskStatus
+
+# Members listed in the team statistics, e.g. as top contributors
+TOP_MEMBERS = 5
+
+COMPLETION_PERCENTILES = (50, 75, 90, 95)
+
+
+class MemberLoad(NamedTuple):
+    user_id: int
+    name: str
+    total_tasks: int = 0
+    completed_tasks: int = 0
+    overdue_tasks: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return self._asdict()
+
+
+def percentile(values: Sequence[float], q: float) -> float:
+    """The q-th percentile (0-100) of sorted values, interpolating between neighbours"""
+    if not values:
+        return 0.0
+    rank = (len(values) - 1) * q / 100
+    low = int(rank)
+    high = min(low + 1, len(values) - 1)
+    return values[low] + (values[high] - values[low]) * (rank - low)
+
+
+class TeamAggregates:
+    """Partial aggregates of a group of members; merging two gives the aggregates of both groups"""
+
+    def __init__(self, members: Optional[List[MemberLoad]] = None, status_counts: Optional[Dict[str, int]] = None,
+                 day_counts: Optional[Dict[str, int]] = None, history_rows: int = 0,
+                 completion_hours: Optional[List[float]] = None):
+        """
+        Args:
+            members (List[MemberLoad]): Task counts of each member
+            status_counts (Dict[str, int]): Tasks per status value
+            day_counts (Dict[str, int]): Tasks created per day (ISO date)
+            history_rows (int): Status history rows of the tasks
+            completion_hours (List[float]): Completion time of each completed task, sorted
+        """
+        self.members = members or []
+        self.status_counts = status_counts or {}
+        self.day_counts = day_counts or {}
+        self.history_rows = history_rows
+        self.completion_hours = completion_hours or []
+
+    def merge(self, other: "TeamAggregates") -> "TeamAggregates":
+        status_counts = dict(self.status_counts)
+        for status, count in other.status_counts.items():
+            status_counts[status] = status_counts.get(status, 0) + count
+        day_counts = dict(self.day_counts)
+        for day, count in other.day_counts.items():
+            day_counts[day] = day_counts.get(day, 0) + count
+        return TeamAggregates(self.members + other.members, status_counts, day_counts,
+                              self.history_rows + other.history_rows,
+                              list(heapq.merge(self.completion_hours, other.completion_hours)))
+
+    def to_statistics(self, period: str) -> Dict[str, Any]:
+        """Build the team statistics dict used by the team summary and document"""
+        total_tasks = sum(self.status_counts.values())
+        completed_tasks = self.status_counts.get(TaskStatus.COMPLETED.value, 0)
+        active_members = [member for member in self.members if member.total_tasks]
+        hours = self.completion_hours
+        daily_load = dict(sorted(self.day_counts.items()))
+
+        busiest_day = ("N/A", 0)
+        quietest_day = ("N/A", 0)
+        if daily_load:
+            busiest_day = max(daily_load.items(), key=lambda x: x[1])
+            quietest_day = min(daily_load.items(), key=lambda x: x[1])
+
+        return {
+            "period": period,
+            "member_count": len(self.members),
+            "active_members": len(active_members),
+            "total_tasks": total_tasks,
+            "completed_tasks": completed_tasks,
+            "in_progress_tasks": self.status_counts.get(TaskStatus.IN_PROGRESS.value, 0),
+            "pending_tasks": self.status_counts.get(TaskStatus.PENDING.value, 0),
+            "overdue_tasks": self.status_counts.get(TaskStatus.OVERDUE.value, 0),
+            "completion_rate": round(completed_tasks / total_tasks * 100, 2) if total_tasks else 0,
+            "status_distribution": self.status_counts,
+            # Each task's initial status entry is not counted as a change
+            "status_changes": self.history_rows - total_tasks,
+            "avg_completion_time_hours": round(sum(hours) / len(hours), 2) if hours else 0,
+            "completion_time_percentiles": {f"p{q}": round(percentile(hours, q), 2) for q in COMPLETION_PERCENTILES},
+            "avg_tasks_per_active_member": round(total_tasks / len(active_members), 1) if active_members else 0,
+            "daily_load": daily_load,
+            "busiest_day": busiest_day,
+            "quietest_day": quietest_day,
+            "top_members": [member.to_dict() for member in heapq.nlargest(
+                TOP_MEMBERS, active_members, key=lambda member: (member.completed_tasks, -member.user_id))],
+            "members_with_overdue_tasks": [member.to_dict() for member in heapq.nlargest(
+                TOP_MEMBERS, (member for member in self.members if member.overdue_tasks),
+                key=lambda member: (member.overdue_tasks, -member.user_id))],
+        }
+
+
+class TeamStatisticsEngine:
+    """Aggregates the tasks of many users in parallel chunks"""
+
+    def __init__(self, session_factory: Callable[[], AsyncSession], chunk_size: int = 500, concurrency: int = 4):
+        """
+        Args:
+            session_factory (Callable): Creates the session each chunk is aggregated on
+            chunk_size (int): Users per chunk
+            concurrency (int): Chunks aggregated at the same time
+        """
+        self.session_factory = session_factory
+        self.chunk_size = chunk_size
+        self.concurrency = concurrency
+
+    async def aggregate(self, members: List[Tuple[int, str]], start_date: Optional[datetime],
+                        by_day: bool = True) -> TeamAggregates:
+        """Aggregate the tasks members created since start_date (all time if None)
+
+        Args:
+            members (List[Tuple[int, str]]): ID and name of each member
+            start_date (Optional[datetime]): Start of the window
+            by_day (bool): Whether to count tasks per creation day
+        """
+        semaphore = asyncio.Semaphore(self.concurrency)
+        chunks = [members[i:i + self.chunk_size] for i in range(0, len(members), self.chunk_size)]
+        partials = await asyncio.gather(*(self._aggregate_chunk(chunk, start_date, by_day, semaphore)
+                                          for chunk in chunks))
+        return reduce(TeamAggregates.merge, partials, TeamAggregates())
+
+    async def _aggregate_chunk(self, members: List[Tuple[int, str]], start_date: Optional[datetime],
+                               by_day: bool, semaphore: asyncio.Semaphore) -> TeamAggregates:
+        task_filters = [Task.user_id.in_([user_id for user_id, _ in members])]
+        if start_date is not None:
+            task_filters.append(Task.created_at >= start_date)
+
+        async with semaphore, self.session_factory() as session:
+            engine = TaskStatisticsEngine(session)
+            aggregates = await engine.aggregate(task_filters, by_day=by_day)
+            completion_hours = await engine.completion_times(task_filters)
+            result = await session.execute(
+                select(
+                    Task.user_id,
+                    func.count(Task.id),
+                    func.sum(case((Task.status == TaskStatus.COMPLETED, 1), else_=0)),
+                    func.sum(case((Task.status == TaskStatus.OVERDUE, 1), else_=0)),
+                )
+                .where(*task_filters)
+                .group_by(Task.user_id)
+            )
+            counts = {user_id: (total, completed or 0, overdue or 0) for user_id, total, completed, overdue in result.all()}
+
+        return TeamAggregates(
+            [MemberLoad(user_id, name, *counts.get(user_id, ())) for user_id, name in members],
+            aggregates.status_counts, aggregates.day_counts, aggregates.history_rows, completion_hours
+        )
@@ -0,0 +1,34 @@
+"""
+Tests for the Word document writer
+"""
+from datetime import datetime, timedelta
+
+from docx import Document
+
+from agents.doc_writer_agent import DocWriterAgent
+from agents.report_records import TaskRecord, StatusEvent
+from models.enums.task_status import TaskStatus
+
+
+def test_report_document_renders_records(tmp_path):
+    created = datetime(2024, 3, 4, 9, 30)
+    history = (
+        StatusEvent(1, 7, TaskStatus.PENDING, created, "kick-off"),
+        StatusEvent(2, 7, TaskStatus.COMPLETED, created + timedelta(days=1), None),
+    )
+    task = TaskRecord(7, "Write thesis", "Chapter 2", TaskStatus.COMPLETED, created, created, history)
+    report = {
+        "report_type": "Weekly",
+        "summary": "EXECUTIVE SUMMARY\nAll done.",
+        "statistics": {"total_tasks": 1, "completion_rate": 100.0, "all_notes": task.notes},
+        "tasks": [task],
+    }
+
+    path = DocWriterAgent(output_dir=str(tmp_path)).create_report_document(report, {"id": 1, "name": "Ada"})
+
+    doc = Document(path)
+    text = "\n".join(p.text for p in doc.paragraphs)
+    cells = {cell.text for table in doc.tables for row in table.rows for cell in row.cells}
+    assert "1. Write thesis" in text
+    assert "2024-03-04" in text
+    assert {"2024-03-05", "kick-off", TaskStatus.COMPLETED.value} <= cells
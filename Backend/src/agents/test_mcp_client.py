@@ -0,0 +1,197 @@
+"""
+Tests for MCPClient data access
+"""
+import asyncio
+import json
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+
+from agents.mcp_client import MCPClient
+from agents.report_records import TaskRecord, report_to_dict
+from models.db_schemes.schemes.base import Base
+from models.db_schemes.schemes.user import User
+from models.db_schemes.schemes.task import Task
+from models.db_schemes.schemes.task_status_history import Task_Status_History
+from models.enums.task_status import TaskStatus
+
+
+def seed_user_tasks(db, task_count: int) -> int:
+    user = User(name="Report User", email=f"user{task_count}@example.com")
+    db.add(user)
+    db.flush()
+
+    now = datetime.utcnow()
+    for i in range(task_count):
+        status = TaskStatus.COMPLETED if i % 2 else TaskStatus.IN_PROGRESS
+        task = Task(title=f"Task {i}", user_id=user.id, status=status,
+                    created_at=now - timedelta(hours=i + 2))
+        db.add(task)
+        db.flush()
+        db.add(Task_Status_History(task_id=task.id, status=TaskStatus.PENDING,
+                                   updated_at=task.created_at, note=f"created {i}"))
+        db.add(Task_Status_History(task_id=task.id, status=status,
+                                   updated_at=task.created_at + timedelta(hours=1)))
+    db.commit()
+    return user.id
+
+
+def make_database(tmp_path, task_count: int):
+    """Seed a SQLite file synchronously and return an async engine and session factory over it"""
+    url = f"sqlite:///{tmp_path}/reports_{task_count}.db"
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    with sessionmaker(bind=engine)() as db:
+        user_id = seed_user_tasks(db, task_count)
+    engine.dispose()
+
+    async_engine = create_async_engine(url.replace("sqlite://", "sqlite+aiosqlite://"), poolclass=NullPool)
+    session_factory = sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
+    return async_engine, session_factory, user_id
+
+
+def run_with_client(session_factory, fn):
+    async def runner():
+        async with session_factory() as db:
+            return await fn(MCPClient(db, session_factory=session_factory))
+    return asyncio.run(runner())
+
+
+def count_statements(async_engine, fn):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        result = fn()
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    return result, len(statements)
+
+
+def test_tasks_with_history_shape(tmp_path):
+    async_engine, session_factory, user_id = make_database(tmp_path, 3)
+
+    tasks = run_with_client(session_factory, lambda client: client.get_user_tasks_with_history(user_id, 30))
+
+    assert len(tasks) == 3
+    for task in tasks:
+        assert task["status_history"][0]["status"] == TaskStatus.PENDING.value
+        assert len(task["status_history"]) == 2
+        assert all(h["task_id"] == task["id"] for h in task["status_history"])
+        assert [n["note"] for n in task["all_notes"]] == [task["status_history"][0]["note"]]
+
+
+def test_tasks_with_history_query_count_is_constant(tmp_path):
+    counts = []
+    for task_count in (5, 50):
+        async_engine, session_factory, user_id = make_database(tmp_path, task_count)
+
+        tasks, statements = count_statements(async_engine, lambda: run_with_client(
+            session_factory, lambda client: client.get_user_tasks_with_history(user_id, 30)
+        ))
+        assert len(tasks) == task_count
+        counts.append(statements)
+
+    assert counts[0] == counts[1]
+    assert counts[1] <= 2
+
+
+def test_task_statistics_aggregates_in_sql(tmp_path):
+    async_engine, session_factory, user_id = make_database(tmp_path, 6)
+
+    stats = run_with_client(session_factory, lambda client: client.get_task_statistics(user_id, "monthly"))
+
+    assert stats["period"] == "monthly"
+    assert stats["total_tasks"] == 6
+    assert stats["completed_tasks"] == 3
+    assert stats["in_progress_tasks"] == 3
+    assert stats["completion_rate"] == 50.0
+    assert stats["status_distribution"] == {TaskStatus.COMPLETED.value: 3, TaskStatus.IN_PROGRESS.value: 3}
+    assert stats["status_changes"] == 6
+    assert stats["avg_completion_time_hours"] == 1.0
+    assert len(stats["all_notes"]) == 6
+    assert stats["most_productive_day"][1] >= stats["least_productive_day"][1] >= 1
+    assert stats["avg_tasks_per_day"] > 0
+
+
+def test_task_statistics_query_count_is_constant(tmp_path):
+    counts = []
+    for task_count in (5, 50):
+        async_engine, session_factory, user_id = make_database(tmp_path, task_count)
+
+        stats, statements = count_statements(async_engine, lambda: run_with_client(
+            session_factory, lambda client: client.get_task_statistics(user_id, "monthly")
+        ))
+        assert stats["total_tasks"] == task_count
+        counts.append(statements)
+
+    assert counts[0] == counts[1]
+
+
+def test_report_snapshot_matches_sql_statistics(tmp_path):
+    async_engine, session_factory, user_id = make_database(tmp_path, 12)
+
+    snapshot, statements = count_statements(async_engine, lambda: run_with_client(
+        session_factory, lambda client: client.load_report_snapshot(user_id, "weekly")
+    ))
+    sql_stats = run_with_client(session_factory, lambda client: client.get_task_statistics(user_id, "weekly"))
+
+    assert statements <= 3
+    assert snapshot.user["id"] == user_id
+    assert len(snapshot.tasks) == 12
+    assert len(snapshot.history) == 24
+    assert snapshot.statistics() == sql_stats
+
+
+def test_report_snapshot_is_read_in_one_session(tmp_path):
+    async_engine, session_factory, user_id = make_database(tmp_path, 4)
+    opened = []
+
+    def counting_factory():
+        opened.append(1)
+        return session_factory()
+
+    snapshot = run_with_client(session_factory, lambda client: MCPClient(
+        client.db, session_factory=counting_factory).load_report_snapshot(user_id, "weekly"))
+
+    # The user, tasks and history share a transaction instead of a session each
+    assert len(opened) == 1
+    assert len(snapshot.tasks) == 4 and len(snapshot.history) == 8
+
+
+def test_shared_session_reads_are_serialized(tmp_path):
+    async_engine, session_factory, user_id = make_database(tmp_path, 4)
+
+    async def runner():
+        async with session_factory() as db:
+            client = MCPClient(db)
+            return await asyncio.gather(
+                client.get_user_data(user_id),
+                client.get_task_statistics(user_id, "weekly")
+            )
+
+    user_data, stats = asyncio.run(runner())
+    assert user_data["id"] == user_id
+    assert stats["total_tasks"] == 4
+
+
+def test_snapshot_records_serialize_at_the_boundary(tmp_path):
+    async_engine, session_factory, user_id = make_database(tmp_path, 4)
+
+    snapshot = run_with_client(session_factory, lambda client: client.load_report_snapshot(user_id, "weekly"))
+    task_dicts = run_with_client(session_factory, lambda client: client.get_user_tasks_with_history(user_id, 7))
+
+    assert all(isinstance(task, TaskRecord) for task in snapshot.tasks)
+    assert all(isinstance(event.updated_at, datetime) for event in snapshot.history)
+    assert snapshot.tasks[0].status in (TaskStatus.COMPLETED, TaskStatus.IN_PROGRESS)
+
+    report = report_to_dict({"tasks": snapshot.tasks, "statistics": snapshot.statistics()})
+    assert sorted(report["tasks"], key=lambda t: t["id"]) == sorted(task_dicts, key=lambda t: t["id"])
+    assert report["statistics"]["all_notes"] == [n for t in report["tasks"] for n in t["all_notes"]]
+    json.dumps(report)
@@ -0,0 +1,67 @@
+"""
+Tests for the token-budgeted prompt builder
+"""
+from datetime import datetime, timedelta
+
+from agents.prompt_builder import (PromptBuilder, estimate_tokens, format_note_line, format_task_line,
+                                   recent_notes_first, truncate)
+from agents.report_records import StatusEvent, TaskRecord
+from models.enums.task_status import TaskStatus
+
+NOW = datetime(2026, 10, 1, 12, 0)
+
+
+def make_tasks(count):
+    return [TaskRecord(i, f"Task {i}", None, TaskStatus.IN_PROGRESS, NOW, NOW) for i in range(count)]
+
+
+def make_notes(count, length):
+    return [StatusEvent(i, i, TaskStatus.COMPLETED, NOW - timedelta(hours=i), f"note {i} " + "x" * length)
+            for i in range(count)]
+
+
+def build(budget, tasks, notes):
+    return PromptBuilder(budget)\
+        .add_text("context", """
+            REPORT FOR Ada:
+            - Total Tasks: 12
+        """)\
+        .add_list("tasks", "TASKS:", tasks, format_task_line, priority=2, empty_text="No tasks found.")\
+        .add_list("notes", "NOTES:", recent_notes_first(notes), lambda note: format_note_line(note, 80),
+                  priority=1, empty_text="No status notes available.")\
+        .add_text("instructions", "INSTRUCTIONS:\n1. Summarize")\
+        .build()
+
+
+def test_prompt_stays_within_budget_and_fills_notes_before_tasks():
+    prompt = build(300, make_tasks(200), make_notes(200, 500))
+
+    assert prompt.estimated_tokens <= 300
+    # Notes are filled first; tasks only get what is left over
+    assert 0 < prompt.sections["notes"]["included"] < 200
+    assert prompt.sections["tasks"]["included"] < 10
+    # Layout order is kept even though notes were filled first
+    assert prompt.text.index("TASKS:") < prompt.text.index("NOTES:")
+    assert prompt.text.startswith("REPORT FOR Ada:")
+    assert prompt.text.endswith("INSTRUCTIONS:\n1. Summarize")
+    assert "more not shown" in prompt.text
+
+
+def test_short_inputs_are_included_in_full():
+    prompt = build(2000, make_tasks(3), make_notes(2, 10))
+
+    assert prompt.sections == {"tasks": {"included": 3, "available": 3},
+                               "notes": {"included": 2, "available": 2}}
+    assert "more not shown" not in prompt.text
+    assert prompt.estimated_tokens == estimate_tokens(prompt.text)
+    # Most recent note first
+    assert prompt.text.index("note 0") < prompt.text.index("note 1")
+
+    empty = build(2000, [], [])
+    assert "No tasks found." in empty.text and "No status notes available." in empty.text
+
+
+def test_long_notes_are_truncated():
+    line = format_note_line(make_notes(1, 1000)[0], 80)
+    assert line.endswith("…")
+    assert len(truncate("a  b\n c", 80)) == 5
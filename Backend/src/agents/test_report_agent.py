@@ -0,0 +1,184 @@
+"""
+Tests for the progress events ReportAgent emits while streaming a report
+"""
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+from agents.doc_writer_agent import DocWriterAgent
+from agents.mcp_client import MCPClient
+from agents.report_agent import ReportAgent
+from llm.CachedProvider import CachedProvider
+from models.db_schemes.schemes.user import User
+from models.db_schemes.schemes.task import Task
+from models.enums.task_status import TaskStatus
+from testing.providers import ChunkedProvider, CountingProvider
+
+
+@pytest.fixture
+def seeded(database):
+    """A user with three tasks completed in the last few hours"""
+    def seed(db):
+        user = User(name="Stream User", email="stream@example.com")
+        db.add(user)
+        db.flush()
+        now = datetime.utcnow()
+        for i in range(3):
+            db.add(Task(title=f"Task {i}", user_id=user.id, status=TaskStatus.COMPLETED,
+                        created_at=now - timedelta(hours=i + 1)))
+        return user.id
+
+    return database.session_factory, database.seed(seed)
+
+
+def stream_weekly_report(session_factory, user_id, provider):
+    events = []
+
+    async def on_event(event, data):
+        events.append((event, data))
+
+    async def runner():
+        async with session_factory() as db:
+            agent = ReportAgent(llm_provider=CachedProvider(provider, None))
+            return await agent.bind(MCPClient(db, session_factory=session_factory)).generate_weekly_report(
+                user_id, on_event=on_event)
+
+    return asyncio.run(runner()), events
+
+
+def test_events_follow_generation_order(seeded):
+    session_factory, user_id = seeded
+    result, events = stream_weekly_report(session_factory, user_id, ChunkedProvider())
+
+    names = [name for name, _ in events]
+    assert names == ["stats", "token", "token", "token", "summary", "saved"]
+    assert events[0][1]["task_count"] == 3
+    assert "".join(data["text"] for name, data in events if name == "token") == result["summary"]
+    assert events[-1][1]["report_id"] == result["report_id"]
+
+
+def test_failed_stream_falls_back_to_template_summary(seeded):
+    session_factory, user_id = seeded
+    result, events = stream_weekly_report(session_factory, user_id, ChunkedProvider(fail_after=1))
+
+    # The partial tokens are superseded by the final summary event
+    summary = dict(events)["summary"]["summary"]
+    assert summary == result["summary"]
+    assert not summary.startswith("Executive Summary: steady")
+
+
+def test_bound_agents_share_components_but_not_request_state(seeded, tmp_path):
+    session_factory, user_id = seeded
+    doc_writer = DocWriterAgent(output_dir=str(tmp_path / "docs"))
+    agent = ReportAgent(llm_provider=CachedProvider(ChunkedProvider(), None), doc_writer=doc_writer)
+    agent.warm_up()
+    assert doc_writer._base_document is not None
+
+    async def runner():
+        async with session_factory() as first_db, session_factory() as second_db:
+            first = agent.bind(MCPClient(first_db), use_llm_cache=False)
+            second = agent.bind(MCPClient(second_db))
+            await first.generate_weekly_report(user_id, generate_doc=True)
+            return first, second
+
+    first, second = asyncio.run(runner())
+    assert first.llm_provider is agent.llm_provider and first.doc_writer is doc_writer
+    assert first.mcp is not second.mcp and not first.use_llm_cache
+    assert first.last_prompt is not None and second.last_prompt is None and agent.last_prompt is None
+    assert len(list((tmp_path / "docs").iterdir())) == 1
+
+
+def test_reports_are_reused_until_their_data_changes(seeded):
+    session_factory, user_id = seeded
+    provider = CountingProvider()
+    agent = ReportAgent(llm_provider=CachedProvider(provider, None))
+
+    async def weekly(**kwargs):
+        async with session_factory() as db:
+            return await agent.bind(MCPClient(db, session_factory=session_factory)).generate_weekly_report(user_id, **kwargs)
+
+    async def runner():
+        first = await weekly()
+        repeated = await weekly()
+        # A daily report has its own fingerprint
+        async with session_factory() as db:
+            await agent.bind(MCPClient(db)).generate_daily_report(user_id)
+        forced = await weekly(force=True)
+        async with session_factory() as db:
+            task = await db.get(Task, 1)
+            task.status = TaskStatus.IN_PROGRESS
+            await db.commit()
+        changed = await weekly()
+        return first, repeated, forced, changed
+
+    first, repeated, forced, changed = asyncio.run(runner())
+    assert not first["reused"] and repeated["reused"]
+    assert (repeated["report_id"], repeated["summary"]) == (first["report_id"], first["summary"])
+    assert "statistics" not in repeated
+    assert not forced["reused"] and forced["report_id"] > first["report_id"]
+    assert not changed["reused"] and changed["statistics"]["in_progress_tasks"] == 1
+    assert provider.calls == 4
+
+
+def test_template_summaries_are_not_reused_while_the_llm_fails(seeded):
+    session_factory, user_id = seeded
+    provider = CountingProvider(fail=True)
+    agent = ReportAgent(llm_provider=CachedProvider(provider, None))
+    agent.llm_deadline_seconds = 5
+
+    async def runner():
+        results = []
+        for _ in range(2):
+            async with session_factory() as db:
+                results.append(await agent.bind(MCPClient(db)).generate_daily_report(user_id))
+        return results
+
+    first, second = asyncio.run(runner())
+    assert not second["reused"] and second["report_id"] != first["report_id"]
+
+
+class CombinedProvider(CountingProvider):
+    """Answers a combined prompt with the daily and weekly sections only"""
+
+    def generate_text(self, prompt: str, chat_history: list = None,
+                      max_output_tokens: int = None, temperature: float = None):
+        self.calls += 1
+        if "=== DAILY REPORT ===" in prompt:
+            return "=== DAILY REPORT ===\nA calm day.\n\n=== WEEKLY REPORT ===\nA busy week.\n"
+        return "Executive Summary: steady progress."
+
+
+def test_period_reports_share_one_fetch(seeded):
+    session_factory, user_id = seeded
+    provider = CombinedProvider()
+    agent = ReportAgent(llm_provider=CachedProvider(provider, None))
+
+    async def runner():
+        async with session_factory() as db:
+            now = datetime.utcnow()
+            db.add_all([Task(title="Older", user_id=user_id, status=TaskStatus.PENDING, created_at=now - timedelta(days=3)),
+                        Task(title="Oldest", user_id=user_id, status=TaskStatus.PENDING, created_at=now - timedelta(days=20))])
+            await db.commit()
+        async with session_factory() as db:
+            mcp_client = MCPClient(db, session_factory=session_factory)
+            snapshots = []
+            load_period_snapshots = mcp_client.load_period_snapshots
+
+            async def counting_load(*args, **kwargs):
+                snapshots.append(args[1])
+                return await load_period_snapshots(*args, **kwargs)
+
+            mcp_client.load_period_snapshots = counting_load
+            reports = await agent.bind(mcp_client).generate_period_reports(user_id, combine_llm_calls=True)
+            separate = await agent.bind(MCPClient(db)).generate_weekly_report(user_id, force=True)
+        return reports, snapshots, separate
+
+    reports, snapshots, separate = asyncio.run(runner())
+    assert snapshots == [["daily", "weekly", "monthly"]]
+    assert [reports[period]["statistics"]["total_tasks"] for period in ("daily", "weekly", "monthly")] == [3, 4, 5]
+    assert reports["weekly"]["statistics"] == separate["statistics"]
+    assert (reports["daily"]["summary"], reports["weekly"]["summary"]) == ("A calm day.", "A busy week.")
+    # The monthly section was missing from the combined response, so it got a call of its own
+    assert reports["monthly"]["summary"] == "Executive Summary: steady progress."
+    assert provider.calls == 3
@@ -0,0 +1,112 @@
+"""
+Tests for the background report job queue
+"""
+import asyncio
+from datetime import datetime, timedelta
+
+from agents.doc_writer_agent import DocWriterAgent
+from agents.report_agent import ReportAgent
+from agents.report_jobs import ReportJobQueue
+from models.db_schemes.schemes.report_job import Report_Job
+from models.db_schemes.schemes.user import User
+from models.db_schemes.schemes.task import Task
+from models.enums.job_status import JobStatus
+from models.enums.report_type import ReportType
+from models.enums.task_status import TaskStatus
+
+
+class FlakyAgent(ReportAgent):
+    """Fails the first `failures` weekly reports"""
+
+    failures = 0
+
+    async def generate_weekly_report(self, user_id, generate_doc=False, on_event=None, force=False):
+        if FlakyAgent.failures > 0:
+            FlakyAgent.failures -= 1
+            raise RuntimeError("database connection lost")
+        return await super().generate_weekly_report(user_id, generate_doc, on_event=on_event, force=force)
+
+
+def seed_user_tasks(db):
+    user = User(name="Job User", email="jobs@example.com")
+    db.add(user)
+    db.flush()
+    for i in range(3):
+        db.add(Task(title=f"Task {i}", user_id=user.id, status=TaskStatus.COMPLETED,
+                    created_at=datetime.utcnow() - timedelta(hours=i + 1)))
+    return user.id
+
+
+def make_queue(database, tmp_path, agent_class=ReportAgent, **kwargs):
+    user_id = database.seed(seed_user_tasks)
+    agent = agent_class(doc_writer=DocWriterAgent(output_dir=str(tmp_path / "docs")))
+    agent.llm_provider = None
+    options = {"retry_delay_seconds": 0, "poll_seconds": 0.05, **kwargs}
+    return ReportJobQueue(database.session_factory, agent, **options), user_id
+
+
+def test_workers_run_queued_jobs_and_record_the_result(database, tmp_path):
+    queue, user_id = make_queue(database, tmp_path)
+
+    async def runner():
+        await queue.start()
+        try:
+            job = await queue.enqueue(user_id, ReportType.WEEKLY, generate_document=True)
+            assert job["status"] == "Queued"
+            for _ in range(100):
+                current = await queue.get(job["job_id"], user_id=user_id)
+                if current["status"] == "Succeeded":
+                    return current
+                await asyncio.sleep(0.05)
+        finally:
+            await queue.stop()
+
+    job = asyncio.run(runner())
+    assert (job["progress"], job["stage"], job["attempts"]) == (100, "done", 1)
+    assert job["result"]["report_type"] == "Weekly" and job["result"]["task_count"] == 3
+    assert job["result"]["document_path"].endswith(".docx")
+    assert asyncio.run(queue.get(job["job_id"], user_id=user_id + 1)) is None
+
+
+def test_failures_are_retried_until_max_attempts(database, tmp_path):
+    queue, user_id = make_queue(database, tmp_path, FlakyAgent, max_attempts=2)
+
+    async def runner():
+        FlakyAgent.failures = 1
+        recovered = await queue.enqueue(user_id, ReportType.WEEKLY)
+        await queue.run_pending()
+        FlakyAgent.failures = 5
+        failed = await queue.enqueue(user_id, ReportType.WEEKLY)
+        await queue.run_pending()
+        missing_user = await queue.enqueue(user_id + 1, ReportType.DAILY)
+        await queue.run_pending()
+        return [await queue.get(job["job_id"]) for job in (recovered, failed, missing_user)]
+
+    recovered, failed, missing_user = asyncio.run(runner())
+    assert (recovered["status"], recovered["attempts"]) == ("Succeeded", 2)
+    assert (failed["status"], failed["attempts"]) == ("Failed", 2)
+    assert "connection lost" in failed["error"]
+    # A missing user fails the same way every time, so it is not retried
+    assert (missing_user["status"], missing_user["attempts"]) == ("Failed", 1)
+
+
+def test_jobs_left_running_are_queued_again(database, tmp_path):
+    queue, user_id = make_queue(database, tmp_path, stale_seconds=60)
+
+    async def runner():
+        async with queue.session_factory() as db:
+            old = datetime.utcnow() - timedelta(minutes=5)
+            db.add_all([
+                Report_Job(user_id=user_id, report_type=ReportType.DAILY, status=JobStatus.RUNNING,
+                           attempts=1, max_attempts=3, heartbeat_at=old),
+                Report_Job(user_id=user_id, report_type=ReportType.DAILY, status=JobStatus.RUNNING,
+                           attempts=3, max_attempts=3, heartbeat_at=old),
+                Report_Job(user_id=user_id, report_type=ReportType.DAILY, status=JobStatus.RUNNING,
+                           attempts=1, max_attempts=3, heartbeat_at=datetime.utcnow()),
+            ])
+            await db.commit()
+        assert await queue.requeue_stale() == 2
+        return [await queue.get(job_id) for job_id in (1, 2, 3)]
+
+    statuses = [job["status"] for job in asyncio.run(runner())]
+    assert statuses == ["Queued", "Failed", "Running"]
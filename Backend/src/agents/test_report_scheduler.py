@@ -0,0 +1,129 @@
+"""
+Tests for scheduled bulk report generation
+"""
+import asyncio
+import time
+from datetime import date, datetime, timedelta
+
+import pytest
+from sqlalchemy import select
+
+from agents.report_agent import ReportAgent
+from agents.report_scheduler import ReportScheduler, RequestPacer, check_run_day, parse_report_types, period_start
+from models.db_schemes.schemes.ai_report import AI_Report
+from models.db_schemes.schemes.report_schedule_run import Report_Schedule_Run
+from models.db_schemes.schemes.user import User
+from models.enums.job_status import JobStatus
+from models.enums.report_type import ReportType
+from models.enums.user_status import UserStatus
+
+
+class FlakyAgent(ReportAgent):
+    """Fails the first daily report of each user in fail_once"""
+
+    def __init__(self, fail_once):
+        super().__init__()
+        self.llm_provider = None
+        self.fail_once = set(fail_once)
+
+    async def generate_daily_report(self, user_id, generate_doc=False, **kwargs):
+        if user_id in self.fail_once:
+            self.fail_once.discard(user_id)
+            raise RuntimeError("database connection lost")
+        return await super().generate_daily_report(user_id, generate_doc, **kwargs)
+
+
+def seed_users(db):
+    for i in range(6):
+        db.add(User(name=f"User {i}", email=f"user{i}@example.com",
+                    status=UserStatus.INACTIVE if i == 4 else UserStatus.ACTIVE))
+
+
+def make_scheduler(database, agent=None, **kwargs):
+    database.seed(seed_users)
+    if agent is None:
+        agent = ReportAgent()
+        agent.llm_provider = None
+    options = {"batch_size": 2, "concurrency": 2, "llm_calls_per_minute": 0, **kwargs}
+    return ReportScheduler(database.session_factory, agent, **options)
+
+
+async def reported_users(scheduler):
+    async with scheduler.session_factory() as db:
+        return sorted(await db.scalars(select(AI_Report.user_id)))
+
+
+def test_run_generates_a_report_for_each_active_user_once(database):
+    scheduler = make_scheduler(database)
+
+    async def runner():
+        first = await scheduler.run(ReportType.DAILY)
+        second = await scheduler.run(ReportType.DAILY, datetime.utcnow().date())
+        return first, second, await reported_users(scheduler)
+
+    first, second, users = asyncio.run(runner())
+    assert (first["status"], first["users_succeeded"], first["last_user_id"]) == ("Succeeded", 5, 6)
+    assert second == first
+    assert users == [1, 2, 3, 4, 6]
+
+
+def test_interrupted_run_resumes_after_its_checkpoint(database):
+    scheduler = make_scheduler(database, stale_seconds=60)
+    started = datetime.utcnow() - timedelta(minutes=10)
+    week = period_start(ReportType.WEEKLY, datetime.utcnow().date())
+
+    async def runner():
+        async with scheduler.session_factory() as db:
+            # Stopped while running the batch after user 2; user 3 already got their report
+            db.add(Report_Schedule_Run(report_type=ReportType.WEEKLY, period_start=week,
+                                       status=JobStatus.RUNNING, last_user_id=2, users_succeeded=2,
+                                       users_failed=0, users_skipped=0, started_at=started,
+                                       heartbeat_at=started))
+            db.add(AI_Report(user_id=3, report_type=ReportType.WEEKLY, summary_text="done", generated_at=started))
+            await db.commit()
+        run = await scheduler.run(ReportType.WEEKLY)
+        return run, await reported_users(scheduler)
+
+    run, users = asyncio.run(runner())
+    assert run["period_start"] == week.isoformat()
+    assert (run["status"], run["users_succeeded"], run["users_skipped"]) == ("Succeeded", 4, 1)
+    assert users == [3, 4, 6]
+
+
+def test_pacer_spaces_out_concurrent_starts():
+    pacer = RequestPacer(0.05)
+
+    async def starts():
+        begin = time.monotonic()
+        await asyncio.gather(*(pacer.wait() for _ in range(4)))
+        return time.monotonic() - begin
+
+    assert asyncio.run(starts()) >= 0.15
+
+
+def test_report_types_and_periods():
+    assert parse_report_types("daily, Monthly") == [ReportType.DAILY, ReportType.MONTHLY]
+    with pytest.raises(ValueError):
+        parse_report_types("custom")
+    assert period_start(ReportType.WEEKLY, date(2026, 10, 17)) == date(2026, 10, 12)
+    assert period_start(ReportType.MONTHLY, date(2026, 10, 17)) == date(2026, 10, 1)
+
+
+def test_failed_users_are_retried_within_the_run(database):
+    scheduler = make_scheduler(database, FlakyAgent(fail_once=[2, 6]), retry_attempts=1, retry_delay_seconds=0)
+
+    async def runner():
+        return await scheduler.run(ReportType.DAILY), await reported_users(scheduler)
+
+    run, users = asyncio.run(runner())
+    assert (run["status"], run["users_succeeded"], run["users_failed"]) == ("Succeeded", 5, 0)
+    assert users == [1, 2, 3, 4, 6]
+
+
+def test_only_the_current_period_can_be_run(database):
+    scheduler = make_scheduler(database)
+    today = datetime.utcnow().date()
+
+    assert check_run_day(ReportType.MONTHLY, today) == today.replace(day=1)
+    with pytest.raises(ValueError):
+        asyncio.run(scheduler.run(ReportType.DAILY, today - timedelta(days=1)))
@@ -0,0 +1,54 @@
+"""
+Tests for the report prompt and fallback templates
+"""
+from datetime import datetime
+
+from agents.report_records import StatusEvent, TaskRecord
+from agents.report_templates import ReportProfile, ReportStats, ReportTemplates
+from agents.stats_engine import compute_statistics_in_memory
+from models.enums.task_status import TaskStatus
+
+NOW = datetime(2026, 3, 4, 10, 11, 12)
+
+
+def make_tasks():
+    return [
+        TaskRecord(1, "Write spec", None, TaskStatus.COMPLETED, datetime(2026, 3, 2, 9), None,
+                   (StatusEvent(1, 1, TaskStatus.COMPLETED, datetime(2026, 3, 2, 12), "Reviewed"),)),
+        TaskRecord(2, None, None, TaskStatus.PENDING, datetime(2026, 3, 3, 9), None, ()),
+    ]
+
+
+def test_stats_are_normalized_from_the_statistics_dict():
+    stats = ReportStats.from_statistics(compute_statistics_in_memory("weekly", make_tasks(), by_day=True))
+
+    assert (stats.total_tasks, stats.completed_tasks, stats.pending_tasks) == (2, 1, 1)
+    assert stats.most_productive_day == ("2026-03-02", 1)
+    assert [note.note for note in stats.notes] == ["Reviewed"]
+    assert ReportStats.from_statistics(None).most_productive_day.day == "N/A"
+    assert ReportProfile.from_user(None) == ReportProfile("User", "user@example.com", "N/A")
+
+
+def test_fallback_renders_from_normalized_stats():
+    tasks = make_tasks()
+    stats = ReportStats.from_statistics(compute_statistics_in_memory("weekly", tasks, by_day=True))
+    text = ReportTemplates().render("weekly", "fallback", profile=ReportProfile("Ada", "ada@example.com", "Engineer"),
+                                    stats=stats, tasks=tasks, parameters=None, now=NOW)
+
+    assert "Prepared for: Ada (ada@example.com)" in text
+    assert "Report Generated: 2026-03-04 10:11:12" in text
+    assert "1. Write spec [Completed]\n2. Untitled Task [Pending]" in text
+    assert "1. [Completed] 2026-03-02: Reviewed" in text
+    assert "• Most Productive Day: 2026-03-02 (1 tasks)" in text
+
+
+def test_templates_dir_overrides_only_the_templates_it_contains(tmp_path):
+    (tmp_path / "daily").mkdir()
+    (tmp_path / "daily" / "fallback.j2").write_text("Short report for {{ profile.name }}: {{ stats.total_tasks }} tasks")
+    templates = ReportTemplates(str(tmp_path))
+    context = {"profile": ReportProfile("Ada"), "stats": ReportStats(total_tasks=3), "tasks": [], "parameters": None}
+
+    assert templates.render("daily", "fallback", now=NOW, **context) == "Short report for Ada: 3 tasks"
+    assert templates.render("daily", "instructions", **context).startswith("INSTRUCTIONS:")
+    assert '"start_date": "2026-01-01"' in templates.render(
+        "custom", "context", **{**context, "parameters": {"start_date": "2026-01-01"}})
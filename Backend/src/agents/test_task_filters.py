@@ -0,0 +1,101 @@
+"""
+Tests for compiling custom report filters into SQL
+"""
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+from agents.task_filters import compile_task_filters, compile_custom_report_filters, TaskFilterError
+from models.db_schemes.schemes.base import Base
+from models.db_schemes.schemes.user import User
+from models.db_schemes.schemes.task import Task
+from models.db_schemes.schemes.student_task import Student_Task
+from models.db_schemes.schemes.business_task import Business_Task
+from models.db_schemes.schemes.certification_task import Certification_Task
+from models.enums.task_status import TaskStatus
+from models.enums.priority import Priority
+
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path}/filters.db")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+
+    user = User(name="Filter User", email="filters@example.com")
+    db.add(user)
+    db.flush()
+
+    now = datetime.utcnow()
+
+    def add(title, status, created_days_ago, subtype=None, description=None):
+        task = Task(title=title, description=description, user_id=user.id, status=status,
+                    created_at=now - timedelta(days=created_days_ago))
+        db.add(task)
+        db.flush()
+        if subtype is not None:
+            subtype.task_id = task.id
+            db.add(subtype)
+
+    add("Thesis draft", TaskStatus.IN_PROGRESS, 1,
+        Student_Task(subject="CS", deadline=now + timedelta(days=3)), description="Chapter 100% done")
+    add("Exam prep", TaskStatus.PENDING, 20, Student_Task(subject="Math", deadline=now + timedelta(days=40)))
+    add("Launch plan", TaskStatus.COMPLETED, 2,
+        Business_Task(project_name="Launch", priority=Priority.HIGH, due_date=now + timedelta(days=5)))
+    add("Budget review", TaskStatus.OVERDUE, 60,
+        Business_Task(project_name="Budget", priority=Priority.LOW, due_date=now - timedelta(days=1)))
+    add("AWS cert", TaskStatus.PENDING, 3, Certification_Task(certification_name="AWS", issuer="Amazon"))
+    db.commit()
+    return db
+
+
+def titles(db, filters):
+    clauses = compile_task_filters(filters)
+    return sorted(db.execute(select(Task.title).where(*clauses)).scalars())
+
+
+def test_status_type_and_priority_filters(db):
+    assert titles(db, {"status": "Pending"}) == ["AWS cert", "Exam prep"]
+    assert titles(db, {"status": ["Completed", "Overdue"]}) == ["Budget review", "Launch plan"]
+    assert titles(db, {"task_type": "student"}) == ["Exam prep", "Thesis draft"]
+    assert titles(db, {"task_type": ["business", "certification"], "status": "Pending"}) == ["AWS cert"]
+    assert titles(db, {"priority": "High"}) == ["Launch plan"]
+
+
+def test_text_filter_escapes_wildcards(db):
+    assert titles(db, {"text": "thesis"}) == ["Thesis draft"]
+    assert titles(db, {"text": "100%"}) == ["Thesis draft"]
+    assert titles(db, {"text": "%"}) == ["Thesis draft"]
+
+
+def test_date_ranges_and_deadline_windows(db):
+    today = datetime.utcnow().date()
+    week_ago = (today - timedelta(days=7)).isoformat()
+    assert titles(db, {"created_after": week_ago}) == ["AWS cert", "Launch plan", "Thesis draft"]
+    assert titles(db, {"created_before": week_ago}) == ["Budget review", "Exam prep"]
+    assert titles(db, {"deadline_within_days": 7}) == ["Launch plan", "Thesis draft"]
+    assert titles(db, {"deadline_within_days": 7, "task_type": "student"}) == ["Thesis draft"]
+    assert titles(db, {"deadline_before": today.isoformat()}) == ["Budget review"]
+
+
+def test_custom_report_parameters_bound_creation_time(db):
+    week_ago = (datetime.utcnow() - timedelta(days=7)).date().isoformat()
+    clauses = compile_custom_report_filters({"start_date": week_ago, "end_date": None,
+                                             "task_filters": {"status": "Pending"}})
+    assert list(db.execute(select(Task.title).where(*clauses)).scalars()) == ["AWS cert"]
+
+
+@pytest.mark.parametrize("filters", [
+    {"assignee": 3},
+    {"status": "Done"},
+    {"task_type": []},
+    {"text": ""},
+    {"created_after": "yesterday"},
+    {"created_after": "2024-02-01", "created_before": "2024-01-01"},
+    {"deadline_within_days": -1},
+])
+def test_invalid_filters_are_rejected(filters):
+    with pytest.raises(TaskFilterError):
+        compile_task_filters(filters)
@@ -0,0 +1,102 @@
+"""
+Tests for team statistics aggregated over chunks of users
+"""
+import asyncio
+import os
+from datetime import datetime, timedelta
+
+import pytest
+
+from agents.doc_writer_agent import DocWriterAgent
+from agents.mcp_client import MCPClient
+from agents.report_agent import ReportAgent
+from agents.team_stats import TeamAggregates, percentile
+from llm.CachedProvider import CachedProvider
+from models.db_schemes.schemes.user import User
+from models.db_schemes.schemes.task import Task
+from models.db_schemes.schemes.task_status_history import Task_Status_History
+from models.enums.task_status import TaskStatus
+from models.enums.user_role import UserRole
+from models.enums.user_status import UserStatus
+from testing.providers import CountingProvider
+
+
+def seed_team(db):
+    statuses = [TaskStatus.COMPLETED, TaskStatus.IN_PROGRESS, TaskStatus.OVERDUE, TaskStatus.PENDING]
+    db.add(User(name="Admin", email="admin@example.com", role=UserRole.ADMIN))
+    db.add(User(name="Former", email="former@example.com", status=UserStatus.INACTIVE))
+    db.flush()
+    now = datetime.utcnow()
+    for i in range(5):
+        user = User(name=f"Member {i}", email=f"member{i}@example.com")
+        db.add(user)
+        db.flush()
+        for j in range(i + 1):
+            created = now - timedelta(days=j % 3, hours=1)
+            status = statuses[(i + j) % len(statuses)]
+            task = Task(title=f"Task {i}.{j}", user_id=user.id, status=status, created_at=created)
+            db.add(task)
+            db.flush()
+            db.add(Task_Status_History(task_id=task.id, status=TaskStatus.PENDING, updated_at=created))
+            if status == TaskStatus.COMPLETED:
+                db.add(Task_Status_History(task_id=task.id, status=status,
+                                           updated_at=created + timedelta(minutes=30 * (i + 1))))
+
+
+@pytest.fixture
+def session_factory(database):
+    database.seed(seed_team)
+    return database.session_factory
+
+
+def test_percentile_interpolates_between_values():
+    assert percentile([], 50) == 0.0
+    assert percentile([4.0], 90) == 4.0
+    assert percentile([1.0, 2.0, 3.0, 4.0], 50) == 2.5
+    assert percentile([1.0, 2.0, 3.0, 4.0], 100) == 4.0
+
+
+def test_merge_adds_counts_and_keeps_hours_sorted():
+    merged = TeamAggregates(status_counts={"Completed": 1}, day_counts={"2024-01-01": 1},
+                            history_rows=2, completion_hours=[1.0, 5.0]).merge(
+        TeamAggregates(status_counts={"Completed": 2, "Pending": 1}, day_counts={"2024-01-01": 3},
+                       history_rows=4, completion_hours=[2.0, 3.0]))
+    assert merged.status_counts == {"Completed": 3, "Pending": 1}
+    assert merged.day_counts == {"2024-01-01": 4}
+    assert merged.history_rows == 6
+    assert merged.completion_hours == [1.0, 2.0, 3.0, 5.0]
+
+
+def test_chunked_statistics_match_a_single_chunk(session_factory, tmp_path):
+
+    async def runner():
+        async with session_factory() as db:
+            mcp = MCPClient(db, session_factory=session_factory)
+            single = await mcp.get_team_statistics("monthly", UserRole.USER, None, chunk_size=100)
+            chunked = await mcp.get_team_statistics("monthly", UserRole.USER, None, chunk_size=2, concurrency=2)
+            selected = await mcp.get_team_statistics("monthly", None, [3, 4], chunk_size=1)
+            return single, chunked, selected
+
+    single, chunked, selected = asyncio.run(runner())
+    assert chunked == single
+    # The inactive user and the admin are not members
+    assert single["member_count"] == 5 and single["total_tasks"] == 15
+    assert single["completion_time_percentiles"]["p50"] > 0
+    assert selected["member_count"] == 2 and selected["total_tasks"] == 3
+
+
+def test_team_report_is_saved_for_the_admin_with_a_document(session_factory, tmp_path):
+    doc_writer = DocWriterAgent(output_dir=str(tmp_path / "docs"))
+    agent = ReportAgent(llm_provider=CachedProvider(CountingProvider(fail=True), None), doc_writer=doc_writer)
+    agent.llm_deadline_seconds = 5
+
+    async def runner():
+        async with session_factory() as db:
+            return await agent.bind(MCPClient(db, session_factory=session_factory)).generate_team_report(
+                1, period="weekly", generate_doc=True, chunk_size=2)
+
+    result = asyncio.run(runner())
+    assert result["report_type"] == "Team" and result["summary"]
+    # Without a role or IDs every active user is a member, the admin included
+    assert result["statistics"]["member_count"] == 6
+    assert result["document_path"].endswith(".docx") and os.path.exists(result["document_path"])
@@ -25,7 +25,54 @@ class Settings(BaseSettings):
     access_token_expire_minutes: int = 30
     
     # LLM Settings
+    llm_provider: str = "gemini"  # "gemini", or "local_stub" for offline load tests and benchmarks
     gemini_api_key: Optional[str] = None 
+    llm_cache_enabled: bool = True
+    # Outside the source tree by default; None keeps the cache in memory only
+    llm_cache_path: Optional[str] = os.path.join(os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"),
+                                                 "data2paper", "llm_responses.sqlite3")
+    llm_cache_ttl_seconds: int = 86400
+    llm_cache_memory_entries: int = 256
+    llm_cache_disk_entries: int = 10000
+    llm_max_concurrency: int = 8  # LLM calls in flight across the process
+    llm_timeout_seconds: float = 60.0
+    llm_prompt_token_budget: int = 2000  # estimated input tokens per report summary prompt
+    llm_prompt_note_chars: int = 240  # status notes longer than this are truncated in prompts
+    llm_report_deadline_seconds: float = 30.0  # LLM time per report, retries included, before the template is used
+    llm_retry_attempts: int = 3
+    llm_retry_base_delay_seconds: float = 0.5
+    llm_retry_max_delay_seconds: float = 4.0
+    llm_breaker_failure_threshold: int = 5  # consecutive failed attempts that open the circuit
+    llm_breaker_reset_seconds: float = 30.0  # how long the circuit stays open before a trial call
+    report_templates_dir: Optional[str] = None  # templates here replace the built-in prompt and fallback templates
+    llm_call_log_enabled: bool = False  # log every LLM call as a line of JSON on the "llm.calls" logger
+    llm_cost_per_1k_input_tokens: float = 0.0  # prices for the llm_cost_total metric; 0 leaves it out
+    llm_cost_per_1k_output_tokens: float = 0.0
+    llm_stub_latency_ms: float = 800.0
+    llm_stub_latency_jitter_ms: float = 200.0
+    llm_stub_latency_distribution: str = "lognormal"  # fixed, uniform, normal or lognormal
+    llm_stub_failure_rate: float = 0.0
+    llm_stub_seed: int = 0
+    
+    # Report Settings
+    stats_use_rollups: bool = False  # Enable after running `python manage_rollups.py backfill`
+    report_job_workers: int = 2  # background report jobs run at the same time per process
+    report_job_max_attempts: int = 3
+    report_job_retry_delay_seconds: float = 30.0  # doubles with each attempt
+    report_job_stale_seconds: float = 600.0  # running jobs without progress for this long are queued again
+    report_job_poll_seconds: float = 2.0
+    report_schedule_enabled: bool = False  # generate reports for every active user each night
+    report_schedule_types: str = "daily"  # comma-separated: daily, weekly, monthly
+    report_schedule_hour: int = 1  # UTC hour the nightly run starts
+    report_schedule_window_minutes: float = 240.0  # spread each run's users over this window; 0 runs them back to back
+    report_schedule_batch_size: int = 100
+    report_schedule_concurrency: int = 4
+    report_schedule_llm_calls_per_minute: float = 60.0  # 0 for no limit
+    report_schedule_generate_documents: bool = False
+    report_schedule_retry_attempts: int = 2  # extra attempts for each user whose report failed, per batch
+    report_schedule_retry_delay_seconds: float = 30.0  # doubles with each attempt
+    team_report_chunk_size: int = 500  # users aggregated per statement in team reports
+    team_report_concurrency: int = 4  # chunks aggregated at the same time
     
     # OAuth Settings
     google_client_id: Optional[str] = None
@@ -54,4 +101,8 @@ class Settings(BaseSettings):
     def DATABASE_URL(self) -> str:
         return f"postgresql://{self.database_username}:{self.database_password}@{self.database_hostname}:{self.database_port}/{self.database_name}"
 
+    @property
+    def ASYNC_DATABASE_URL(self) -> str:
+        return f"postgresql+asyncpg://{self.database_username}:{self.database_password}@{self.database_hostname}:{self.database_port}/{self.database_name}"
+
 settings = Settings()
\ No newline at end of file
@@ -0,0 +1,25 @@
+"""
+Settings and shared fixtures for the test suite
+
+Importing the routes package loads the settings before any test module runs,
+so the required database settings get placeholder values here; the engines
+they configure are never connected. Tests use local SQLite files instead,
+through the database fixture.
+"""
+import os
+
+os.environ.setdefault("DATABASE_PORT", "5432")
+for name in ("DATABASE_HOSTNAME", "DATABASE_PASSWORD", "DATABASE_NAME", "DATABASE_USERNAME"):
+    os.environ.setdefault(name, "test")
+
+import pytest
+
+from testing.database import SQLiteDatabase
+
+
+@pytest.fixture
+def database(tmp_path):
+    """An empty SQLite database with every table, seeded synchronously and read through async sessions"""
+    db = SQLiteDatabase(tmp_path / "test.db")
+    yield db
+    db.dispose()
@@ -1,6 +1,7 @@
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from config import settings
 
 from models.db_schemes.schemes.base import SQLAlchemyBase
@@ -11,10 +12,21 @@ SQLALCHEMY_DATABASE_URL = settings.DATABASE_URL
 engine = create_engine(SQLALCHEMY_DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine (asyncpg driver) used by the report pipeline so database
+# round trips do not block the event loop
+ASYNC_SQLALCHEMY_DATABASE_URL = settings.ASYNC_DATABASE_URL
+
+async_engine = create_async_engine(ASYNC_SQLALCHEMY_DATABASE_URL)
+AsyncSessionLocal = sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
 def get_db():
     db = SessionLocal()
     try:
         return db
     finally:
         pass
-        # Don't close the session here, let the caller handle it
\ No newline at end of file
+        # Don't close the session here, let the caller handle it
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Print EXPLAIN plans for the report and listing hot queries
+
+Usage:
+    python explain_queries.py [--user-id ID] [--analyze] [--check]
+
+--analyze runs EXPLAIN (ANALYZE, BUFFERS) on PostgreSQL. --check exits with
+status 1 if any hot query falls back to a full table scan, which is only
+meaningful on tables with realistic data volumes.
+"""
+import argparse
+import sys
+import os
+from datetime import datetime, timedelta
+from typing import Dict, List, Tuple
+
+# Add the current directory to the Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import select, func, tuple_
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import Executable, ClauseElement
+
+from models.db_schemes.schemes.task import Task
+from models.db_schemes.schemes.task_status_history import Task_Status_History
+from models.db_schemes.schemes.ai_report import AI_Report
+from models.db_schemes.schemes.user import User
+from models.enums.task_status import TaskStatus
+from agents.report_records import TASK_RECORD_COLUMNS, STATUS_EVENT_COLUMNS
+
+
+class Explain(Executable, ClauseElement):
+    """EXPLAIN wrapper around a select statement"""
+    inherit_cache = False
+
+    def __init__(self, statement, analyze: bool = False):
+        self.statement = statement
+        self.analyze = analyze
+
+
+@compiles(Explain)
+def _compile_explain(element, compiler, **kw):
+    return "EXPLAIN " + compiler.process(element.statement, **kw)
+
+
+@compiles(Explain, "postgresql")
+def _compile_explain_postgresql(element, compiler, **kw):
+    options = "(ANALYZE, BUFFERS) " if element.analyze else ""
+    return f"EXPLAIN {options}" + compiler.process(element.statement, **kw)
+
+
+@compiles(Explain, "sqlite")
+def _compile_explain_sqlite(element, compiler, **kw):
+    return "EXPLAIN QUERY PLAN " + compiler.process(element.statement, **kw)
+
+
+def hot_queries(user_id: int, task_id: int) -> Dict[str, object]:
+    """The statements issued by MCPClient, TaskStatisticsEngine and the CRUD list methods, keyed by name"""
+    window = [Task.user_id == user_id, Task.created_at >= datetime.utcnow() - timedelta(days=30)]
+    keyset = (Task.created_at, Task.id)
+
+    def after(model):
+        # Keyset condition used by CRUDBase.paginate with a cursor
+        return tuple_(model.created_at, model.id) > tuple_(datetime.utcnow() - timedelta(days=30), task_id)
+
+    return {
+        # MCPClient._fetch_tasks for a monthly report
+        "report_tasks": select(*TASK_RECORD_COLUMNS).where(*window).order_by(Task.id.asc()),
+        # MCPClient._fetch_history_by_task
+        "report_history": select(*STATUS_EVENT_COLUMNS)
+            .join(Task, Task.id == Task_Status_History.task_id)
+            .where(*window)
+            .order_by(Task_Status_History.task_id.asc(), Task_Status_History.updated_at.asc()),
+        # MCPClient._fetch_notes
+        "report_notes": select(*STATUS_EVENT_COLUMNS)
+            .join(Task, Task.id == Task_Status_History.task_id)
+            .where(*window, Task_Status_History.note.isnot(None))
+            .order_by(Task_Status_History.task_id.asc(), Task_Status_History.updated_at.asc()),
+        # TaskStatisticsEngine._task_counts without per-day grouping
+        "status_counts": select(Task.status, func.count(Task.id)).where(*window).group_by(Task.status),
+        # MCPClient.get_task_status_history
+        "task_history": select(*STATUS_EVENT_COLUMNS)
+            .where(Task_Status_History.task_id == task_id)
+            .order_by(Task_Status_History.updated_at.asc()),
+        # MCPClient.get_recent_reports
+        "recent_reports": select(AI_Report)
+            .where(AI_Report.user_id == user_id)
+            .order_by(AI_Report.generated_at.desc())
+            .limit(5),
+        # CRUDTask.get_multi_by_user, first page and a keyset page
+        "tasks_by_user": select(Task).where(Task.user_id == user_id).order_by(*keyset).limit(100),
+        "tasks_by_user_after": select(Task).where(Task.user_id == user_id, after(Task)).order_by(*keyset).limit(100),
+        # CRUDTask.get_multi_by_status
+        "tasks_by_status": select(Task).where(Task.status == TaskStatus.OVERDUE, after(Task))
+            .order_by(*keyset).limit(100),
+        # CRUDBase.get_multi for GET /tasks/ and GET /users/
+        "tasks_page": select(Task).where(after(Task)).order_by(*keyset).limit(100),
+        "users_page": select(User).where(after(User)).order_by(User.created_at, User.id).limit(100),
+    }
+
+
+def is_full_scan(plan_line: str) -> bool:
+    """Whether an EXPLAIN output line describes a full table scan"""
+    if "Seq Scan on" in plan_line:
+        return True
+    # SQLite reports full scans as "SCAN <table>" and index scans as "... USING ... INDEX"
+    line = plan_line.strip()
+    return line.startswith("SCAN ") and "INDEX" not in line
+
+
+def explain_all(connection, user_id: int, task_id: int, analyze: bool = False) -> List[Tuple[str, List[str]]]:
+    """Return (query name, plan lines) for every hot query"""
+    plans = []
+    for name, statement in hot_queries(user_id, task_id).items():
+        rows = connection.execute(Explain(statement, analyze=analyze)).fetchall()
+        # PostgreSQL returns one text column; SQLite returns (id, parent, notused, detail)
+        plans.append((name, [str(row[-1]) for row in rows]))
+    return plans
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Print EXPLAIN plans for the report and listing hot queries")
+    parser.add_argument("--user-id", type=int, default=1, help="user whose queries are explained")
+    parser.add_argument("--task-id", type=int, default=1, help="task used for per-task history queries")
+    parser.add_argument("--analyze", action="store_true", help="execute the queries (EXPLAIN ANALYZE on PostgreSQL)")
+    parser.add_argument("--check", action="store_true", help="exit with status 1 if any query does a full table scan")
+    args = parser.parse_args()
+
+    from database import engine
+
+    full_scans = []
+    with engine.connect() as connection:
+        for name, plan in explain_all(connection, args.user_id, args.task_id, args.analyze):
+            print(f"== {name}")
+            for line in plan:
+                print(f"   {line}")
+                if is_full_scan(line):
+                    full_scans.append(name)
+            print()
+
+    if args.check and full_scans:
+        print(f"Full table scans in: {', '.join(sorted(set(full_scans)))}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
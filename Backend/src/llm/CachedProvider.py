@@ -0,0 +1,118 @@
+from llm.LLMInterface import LLMInterface
+from llm.ResponseCache import ResponseCache
+import logging
+import time
+from typing import AsyncIterator, Iterable, Optional
+
+
+class CachedProvider(LLMInterface):
+    """Wraps any LLMInterface implementation and serves repeated generations from a ResponseCache"""
+
+    def __init__(self, provider: LLMInterface, cache: Optional[ResponseCache]):
+        """
+        Args:
+            provider (LLMInterface): The provider that actually generates text
+            cache (Optional[ResponseCache]): Cache to use; None disables caching
+        """
+        self.provider = provider
+        self.cache = cache
+        self.logger = logging.getLogger(__name__)
+
+    def __getattr__(self, name):
+        # Provider-specific helpers (set_embedding_model, embed_text, ...) pass through
+        if name == "provider":
+            raise AttributeError(name)
+        return getattr(self.provider, name)
+
+    def set_generation_model(self, model_id: str):
+        self.provider.set_generation_model(model_id)
+
+    def warm_up(self, max_output_tokens: Iterable[int] = (), temperature: Optional[float] = None):
+        self.provider.warm_up(max_output_tokens, temperature)
+
+    def generate_text(self, prompt: str, chat_history: list = None,
+                      max_output_tokens: int = None, temperature: float = None,
+                      use_cache: bool = True):
+        """Generate text, returning a cached response for an identical request
+
+        Pass use_cache=False to skip the lookup and always call the model; the
+        fresh response still replaces the cached one.
+        """
+        if self.cache is None:
+            return self.provider.generate_text(prompt, chat_history=chat_history,
+                                               max_output_tokens=max_output_tokens, temperature=temperature)
+
+        key = ResponseCache.make_key(getattr(self.provider, "generation_model_id", None), prompt,
+                                     chat_history, temperature, max_output_tokens)
+        if use_cache:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
+        # The key is computed before the call because providers may append to chat_history
+        response = self.provider.generate_text(prompt, chat_history=chat_history,
+                                               max_output_tokens=max_output_tokens, temperature=temperature)
+        if response:
+            self.cache.set(key, response)
+        return response
+
+    async def agenerate_text(self, prompt: str, chat_history: list = None,
+                             max_output_tokens: int = None, temperature: float = None,
+                             timeout: Optional[float] = None, use_cache: bool = True):
+        """Async generate_text; cache hits are answered without taking a concurrency slot
+        
+        The SQLite tier of the cache is read and written off the event loop.
+        """
+        if self.cache is None:
+            return await self.provider.agenerate_text(prompt, chat_history=chat_history,
+                                                      max_output_tokens=max_output_tokens,
+                                                      temperature=temperature, timeout=timeout)
+
+        key = ResponseCache.make_key(getattr(self.provider, "generation_model_id", None), prompt,
+                                     chat_history, temperature, max_output_tokens)
+        if use_cache:
+            start = time.perf_counter()
+            cached = await self.cache.aget(key)
+            if cached is not None:
+                self.record_call(prompt, cached, time.perf_counter() - start, outcome="success", cache_hit=True)
+                return cached
+
+        response = await self.provider.agenerate_text(prompt, chat_history=chat_history,
+                                                      max_output_tokens=max_output_tokens,
+                                                      temperature=temperature, timeout=timeout)
+        if response:
+            await self.cache.aset(key, response)
+        return response
+
+    async def astream_text(self, prompt: str, chat_history: list = None,
+                           max_output_tokens: int = None, temperature: float = None,
+                           timeout: Optional[float] = None, use_cache: bool = True) -> AsyncIterator[str]:
+        """Async stream_text; a cached response is yielded as a single chunk
+        
+        The streamed response is only cached once the stream has completed.
+        """
+        key = None
+        if self.cache is not None:
+            key = ResponseCache.make_key(getattr(self.provider, "generation_model_id", None), prompt,
+                                         chat_history, temperature, max_output_tokens)
+            if use_cache:
+                start = time.perf_counter()
+                cached = await self.cache.aget(key)
+                if cached is not None:
+                    self.record_call(prompt, cached, time.perf_counter() - start, outcome="success",
+                                     cache_hit=True, streamed=True)
+                    yield cached
+                    return
+
+        chunks = []
+        async for chunk in self.provider.astream_text(prompt, chat_history=chat_history,
+                                                      max_output_tokens=max_output_tokens,
+                                                      temperature=temperature, timeout=timeout):
+            chunks.append(chunk)
+            yield chunk
+
+        if key is not None and chunks:
+            await self.cache.aset(key, "".join(chunks))
+
+    def construct_prompt(self, prompt: str, role: str):
+        return self.provider.construct_prompt(prompt=prompt, role=role)
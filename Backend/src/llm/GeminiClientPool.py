@@ -0,0 +1,85 @@
+"""
+Process-wide Gemini client configuration and a pool of reusable GenerativeModel objects
+"""
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+import google.generativeai as genai
+from google.generativeai import client as genai_client
+
+
+class GeminiClientPool:
+
+    def __init__(self, max_models: int = 32):
+        """
+        Args:
+            max_models (int): GenerativeModel objects kept before the least recently used is dropped
+        """
+        self.max_models = max_models
+        self._lock = threading.Lock()
+        self._config: Optional[Tuple] = None
+        self._models: "OrderedDict[Tuple, genai.GenerativeModel]" = OrderedDict()
+        self.configure_calls = 0
+        self.models_created = 0
+
+    def configure(self, api_key: str, transport: Optional[str] = None, api_endpoint: Optional[str] = None):
+        """Configure the genai client, skipping the call when the configuration is unchanged
+
+        genai.configure discards the cached service clients and with them
+        their open connections, so it must not run on every request.
+        """
+        config = (api_key, transport, api_endpoint)
+        with self._lock:
+            if self._config == config:
+                return
+            genai.configure(api_key=api_key, transport=transport,
+                            client_options={"api_endpoint": api_endpoint} if api_endpoint else None)
+            self._config = config
+            self.configure_calls += 1
+            # Pooled models hold a client created with the old configuration
+            self._models.clear()
+
+    def model(self, model_id: str, max_output_tokens: int, temperature: float) -> genai.GenerativeModel:
+        """Return the shared GenerativeModel for a model ID and generation config"""
+        key = (model_id, max_output_tokens, temperature)
+        with self._lock:
+            model = self._models.get(key)
+            if model is not None:
+                self._models.move_to_end(key)
+                return model
+
+            model = genai.GenerativeModel(
+                model_id,
+                generation_config=genai.types.GenerationConfig(
+                    max_output_tokens=max_output_tokens,
+                    temperature=temperature
+                )
+            )
+            self._models[key] = model
+            self.models_created += 1
+            while len(self._models) > self.max_models:
+                self._models.popitem(last=False)
+            return model
+
+    def warm_up(self):
+        """Create the shared generative service client now instead of on the first call"""
+        genai_client.get_default_generative_client()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "configure_calls": self.configure_calls,
+                "models_created": self.models_created,
+                "pooled_models": len(self._models),
+            }
+
+    def reset(self):
+        """Forget the configuration and every pooled model"""
+        with self._lock:
+            self._config = None
+            self._models.clear()
+
+
+# Shared by every GeminiProvider in the process
+gemini_client_pool = GeminiClientPool()
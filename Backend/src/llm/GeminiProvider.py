@@ -1,8 +1,8 @@
 from llm.LLMInterface import LLMInterface
 from llm.LLMEnums import GeminiEnums, DocumentTypeEnum
-import google.generativeai as genai
+from llm.GeminiClientPool import GeminiClientPool, gemini_client_pool
 import logging
-from typing import List, Union
+from typing import Iterable, List, Optional, Union
 
 
 class GeminiProvider(LLMInterface):
@@ -10,9 +10,13 @@ class GeminiProvider(LLMInterface):
     def __init__(self, api_key: str,
                        default_input_max_characters: int = 1000,
                        default_generation_max_output_tokens: int = 1000,
-                       default_generation_temperature: float = 0.1):
+                       default_generation_temperature: float = 0.1,
+                       transport: Optional[str] = None,
+                       api_endpoint: Optional[str] = None,
+                       client_pool: Optional[GeminiClientPool] = None):
         
         self.api_key = api_key
+        self.client_pool = client_pool or gemini_client_pool
 
         self.default_input_max_characters = default_input_max_characters
         self.default_generation_max_output_tokens = default_generation_max_output_tokens
@@ -23,7 +27,8 @@ class GeminiProvider(LLMInterface):
         self.embedding_size = None
 
         try:
-            genai.configure(api_key=self.api_key)
+            # Configures the genai client only once per process for a given key
+            self.client_pool.configure(self.api_key, transport=transport, api_endpoint=api_endpoint)
         except Exception as e:
             raise RuntimeError(f"Failed to initialize Gemini client: {e}")
 
@@ -33,6 +38,15 @@ class GeminiProvider(LLMInterface):
     def set_generation_model(self, model_id: str):
         self.generation_model_id = model_id
 
+    def warm_up(self, max_output_tokens: Iterable[int] = (), temperature: Optional[float] = None):
+        """Create the service client and the pooled models for these generation settings"""
+        if not self.generation_model_id:
+            return
+        temperature = temperature or self.default_generation_temperature
+        for tokens in max_output_tokens or (self.default_generation_max_output_tokens,):
+            self.client_pool.model(self.generation_model_id, tokens, temperature)
+        self.client_pool.warm_up()
+
     def set_embedding_model(self, model_id: str, embedding_size: int = None):
         """
         Sets embedding model and optional size.
@@ -62,31 +76,21 @@ class GeminiProvider(LLMInterface):
 
         try:
             # Convert chat history to the format expected by Gemini
-            history = []
-            for msg in chat_history[:-1]:  # All messages except the last one
-                history.append({
-                    "role": msg["role"],
-                    "parts": [{"text": msg["text"]}]
-                })
-            
-            # Initialize the model
-            model = genai.GenerativeModel(self.generation_model_id)
-            
-            # Start chat with history
-            chat = model.start_chat(history=history)
+            contents = [
+                {"role": msg["role"], "parts": [{"text": msg["text"]}]}
+                for msg in chat_history
+            ]
             
-            # Send the latest message
-            response = chat.send_message(
-                chat_history[-1]["text"],  # The last message (current prompt)
-                generation_config=genai.types.GenerationConfig(
-                    max_output_tokens=max_output_tokens,
-                    temperature=temperature
-                )
-            )
+            # Reuse the pooled model for this configuration; a single
+            # generate_content call replaces a throwaway chat session
+            model = self.client_pool.model(self.generation_model_id, max_output_tokens, temperature)
+            response = model.generate_content(contents)
             
         except Exception as e:
+            # Raised rather than returned as None so wrappers can tell a rejected
+            # request (bad key, bad prompt) from a transient failure
             self.logger.error(f"Error calling Gemini API: {e}")
-            return None
+            raise
 
         if not response or not response.text:
             self.logger.error("Error while generating text with Gemini")
@@ -94,6 +98,43 @@ class GeminiProvider(LLMInterface):
         
         return response.text
 
+    def stream_text(self, prompt: str, chat_history: list = None,
+                    max_output_tokens: int = None, temperature: float = None):
+        """Yield the response text chunk by chunk using Gemini's streaming mode"""
+        if not self.generation_model_id:
+            raise RuntimeError("Generation model for Gemini was not set")
+
+        max_output_tokens = max_output_tokens or self.default_generation_max_output_tokens
+        temperature = temperature or self.default_generation_temperature
+
+        if chat_history is None:
+            chat_history = []
+
+        chat_history.append(self.construct_prompt(prompt=prompt, role=GeminiEnums.USER.value))
+        contents = [
+            {"role": msg["role"], "parts": [{"text": msg["text"]}]}
+            for msg in chat_history
+        ]
+
+        model = self.client_pool.model(self.generation_model_id, max_output_tokens, temperature)
+        produced = False
+        try:
+            for chunk in model.generate_content(contents, stream=True):
+                # Chunks without text parts (e.g. the final finish-reason chunk) raise on .text
+                try:
+                    text = chunk.text
+                except ValueError:
+                    continue
+                if text:
+                    produced = True
+                    yield text
+        except Exception as e:
+            self.logger.error(f"Error streaming from Gemini API: {e}")
+            raise
+
+        if not produced:
+            raise RuntimeError("Gemini returned no text")
+
     def embed_text(self, text: Union[str, List[str]], document_type: str = None):
         """
         Create embeddings for text(s) using Gemini.
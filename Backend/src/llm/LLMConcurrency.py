@@ -0,0 +1,139 @@
+"""
+Runs blocking LLM calls off the event loop with a global concurrency cap and per-call timeouts
+"""
+import asyncio
+import contextvars
+import functools
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Callable, Optional
+
+
+class LLMConcurrencyLimiter:
+
+    def __init__(self, max_concurrency: int = 8, default_timeout: Optional[float] = 60.0):
+        """
+        Args:
+            max_concurrency (int): Maximum number of LLM calls in flight across the process
+            default_timeout (Optional[float]): Seconds a call may take, including time spent
+                waiting for a free slot; None waits indefinitely
+        """
+        self.max_concurrency = max_concurrency
+        self.default_timeout = default_timeout
+        # One worker per slot: the pool itself never runs more calls than the cap
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="llm")
+        # asyncio primitives belong to one event loop
+        self._semaphores = weakref.WeakKeyDictionary()
+        self.in_flight = 0
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphores[loop] = semaphore
+        return semaphore
+
+    async def _run(self, fn: Callable, *args, **kwargs):
+        async with self._semaphore():
+            self.in_flight += 1
+            try:
+                # Copy the caller's context so context variables are visible in the worker thread
+                context = contextvars.copy_context()
+                call = functools.partial(context.run, fn, *args, **kwargs)
+                return await asyncio.get_running_loop().run_in_executor(self._executor, call)
+            finally:
+                self.in_flight -= 1
+
+    async def run(self, fn: Callable, *args, timeout: Optional[float] = None, **kwargs):
+        """Run fn(*args, **kwargs) in the LLM thread pool
+
+        Raises:
+            asyncio.TimeoutError: If the call does not finish within timeout
+                (or default_timeout) seconds. The worker thread cannot be
+                interrupted, but its slot is only reused once it returns.
+        """
+        timeout = self.default_timeout if timeout is None else timeout
+        return await asyncio.wait_for(self._run(fn, *args, **kwargs), timeout)
+
+    async def stream(self, fn: Callable, *args, timeout: Optional[float] = None, **kwargs) -> AsyncIterator:
+        """Iterate the generator returned by fn(*args, **kwargs) in the LLM thread pool
+
+        Items are yielded on the event loop as the worker produces them. The
+        timeout (or default_timeout) bounds the whole stream, including the
+        wait for a free slot. Exceptions raised by the generator are re-raised
+        here; closing this iterator early stops the worker at the next item.
+
+        Raises:
+            asyncio.TimeoutError: If the stream does not finish in time
+        """
+        timeout = self.default_timeout if timeout is None else timeout
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout if timeout is not None else None
+
+        def remaining() -> Optional[float]:
+            return None if deadline is None else max(deadline - loop.time(), 0)
+
+        queue: asyncio.Queue = asyncio.Queue()
+        stop = threading.Event()
+        end = object()
+
+        def put(item, error=None):
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, (item, error))
+            except RuntimeError:
+                # The event loop is gone; nobody is listening any more
+                stop.set()
+
+        def produce():
+            try:
+                for item in fn(*args, **kwargs):
+                    if stop.is_set():
+                        return
+                    put(item)
+            except BaseException as e:
+                put(end, e)
+                return
+            put(end)
+
+        semaphore = self._semaphore()
+        await asyncio.wait_for(semaphore.acquire(), remaining())
+        self.in_flight += 1
+        try:
+            context = contextvars.copy_context()
+            loop.run_in_executor(self._executor, functools.partial(context.run, produce))
+            while True:
+                item, error = await asyncio.wait_for(queue.get(), remaining())
+                if error is not None:
+                    raise error
+                if item is end:
+                    return
+                yield item
+        finally:
+            stop.set()
+            self.in_flight -= 1
+            semaphore.release()
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
+
+
+_limiter: Optional[LLMConcurrencyLimiter] = None
+
+
+def configure_llm_limiter(max_concurrency: int, default_timeout: Optional[float]) -> LLMConcurrencyLimiter:
+    """Replace the process-wide limiter used by LLMInterface.agenerate_text"""
+    global _limiter
+    if _limiter is not None:
+        _limiter.shutdown()
+    _limiter = LLMConcurrencyLimiter(max_concurrency, default_timeout)
+    return _limiter
+
+
+def get_llm_limiter() -> LLMConcurrencyLimiter:
+    """Return the process-wide limiter, creating one with default limits on first use"""
+    global _limiter
+    if _limiter is None:
+        _limiter = LLMConcurrencyLimiter()
+    return _limiter
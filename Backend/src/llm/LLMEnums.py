@@ -3,12 +3,19 @@ Enums for LLM providers
 """
 from enum import Enum
 
+
 class DocumentTypeEnum(str, Enum):
     DOCUMENT = "document"
     QUERY = "query"
 
+
 class GeminiEnums(str, Enum):
     USER = "user"
     MODEL = "model"
     DOCUMENT = "document"
-    QUERY = "query"
\ No newline at end of file
+    QUERY = "query"
+
+
+class LLMEnums(str, Enum):
+    GEMINI = "gemini"
+    LOCAL_STUB = "local_stub"
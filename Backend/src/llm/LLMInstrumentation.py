@@ -0,0 +1,136 @@
+"""
+Per-call instrumentation for LLM providers
+
+LLMInterface reports every model call and cache hit to the observers
+registered here as an LLMCallRecord. The default observer, LLMCallRecorder,
+aggregates the records into llm_metrics histograms and can also log each
+record as a line of JSON. Callers label the calls they make, e.g. with the
+report type, through llm_call_labels.
+"""
+import contextlib
+import contextvars
+import json
+import logging
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional
+
+from llm.LLMMetrics import LLMMetrics, llm_metrics
+
+# Most BPE tokenizers, Gemini's included, average roughly four characters per token for English text
+CHARS_PER_TOKEN = 4
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+TOKEN_BUCKETS = (100, 250, 500, 1000, 2000, 4000, 8000)
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the number of tokens in text"""
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+
+class LLMCallRecord(NamedTuple):
+    model_id: Optional[str]
+    report_type: Optional[str]
+    prompt_chars: int
+    prompt_tokens: int
+    output_tokens: int
+    latency_seconds: float
+    cache_hit: bool
+    outcome: str  # success, empty, timeout, error or cancelled
+    streamed: bool = False
+    first_chunk_seconds: Optional[float] = None
+
+
+# Labels of the calls made in the current context, e.g. {"report_type": "weekly"}
+_call_labels: contextvars.ContextVar[Dict[str, str]] = contextvars.ContextVar("llm_call_labels", default={})
+
+
+@contextlib.contextmanager
+def llm_call_labels(**labels) -> Iterator[None]:
+    """Attach labels to every LLM call made inside the block, including calls in awaited coroutines"""
+    token = _call_labels.set({**_call_labels.get(), **labels})
+    try:
+        yield
+    finally:
+        _call_labels.reset(token)
+
+
+def current_call_labels() -> Dict[str, str]:
+    return _call_labels.get()
+
+
+class LLMCallRecorder:
+    """Aggregates call records into histograms and counters, and optionally logs them as JSON"""
+
+    def __init__(self, metrics: Optional[LLMMetrics] = None,
+                       log_calls: bool = False,
+                       cost_per_1k_input_tokens: float = 0.0,
+                       cost_per_1k_output_tokens: float = 0.0):
+        """
+        Args:
+            metrics (Optional[LLMMetrics]): Where to aggregate; defaults to llm_metrics
+            log_calls (bool): Log every call as a line of JSON on the "llm.calls" logger
+            cost_per_1k_input_tokens (float): Price of 1000 prompt tokens, for llm_cost_total
+            cost_per_1k_output_tokens (float): Price of 1000 output tokens
+        """
+        self.metrics = metrics or llm_metrics
+        self.log_calls = log_calls
+        self.cost_per_1k_input_tokens = cost_per_1k_input_tokens
+        self.cost_per_1k_output_tokens = cost_per_1k_output_tokens
+        self.logger = logging.getLogger("llm.calls")
+
+    def __call__(self, record: LLMCallRecord):
+        labels = {"model": record.model_id or "unknown", "report_type": record.report_type or "none"}
+        cache = "hit" if record.cache_hit else "miss"
+
+        self.metrics.increment("llm_calls_total", outcome=record.outcome, cache=cache, **labels)
+        self.metrics.observe("llm_call_latency_seconds", record.latency_seconds, LATENCY_BUCKETS, cache=cache, **labels)
+        if record.first_chunk_seconds is not None:
+            self.metrics.observe("llm_first_chunk_seconds", record.first_chunk_seconds, LATENCY_BUCKETS, **labels)
+
+        # Cache hits cost nothing, so tokens and cost only count calls that reached the model
+        if not record.cache_hit:
+            self.metrics.observe("llm_prompt_tokens", record.prompt_tokens, TOKEN_BUCKETS, **labels)
+            self.metrics.increment("llm_prompt_tokens_total", record.prompt_tokens, **labels)
+            if record.output_tokens:
+                self.metrics.observe("llm_output_tokens", record.output_tokens, TOKEN_BUCKETS, **labels)
+                self.metrics.increment("llm_output_tokens_total", record.output_tokens, **labels)
+            cost = (record.prompt_tokens * self.cost_per_1k_input_tokens
+                    + record.output_tokens * self.cost_per_1k_output_tokens) / 1000
+            if cost:
+                self.metrics.increment("llm_cost_total", cost, **labels)
+
+        if self.log_calls:
+            self.logger.info(json.dumps({"event": "llm_call", **record._asdict()}))
+
+
+_call_observers: List[Callable[[LLMCallRecord], None]] = [LLMCallRecorder()]
+
+
+def configure_llm_instrumentation(log_calls: bool = False,
+                                  cost_per_1k_input_tokens: float = 0.0,
+                                  cost_per_1k_output_tokens: float = 0.0) -> LLMCallRecorder:
+    """Replace the default recorder with one built from these options"""
+    recorder = LLMCallRecorder(log_calls=log_calls,
+                               cost_per_1k_input_tokens=cost_per_1k_input_tokens,
+                               cost_per_1k_output_tokens=cost_per_1k_output_tokens)
+    _call_observers[:] = [observer for observer in _call_observers if not isinstance(observer, LLMCallRecorder)]
+    _call_observers.insert(0, recorder)
+    return recorder
+
+
+def add_call_observer(observer: Callable[[LLMCallRecord], None]):
+    _call_observers.append(observer)
+
+
+def remove_call_observer(observer: Callable[[LLMCallRecord], None]):
+    if observer in _call_observers:
+        _call_observers.remove(observer)
+
+
+def notify_call_observers(record: LLMCallRecord):
+    """Pass a record to every observer; instrumentation errors never fail the call"""
+    for observer in list(_call_observers):
+        try:
+            observer(record)
+        except Exception:
+            logging.getLogger(__name__).exception("LLM call observer failed")
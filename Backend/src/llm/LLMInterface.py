@@ -2,7 +2,12 @@
 Abstract interface for LLM providers
 """
 from abc import ABC, abstractmethod
-from typing import List, Union
+import asyncio
+import time
+from typing import AsyncIterator, Iterable, Iterator, List, Optional, Union
+
+from llm.LLMConcurrency import get_llm_limiter
+from llm.LLMInstrumentation import LLMCallRecord, current_call_labels, estimate_tokens, notify_call_observers
 
 class LLMInterface(ABC):
     
@@ -17,6 +22,107 @@ class LLMInterface(ABC):
         """Generate text using the LLM"""
         pass
     
+    def warm_up(self, max_output_tokens: Iterable[int] = (), temperature: Optional[float] = None):
+        """Prepare clients and models for these generation settings before the first call
+        
+        Does nothing by default; providers with expensive setup override it.
+        """
+        pass
+    
+    async def agenerate_text(self, prompt: str, chat_history: list = None,
+                             max_output_tokens: int = None, temperature: float = None,
+                             timeout: Optional[float] = None, **kwargs):
+        """Generate text without blocking the event loop
+        
+        Runs generate_text in the shared LLM thread pool, under the global
+        concurrency cap, and raises asyncio.TimeoutError after timeout seconds
+        (default: the limiter's default timeout). Providers with a native async
+        API can override this. Each call is reported through record_call.
+        """
+        start = time.perf_counter()
+        response, outcome = None, "error"
+        try:
+            response = await get_llm_limiter().run(
+                self.generate_text, prompt, chat_history=chat_history,
+                max_output_tokens=max_output_tokens, temperature=temperature,
+                timeout=timeout, **kwargs
+            )
+            outcome = "success" if response else "empty"
+            return response
+        except asyncio.TimeoutError:
+            outcome = "timeout"
+            raise
+        except asyncio.CancelledError:
+            outcome = "cancelled"
+            raise
+        finally:
+            self.record_call(prompt, response, time.perf_counter() - start, outcome=outcome)
+    
+    def stream_text(self, prompt: str, chat_history: list = None,
+                    max_output_tokens: int = None, temperature: float = None) -> Iterator[str]:
+        """Yield the generated text in chunks as the model produces them
+        
+        Providers without a streaming mode yield the whole response at once.
+        An empty response is raised as an error, since chunks may already
+        have been consumed.
+        """
+        response = self.generate_text(prompt, chat_history=chat_history,
+                                      max_output_tokens=max_output_tokens, temperature=temperature)
+        if not response:
+            raise RuntimeError("LLM returned no text")
+        yield response
+    
+    async def astream_text(self, prompt: str, chat_history: list = None,
+                           max_output_tokens: int = None, temperature: float = None,
+                           timeout: Optional[float] = None, **kwargs) -> AsyncIterator[str]:
+        """Async stream_text, iterated in the shared LLM thread pool under the concurrency cap"""
+        chunks = get_llm_limiter().stream(
+            self.stream_text, prompt, chat_history=chat_history,
+            max_output_tokens=max_output_tokens, temperature=temperature,
+            timeout=timeout, **kwargs
+        )
+        start = time.perf_counter()
+        first_chunk_seconds, output, outcome = None, [], "error"
+        try:
+            async for chunk in chunks:
+                if first_chunk_seconds is None:
+                    first_chunk_seconds = time.perf_counter() - start
+                output.append(chunk)
+                yield chunk
+            outcome = "success" if output else "empty"
+        except asyncio.TimeoutError:
+            outcome = "timeout"
+            raise
+        except (asyncio.CancelledError, GeneratorExit):
+            outcome = "cancelled"
+            raise
+        finally:
+            # Stop the worker promptly when the caller stops iterating
+            await chunks.aclose()
+            self.record_call(prompt, "".join(output), time.perf_counter() - start, outcome=outcome,
+                             streamed=True, first_chunk_seconds=first_chunk_seconds)
+    
+    def record_call(self, prompt: str, response: Optional[str], latency_seconds: float,
+                    outcome: str, cache_hit: bool = False, streamed: bool = False,
+                    first_chunk_seconds: Optional[float] = None):
+        """Report one model call or cache hit to the LLM call observers
+        
+        Token counts are estimated from the text. The report type comes from
+        the llm_call_labels around the call.
+        """
+        notify_call_observers(LLMCallRecord(
+            model_id=getattr(self, "generation_model_id", None),
+            report_type=current_call_labels().get("report_type"),
+            prompt_chars=len(prompt),
+            prompt_tokens=estimate_tokens(prompt),
+            output_tokens=estimate_tokens(response) if response else 0,
+            latency_seconds=latency_seconds,
+            cache_hit=cache_hit,
+            outcome=outcome,
+            streamed=streamed,
+            first_chunk_seconds=first_chunk_seconds
+        ))
+    
     @abstractmethod
     def construct_prompt(self, prompt: str, role: str):
         """Construct a prompt with the specified role"""
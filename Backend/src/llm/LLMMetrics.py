@@ -0,0 +1,84 @@
+"""
+In-process counters, gauges and histograms for the LLM layer
+"""
+import bisect
+import threading
+from collections import defaultdict
+from typing import Any, Dict, Sequence
+
+
+def _series(name: str, labels: Dict[str, Any]) -> str:
+    """Prometheus-style series name, e.g. llm_fallbacks_total{reason="circuit_open"}"""
+    if not labels:
+        return name
+    label_text = ",".join(f'{key}="{value}"' for key, value in sorted(labels.items()))
+    return f"{name}{{{label_text}}}"
+
+
+class LLMMetrics:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, float] = defaultdict(float)
+        self._gauges: Dict[str, float] = {}
+        self._histograms: Dict[str, "_Histogram"] = {}
+
+    def increment(self, name: str, amount: float = 1, **labels):
+        """Add amount to a counter"""
+        with self._lock:
+            self._counters[_series(name, labels)] += amount
+
+    def set_gauge(self, name: str, value: float, **labels):
+        """Set a gauge to its current value"""
+        with self._lock:
+            self._gauges[_series(name, labels)] = value
+
+    def observe(self, name: str, value: float, buckets: Sequence[float], **labels):
+        """Add value to a histogram; buckets are the upper bounds used when the series is first seen"""
+        with self._lock:
+            key = _series(name, labels)
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = _Histogram(buckets)
+            histogram.observe(value)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Current values of every series"""
+        with self._lock:
+            return {
+                "counters": dict(self._counters),
+                "gauges": dict(self._gauges),
+                "histograms": {key: histogram.to_dict() for key, histogram in self._histograms.items()}
+            }
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._histograms.clear()
+
+
+class _Histogram:
+    """Fixed-bucket histogram, reported with cumulative counts like Prometheus"""
+
+    def __init__(self, buckets: Sequence[float]):
+        self.bounds = sorted(buckets)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def to_dict(self) -> Dict[str, Any]:
+        buckets, total = {}, 0
+        for bound, count in zip(self.bounds + [float("inf")], self.counts):
+            total += count
+            buckets["+Inf" if bound == float("inf") else f"{bound:g}"] = total
+        return {"buckets": buckets, "count": self.count, "sum": self.sum}
+
+
+# Shared by the whole LLM layer and served by the metrics endpoint
+llm_metrics = LLMMetrics()
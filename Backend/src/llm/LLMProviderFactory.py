@@ -0,0 +1,32 @@
+from llm.LLMEnums import LLMEnums
+from llm.GeminiProvider import GeminiProvider
+from llm.LocalStubProvider import LocalStubProvider
+
+
+class LLMProviderFactory:
+    """Creates the LLM provider selected in the settings"""
+
+    def __init__(self, config):
+        self.config = config
+
+    def create(self, provider: str):
+        """Return a provider instance, or None when it cannot be configured
+
+        Raises:
+            ValueError: If the provider name is unknown
+        """
+        if provider == LLMEnums.GEMINI.value:
+            if not self.config.gemini_api_key:
+                return None
+            return GeminiProvider(api_key=self.config.gemini_api_key)
+
+        if provider == LLMEnums.LOCAL_STUB.value:
+            return LocalStubProvider(
+                latency_ms=self.config.llm_stub_latency_ms,
+                latency_jitter_ms=self.config.llm_stub_latency_jitter_ms,
+                latency_distribution=self.config.llm_stub_latency_distribution,
+                failure_rate=self.config.llm_stub_failure_rate,
+                seed=self.config.llm_stub_seed
+            )
+
+        raise ValueError(f"Unknown LLM provider: {provider}")
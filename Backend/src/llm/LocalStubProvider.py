@@ -0,0 +1,167 @@
+from llm.LLMInterface import LLMInterface
+import hashlib
+import logging
+import math
+import random
+import re
+import threading
+import time
+from typing import Iterator, Tuple
+
+SECTIONS = ["Executive Summary", "Performance Analysis", "Recommendations", "Focus Area", "Risks"]
+
+WORDS = (
+    "progress tasks completed priority deadline focus team review delivery quality "
+    "momentum planning backlog blockers estimate velocity milestone follow-up scope "
+    "stakeholders documentation testing release improvement consistent workload "
+    "schedule efficiency outcome critical dependencies collaboration weekly daily "
+    "throughput completion rate pending overdue in-progress sprint objectives"
+).split()
+
+# English text averages roughly 0.75 words per token
+WORDS_PER_TOKEN = 0.75
+
+LATENCY_DISTRIBUTIONS = ("fixed", "uniform", "normal", "lognormal")
+
+
+class LocalStubProvider(LLMInterface):
+    """Offline stand-in for a hosted model, for load tests and benchmarks
+
+    The text of a response depends only on the seed, model, prompt and
+    generation parameters. Latencies and failures are drawn from a separate
+    random sequence seeded with the same seed, so a run is reproducible.
+    Like the Gemini SDK, calls block the calling thread while they generate.
+    """
+
+    def __init__(self, latency_ms: float = 800.0,
+                       latency_jitter_ms: float = 200.0,
+                       latency_distribution: str = "lognormal",
+                       first_token_ms: float = 250.0,
+                       failure_rate: float = 0.0,
+                       output_ratio: float = 0.6,
+                       stream_chunk_words: int = 12,
+                       seed: int = 0,
+                       default_generation_max_output_tokens: int = 1000):
+        """
+        Args:
+            latency_ms (float): Mean time to produce a full response
+            latency_jitter_ms (float): Spread of the latency: the standard deviation for
+                "normal" and "lognormal", the half-width for "uniform"
+            latency_distribution (str): One of "fixed", "uniform", "normal" or "lognormal"
+            first_token_ms (float): Share of the latency spent before the first streamed chunk
+            failure_rate (float): Probability, from 0 to 1, that a call fails
+            output_ratio (float): Share of max_output_tokens a response uses
+            stream_chunk_words (int): Words per streamed chunk
+            seed (int): Seed for the generated text, latencies and failures
+        """
+        if latency_distribution not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(f"Unknown latency distribution: {latency_distribution}")
+
+        self.latency_ms = latency_ms
+        self.latency_jitter_ms = latency_jitter_ms
+        self.latency_distribution = latency_distribution
+        self.first_token_ms = first_token_ms
+        self.failure_rate = failure_rate
+        self.output_ratio = output_ratio
+        self.stream_chunk_words = stream_chunk_words
+        self.seed = seed
+        self.default_generation_max_output_tokens = default_generation_max_output_tokens
+
+        self.generation_model_id = None
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.failures = 0
+        self.logger = logging.getLogger(__name__)
+
+    def set_generation_model(self, model_id: str):
+        # Prefixed so stub responses never share cache keys with the real model
+        self.generation_model_id = f"local-stub/{model_id}"
+
+    def _sample_latency_ms(self) -> float:
+        if self.latency_distribution == "fixed":
+            return self.latency_ms
+        if self.latency_distribution == "uniform":
+            return self._random.uniform(self.latency_ms - self.latency_jitter_ms,
+                                        self.latency_ms + self.latency_jitter_ms)
+        if self.latency_distribution == "normal":
+            return self._random.gauss(self.latency_ms, self.latency_jitter_ms)
+        if self.latency_ms <= 0:
+            return 0.0
+        # Long-tailed, with the configured mean and standard deviation
+        sigma2 = math.log(1 + (self.latency_jitter_ms / self.latency_ms) ** 2)
+        return self._random.lognormvariate(math.log(self.latency_ms) - sigma2 / 2, math.sqrt(sigma2))
+
+    def _next_call(self) -> Tuple[float, bool]:
+        """Draw the latency (seconds) and the failure outcome of the next call"""
+        with self._lock:
+            self.calls += 1
+            latency = max(self._sample_latency_ms(), 0.0) / 1000
+            failed = self._random.random() < self.failure_rate
+            if failed:
+                self.failures += 1
+        return latency, failed
+
+    def _text(self, prompt: str, chat_history: list, max_output_tokens: int, temperature: float) -> str:
+        """Build the response for a request: report-like sections sized to max_output_tokens"""
+        digest = hashlib.sha256(
+            repr((self.seed, self.generation_model_id, prompt, chat_history, max_output_tokens, temperature)).encode("utf-8")
+        ).digest()
+        rng = random.Random(digest)
+
+        words_per_section = max(int(max_output_tokens * self.output_ratio * WORDS_PER_TOKEN) // len(SECTIONS), 8)
+        sections = []
+        for section in SECTIONS:
+            sentences, count = [], 0
+            while count < words_per_section:
+                length = rng.randint(8, 16)
+                sentences.append(" ".join(rng.choice(WORDS) for _ in range(length)).capitalize() + ".")
+                count += length
+            sections.append(f"{section.upper()}\n" + " ".join(sentences))
+        return "\n\n".join(sections)
+
+    def generate_text(self, prompt: str, chat_history: list = None,
+                      max_output_tokens: int = None, temperature: float = None):
+        if not self.generation_model_id:
+            self.logger.error("Generation model for the local stub was not set")
+            return None
+
+        max_output_tokens = max_output_tokens or self.default_generation_max_output_tokens
+        latency, failed = self._next_call()
+        time.sleep(latency)
+        if failed:
+            self.logger.error("Local stub provider: simulated failure")
+            return None
+        return self._text(prompt, chat_history, max_output_tokens, temperature)
+
+    def stream_text(self, prompt: str, chat_history: list = None,
+                    max_output_tokens: int = None, temperature: float = None) -> Iterator[str]:
+        """Yield the same text as generate_text in chunks spread over the sampled latency"""
+        if not self.generation_model_id:
+            raise RuntimeError("Generation model for the local stub was not set")
+
+        max_output_tokens = max_output_tokens or self.default_generation_max_output_tokens
+        latency, failed = self._next_call()
+        # Words keep their trailing whitespace so the chunks concatenate to the full text
+        words = re.findall(r"\S+\s*", self._text(prompt, chat_history, max_output_tokens, temperature))
+        chunks = ["".join(words[i:i + self.stream_chunk_words])
+                  for i in range(0, len(words), self.stream_chunk_words)]
+
+        first_token = min(self.first_token_ms / 1000, latency)
+        gap = (latency - first_token) / max(len(chunks) - 1, 1)
+        # Simulated failures happen part-way through, after some chunks were sent
+        fail_at = len(chunks) // 2 if failed else None
+
+        time.sleep(first_token)
+        for i, chunk in enumerate(chunks):
+            if i == fail_at:
+                raise RuntimeError("Local stub provider: simulated failure")
+            if i:
+                time.sleep(gap)
+            yield chunk
+
+    def construct_prompt(self, prompt: str, role: str):
+        return {
+            "role": role,
+            "text": prompt,
+        }
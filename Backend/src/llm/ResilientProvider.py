@@ -0,0 +1,283 @@
+from llm.LLMInterface import LLMInterface
+from llm.LLMMetrics import LLMMetrics, llm_metrics
+from google.api_core import exceptions as api_exceptions
+import asyncio
+import logging
+import random
+import threading
+import time
+from typing import AsyncIterator, Iterable, Optional
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised without calling the provider while the circuit breaker is open"""
+    pass
+
+
+class LLMUnavailableError(RuntimeError):
+    """Raised when every attempt failed or the deadline ran out"""
+    pass
+
+
+def is_retryable(error: Exception) -> bool:
+    """Whether another attempt could succeed
+
+    Timeouts, connection problems, rate limiting and server errors are
+    transient. Other client errors (bad request, bad key) and programming
+    errors are not.
+    """
+    if isinstance(error, api_exceptions.TooManyRequests):
+        return True
+    if isinstance(error, (api_exceptions.ClientError, ValueError, TypeError)):
+        return False
+    return True
+
+
+class CircuitBreaker:
+    """Opens after consecutive failures, then lets one trial call through after reset_seconds"""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    # Gauge values for llm_circuit_state
+    STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+    def __init__(self, failure_threshold: int = 5, reset_seconds: float = 30.0,
+                 metrics: Optional[LLMMetrics] = None, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.metrics = metrics or llm_metrics
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._trial_started_at = 0.0
+        self.metrics.set_gauge("llm_circuit_state", self.STATE_VALUES[self.CLOSED])
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == self.OPEN and self.clock() - self._opened_at >= self.reset_seconds:
+                return self.HALF_OPEN
+            return self._state
+
+    def _set_state(self, state: str):
+        self._state = state
+        self.metrics.set_gauge("llm_circuit_state", self.STATE_VALUES[state])
+
+    def allow(self) -> bool:
+        """Whether a call may go to the provider now"""
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.OPEN:
+                if self.clock() - self._opened_at < self.reset_seconds:
+                    return False
+                self._set_state(self.HALF_OPEN)
+            # Half-open: a single trial call decides whether to close again. A trial
+            # that never reported back (e.g. it was cancelled) is replaced after reset_seconds.
+            if self._trial_in_flight and self.clock() - self._trial_started_at < self.reset_seconds:
+                return False
+            self._trial_in_flight = True
+            self._trial_started_at = self.clock()
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._trial_in_flight = False
+            if self._state != self.CLOSED:
+                self._set_state(self.CLOSED)
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    self.metrics.increment("llm_circuit_opened_total")
+                self._set_state(self.OPEN)
+                self._opened_at = self.clock()
+
+
+class ResilientProvider(LLMInterface):
+    """Wraps an LLMInterface with jittered retries, a circuit breaker and a deadline per call
+
+    Raised errors are classified by is_retryable; an empty response is
+    treated as a retryable failure. Requests the provider rejects are not
+    retried and do not count toward the breaker, since the provider did
+    answer. While the breaker is open, calls raise CircuitOpenError
+    immediately so callers can fall back without waiting for the provider.
+    """
+
+    def __init__(self, provider: LLMInterface,
+                       max_attempts: int = 3,
+                       base_delay: float = 0.5,
+                       max_delay: float = 4.0,
+                       breaker: Optional[CircuitBreaker] = None,
+                       metrics: Optional[LLMMetrics] = None):
+        """
+        Args:
+            provider (LLMInterface): The provider that actually generates text
+            max_attempts (int): Attempts per call, including the first
+            base_delay (float): Backoff before the first retry; doubles per retry, with full jitter
+            max_delay (float): Upper bound for a single backoff
+            breaker (Optional[CircuitBreaker]): Breaker shared by every call through this wrapper
+        """
+        self.provider = provider
+        self.max_attempts = max(max_attempts, 1)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.metrics = metrics or llm_metrics
+        self.breaker = breaker or CircuitBreaker(metrics=self.metrics)
+        self.logger = logging.getLogger(__name__)
+
+    def __getattr__(self, name):
+        # Provider-specific attributes (generation_model_id, embed_text, ...) pass through
+        if name == "provider":
+            raise AttributeError(name)
+        return getattr(self.provider, name)
+
+    def set_generation_model(self, model_id: str):
+        self.provider.set_generation_model(model_id)
+
+    def warm_up(self, max_output_tokens: Iterable[int] = (), temperature: Optional[float] = None):
+        self.provider.warm_up(max_output_tokens, temperature)
+
+    def construct_prompt(self, prompt: str, role: str):
+        return self.provider.construct_prompt(prompt=prompt, role=role)
+
+    def _backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+    def _check_breaker(self):
+        if not self.breaker.allow():
+            self.metrics.increment("llm_circuit_rejections_total")
+            raise CircuitOpenError("LLM provider is unavailable (circuit open)")
+
+    def _record(self, outcome: str, error: Optional[Exception] = None) -> bool:
+        """Record an attempt and return whether it is worth retrying"""
+        self.metrics.increment("llm_attempts_total", outcome=outcome)
+        if outcome == "success":
+            self.breaker.record_success()
+            return False
+        if error is not None:
+            self.logger.warning(f"LLM attempt failed ({outcome}): {error}")
+        retryable = error is None or is_retryable(error)
+        if retryable:
+            self.breaker.record_failure()
+        else:
+            # The provider is up and rejected this request; that says nothing about its health
+            self.breaker.record_success()
+        return retryable
+
+    def generate_text(self, prompt: str, chat_history: list = None,
+                      max_output_tokens: int = None, temperature: float = None):
+        """Blocking generate_text with retries; returns None once every attempt has failed"""
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                self._check_breaker()
+            except CircuitOpenError:
+                return None
+            try:
+                response = self.provider.generate_text(prompt, chat_history=chat_history,
+                                                       max_output_tokens=max_output_tokens, temperature=temperature)
+            except Exception as e:
+                retry = self._record("error", e)
+            else:
+                if response:
+                    self._record("success")
+                    return response
+                retry = self._record("empty")
+            if not retry or attempt == self.max_attempts:
+                return None
+            self.metrics.increment("llm_retries_total")
+            time.sleep(self._backoff(attempt))
+        return None
+
+    async def agenerate_text(self, prompt: str, chat_history: list = None,
+                             max_output_tokens: int = None, temperature: float = None,
+                             timeout: Optional[float] = None, **kwargs):
+        """Generate text, retrying within timeout seconds in total
+
+        Raises:
+            CircuitOpenError: If the breaker is open
+            LLMUnavailableError: If every attempt failed or the deadline ran out
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout if timeout is not None else None
+        last_error: Optional[Exception] = None
+
+        for attempt in range(1, self.max_attempts + 1):
+            self._check_breaker()
+            remaining = None if deadline is None else deadline - loop.time()
+            try:
+                response = await self.provider.agenerate_text(prompt, chat_history=chat_history,
+                                                              max_output_tokens=max_output_tokens,
+                                                              temperature=temperature, timeout=remaining, **kwargs)
+            except asyncio.TimeoutError as e:
+                last_error = e
+                retry = self._record("timeout", e)
+            except Exception as e:
+                last_error = e
+                retry = self._record("error", e)
+            else:
+                if response:
+                    self._record("success")
+                    return response
+                retry = self._record("empty")
+
+            if not retry or attempt == self.max_attempts:
+                break
+            delay = self._backoff(attempt)
+            if deadline is not None and loop.time() + delay >= deadline:
+                self.metrics.increment("llm_deadline_exceeded_total")
+                break
+            self.metrics.increment("llm_retries_total")
+            await asyncio.sleep(delay)
+
+        raise LLMUnavailableError(f"LLM call failed after {attempt} attempt(s): {last_error or 'empty response'}")
+
+    async def astream_text(self, prompt: str, chat_history: list = None,
+                           max_output_tokens: int = None, temperature: float = None,
+                           timeout: Optional[float] = None, **kwargs) -> AsyncIterator[str]:
+        """Stream text; attempts are only retried while nothing has been yielded yet"""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout if timeout is not None else None
+        last_error: Optional[Exception] = None
+
+        for attempt in range(1, self.max_attempts + 1):
+            self._check_breaker()
+            remaining = None if deadline is None else deadline - loop.time()
+            produced = False
+            try:
+                async for chunk in self.provider.astream_text(prompt, chat_history=chat_history,
+                                                              max_output_tokens=max_output_tokens,
+                                                              temperature=temperature, timeout=remaining, **kwargs):
+                    produced = True
+                    yield chunk
+            except asyncio.TimeoutError as e:
+                last_error = e
+                retry = self._record("timeout", e)
+            except Exception as e:
+                last_error = e
+                retry = self._record("error", e)
+            else:
+                if produced:
+                    self._record("success")
+                    return
+                retry = self._record("empty")
+
+            if produced or not retry or attempt == self.max_attempts:
+                break
+            delay = self._backoff(attempt)
+            if deadline is not None and loop.time() + delay >= deadline:
+                self.metrics.increment("llm_deadline_exceeded_total")
+                break
+            self.metrics.increment("llm_retries_total")
+            await asyncio.sleep(delay)
+
+        raise LLMUnavailableError(f"LLM stream failed after {attempt} attempt(s): {last_error or 'empty response'}")
@@ -0,0 +1,184 @@
+"""
+Two-tier cache for LLM responses: an in-memory LRU in front of an optional SQLite file
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+
+class ResponseCache:
+
+    def __init__(self, max_memory_entries: int = 256,
+                       disk_path: Optional[str] = None,
+                       max_disk_entries: int = 10000,
+                       ttl_seconds: Optional[float] = 86400):
+        """
+        Args:
+            max_memory_entries (int): Size of the in-memory LRU tier
+            disk_path (Optional[str]): SQLite file for the persistent tier; None keeps the cache in memory only
+            max_disk_entries (int): Rows kept on disk before the least recently used are evicted
+            ttl_seconds (Optional[float]): Lifetime of an entry; None never expires
+        """
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+        self.ttl_seconds = ttl_seconds
+        self.disk_path = disk_path
+
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk = None
+        self.logger = logging.getLogger(__name__)
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        if disk_path:
+            directory = os.path.dirname(disk_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._disk = sqlite3.connect(disk_path, check_same_thread=False)
+            self._disk.execute(
+                "CREATE TABLE IF NOT EXISTS llm_responses ("
+                "key TEXT PRIMARY KEY, response TEXT NOT NULL, expires_at REAL, last_access REAL NOT NULL)"
+            )
+            self._disk.execute("CREATE INDEX IF NOT EXISTS ix_llm_responses_last_access ON llm_responses (last_access)")
+            self._disk.commit()
+
+    @staticmethod
+    def make_key(model_id: Optional[str], prompt: str, chat_history: Optional[List] = None,
+                 temperature: Optional[float] = None, max_output_tokens: Optional[int] = None) -> str:
+        """Hash everything that influences a generation into a cache key"""
+        payload = json.dumps(
+            [model_id, prompt, chat_history or [], temperature, max_output_tokens],
+            sort_keys=True, default=str, separators=(",", ":")
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _expires_at(self) -> Optional[float]:
+        return time.time() + self.ttl_seconds if self.ttl_seconds is not None else None
+
+    def _remember(self, key: str, response: str, expires_at: Optional[float]):
+        self._memory[key] = (response, expires_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+            self.evictions += 1
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached response for key, or None on a miss"""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                response, expires_at = entry
+                if expires_at is None or expires_at > now:
+                    self._memory.move_to_end(key)
+                    self.memory_hits += 1
+                    return response
+                del self._memory[key]
+
+            if self._disk is not None:
+                try:
+                    row = self._disk.execute(
+                        "SELECT response, expires_at FROM llm_responses WHERE key = ?", (key,)
+                    ).fetchone()
+                    if row is not None:
+                        response, expires_at = row
+                        if expires_at is None or expires_at > now:
+                            self._disk.execute("UPDATE llm_responses SET last_access = ? WHERE key = ?", (now, key))
+                            self._disk.commit()
+                            self._remember(key, response, expires_at)
+                            self.disk_hits += 1
+                            return response
+                        self._disk.execute("DELETE FROM llm_responses WHERE key = ?", (key,))
+                        self._disk.commit()
+                except sqlite3.Error as e:
+                    self.logger.error(f"Error reading LLM response cache: {e}")
+
+            self.misses += 1
+            return None
+
+    async def aget(self, key: str) -> Optional[str]:
+        """get() for async callers; with a disk tier the lookup runs on a worker thread"""
+        if self._disk is None:
+            return self.get(key)
+        return await asyncio.to_thread(self.get, key)
+
+    async def aset(self, key: str, response: str):
+        """set() for async callers; with a disk tier the write runs on a worker thread"""
+        if self._disk is None:
+            return self.set(key, response)
+        await asyncio.to_thread(self.set, key, response)
+
+    def set(self, key: str, response: str):
+        """Store a response in both tiers"""
+        expires_at = self._expires_at()
+        with self._lock:
+            self._remember(key, response, expires_at)
+            if self._disk is None:
+                return
+            try:
+                self._disk.execute(
+                    "INSERT OR REPLACE INTO llm_responses (key, response, expires_at, last_access) VALUES (?, ?, ?, ?)",
+                    (key, response, expires_at, time.time())
+                )
+                self._evict_disk()
+                self._disk.commit()
+            except sqlite3.Error as e:
+                self.logger.error(f"Error writing LLM response cache: {e}")
+
+    def _evict_disk(self):
+        """Drop expired rows, then the least recently used rows above max_disk_entries"""
+        self._disk.execute("DELETE FROM llm_responses WHERE expires_at IS NOT NULL AND expires_at <= ?", (time.time(),))
+        (count,) = self._disk.execute("SELECT COUNT(*) FROM llm_responses").fetchone()
+        excess = count - self.max_disk_entries
+        if excess > 0:
+            self._disk.execute(
+                "DELETE FROM llm_responses WHERE key IN "
+                "(SELECT key FROM llm_responses ORDER BY last_access ASC LIMIT ?)", (excess,)
+            )
+            self.evictions += excess
+
+    def clear(self):
+        """Remove every entry from both tiers"""
+        with self._lock:
+            self._memory.clear()
+            if self._disk is not None:
+                self._disk.execute("DELETE FROM llm_responses")
+                self._disk.commit()
+
+    async def astats(self) -> Dict[str, int]:
+        """stats() for async callers; the disk tier is counted on a worker thread"""
+        return await asyncio.to_thread(self.stats)
+
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss counters and tier sizes"""
+        with self._lock:
+            disk_entries = 0
+            if self._disk is not None:
+                (disk_entries,) = self._disk.execute("SELECT COUNT(*) FROM llm_responses").fetchone()
+            hits = self.memory_hits + self.disk_hits
+            return {
+                "hits": hits,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": round(hits / (hits + self.misses), 4) if hits + self.misses else 0.0,
+                "evictions": self.evictions,
+                "memory_entries": len(self._memory),
+                "disk_entries": disk_entries,
+            }
+
+    def close(self):
+        if self._disk is not None:
+            self._disk.close()
+            self._disk = None
@@ -0,0 +1,33 @@
+"""
+Tests for the shared Gemini client configuration and model pool
+"""
+from llm.GeminiClientPool import GeminiClientPool
+from llm.GeminiProvider import GeminiProvider
+
+
+def test_models_are_reused_per_generation_config():
+    pool = GeminiClientPool(max_models=2)
+    pool.configure("key")
+
+    model = pool.model("gemini-pro", 1500, 0.7)
+    assert pool.model("gemini-pro", 1500, 0.7) is model
+    assert pool.model("gemini-pro", 2000, 0.7) is not model
+
+    pool.model("gemini-pro", 2500, 0.7)
+    assert pool.stats() == {"configure_calls": 1, "models_created": 3, "pooled_models": 2}
+    # The least recently used model was dropped
+    assert pool.model("gemini-pro", 1500, 0.7) is not model
+    assert pool.stats()["models_created"] == 4
+
+
+def test_configure_runs_once_per_configuration():
+    pool = GeminiClientPool()
+    for _ in range(3):
+        GeminiProvider(api_key="key", client_pool=pool)
+    assert pool.stats()["configure_calls"] == 1
+
+    model = pool.model("gemini-pro", 1000, 0.1)
+    GeminiProvider(api_key="other-key", client_pool=pool)
+    assert pool.stats()["configure_calls"] == 2
+    # Models built against the previous client are discarded
+    assert pool.model("gemini-pro", 1000, 0.1) is not model
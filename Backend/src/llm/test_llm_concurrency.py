@@ -0,0 +1,124 @@
+"""
+Tests for running LLM calls off the event loop
+"""
+import asyncio
+import threading
+import time
+
+import pytest
+
+from llm.LLMInterface import LLMInterface
+from llm.CachedProvider import CachedProvider
+from llm.ResponseCache import ResponseCache
+import llm.LLMConcurrency as concurrency_module
+
+
+class SlowProvider(LLMInterface):
+    """Blocks like the synchronous Gemini SDK does"""
+
+    def __init__(self, delay: float = 0.1):
+        self.generation_model_id = "slow"
+        self.delay = delay
+        self.calls = 0
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def set_generation_model(self, model_id: str):
+        self.generation_model_id = model_id
+
+    def generate_text(self, prompt: str, chat_history: list = None,
+                      max_output_tokens: int = None, temperature: float = None):
+        with self._lock:
+            self.calls += 1
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(self.delay)
+        with self._lock:
+            self.active -= 1
+        return f"summary of {prompt}"
+
+    def construct_prompt(self, prompt: str, role: str):
+        return {"role": role, "text": prompt}
+
+
+@pytest.fixture
+def limiter():
+    limiter = concurrency_module.configure_llm_limiter(max_concurrency=2, default_timeout=5.0)
+    yield limiter
+    limiter.shutdown()
+    concurrency_module._limiter = None
+
+
+def test_concurrency_cap_is_enforced(limiter):
+    provider = SlowProvider(delay=0.05)
+
+    async def runner():
+        return await asyncio.gather(*(provider.agenerate_text(f"report {i}") for i in range(6)))
+
+    responses = asyncio.run(runner())
+    assert responses == [f"summary of report {i}" for i in range(6)]
+    assert provider.peak == 2
+    assert limiter.in_flight == 0
+
+
+def test_event_loop_stays_responsive(limiter):
+    provider = SlowProvider(delay=0.3)
+
+    async def runner():
+        generation = asyncio.gather(*(provider.agenerate_text(f"report {i}") for i in range(4)))
+        # A cheap request issued while reports generate is served immediately
+        start = time.perf_counter()
+        await asyncio.sleep(0.01)
+        latency = time.perf_counter() - start
+        await generation
+        return latency
+
+    assert asyncio.run(runner()) < 0.1
+
+
+def test_timeout_raises(limiter):
+    provider = SlowProvider(delay=0.3)
+
+    async def runner():
+        return await provider.agenerate_text("report", timeout=0.05)
+
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(runner())
+
+
+def test_cached_provider_hits_skip_the_pool(limiter):
+    provider = CachedProvider(SlowProvider(delay=0.01), ResponseCache())
+
+    async def runner():
+        first = await provider.agenerate_text("report", temperature=0.7)
+        second = await provider.agenerate_text("report", temperature=0.7)
+        return first, second
+
+    first, second = asyncio.run(runner())
+    assert first == second
+    assert provider.provider.calls == 1
+
+
+def test_stream_yields_chunks_as_they_are_produced(limiter):
+    provider = SlowProvider(delay=0)
+
+    def stream_text(prompt, chat_history=None, max_output_tokens=None, temperature=None):
+        for word in prompt.split():
+            time.sleep(0.02)
+            yield word
+
+    provider.stream_text = stream_text
+
+    async def runner():
+        received = []
+        start = time.perf_counter()
+        async for chunk in provider.astream_text("one two three"):
+            received.append((chunk, time.perf_counter() - start))
+        return received
+
+    received = asyncio.run(runner())
+    assert [chunk for chunk, _ in received] == ["one", "two", "three"]
+    # The first chunk arrives well before the stream completes
+    assert received[0][1] < received[-1][1]
+    assert limiter.in_flight == 0
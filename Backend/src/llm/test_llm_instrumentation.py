@@ -0,0 +1,103 @@
+"""
+Tests for the per-call LLM instrumentation hook
+"""
+import asyncio
+import json
+import logging
+
+import pytest
+
+from llm.CachedProvider import CachedProvider
+from llm.LLMInstrumentation import (LLMCallRecorder, add_call_observer, llm_call_labels,
+                                    remove_call_observer)
+from llm.LLMMetrics import LLMMetrics
+from llm.LocalStubProvider import LocalStubProvider
+from llm.ResponseCache import ResponseCache
+import llm.LLMConcurrency as concurrency_module
+
+
+@pytest.fixture(autouse=True)
+def limiter():
+    limiter = concurrency_module.configure_llm_limiter(max_concurrency=4, default_timeout=5.0)
+    yield limiter
+    limiter.shutdown()
+    concurrency_module._limiter = None
+
+
+@pytest.fixture
+def records():
+    records = []
+    add_call_observer(records.append)
+    yield records
+    remove_call_observer(records.append)
+
+
+def make_provider(**kwargs):
+    provider = LocalStubProvider(**{"latency_ms": 20, "latency_distribution": "fixed", "first_token_ms": 5, **kwargs})
+    provider.set_generation_model("gemini-pro")
+    return CachedProvider(provider, ResponseCache(disk_path=None))
+
+
+def test_calls_and_cache_hits_are_recorded_with_labels(records):
+    provider = make_provider()
+
+    async def generate():
+        with llm_call_labels(report_type="weekly"):
+            first = await provider.agenerate_text("weekly report prompt", max_output_tokens=500)
+            await provider.agenerate_text("weekly report prompt", max_output_tokens=500)
+        return first
+
+    response = asyncio.run(generate())
+
+    miss, hit = records
+    assert miss.model_id == "local-stub/gemini-pro"
+    assert miss.report_type == "weekly"
+    assert (miss.prompt_chars, miss.prompt_tokens) == (20, 5)
+    assert miss.output_tokens == -(-len(response) // 4)
+    assert miss.latency_seconds >= 0.02
+    assert (miss.cache_hit, miss.outcome) == (False, "success")
+    assert hit.cache_hit and hit.latency_seconds < miss.latency_seconds
+
+
+def test_streams_and_failures_are_recorded(records):
+    provider = make_provider(failure_rate=1.0)
+
+    async def stream():
+        async for _ in provider.astream_text("daily report prompt"):
+            pass
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(stream())
+    assert asyncio.run(provider.agenerate_text("other prompt")) is None
+
+    streamed, generated = records
+    assert streamed.streamed and streamed.outcome == "error"
+    assert streamed.first_chunk_seconds is not None and streamed.output_tokens > 0
+    assert generated.outcome == "empty" and generated.report_type is None
+
+
+def test_recorder_aggregates_histograms_and_logs_json(records, caplog):
+    metrics = LLMMetrics()
+    recorder = LLMCallRecorder(metrics, log_calls=True, cost_per_1k_input_tokens=1.0, cost_per_1k_output_tokens=2.0)
+    add_call_observer(recorder)
+    provider = make_provider()
+    try:
+        with caplog.at_level(logging.INFO, logger="llm.calls"):
+            with llm_call_labels(report_type="daily"):
+                asyncio.run(provider.agenerate_text("x" * 400, max_output_tokens=500))
+                asyncio.run(provider.agenerate_text("x" * 400, max_output_tokens=500))
+    finally:
+        remove_call_observer(recorder)
+
+    snapshot = metrics.snapshot()
+    labels = 'model="local-stub/gemini-pro",report_type="daily"'
+    latency = snapshot["histograms"][f'llm_call_latency_seconds{{cache="miss",{labels}}}']
+    assert latency["count"] == 1 and latency["buckets"]["+Inf"] == 1 and latency["sum"] >= 0.02
+    assert snapshot["histograms"][f"llm_prompt_tokens{{{labels}}}"]["sum"] == 100
+    assert snapshot["counters"]['llm_calls_total{cache="hit",model="local-stub/gemini-pro",outcome="success",report_type="daily"}'] == 1
+    output_tokens = records[0].output_tokens
+    assert snapshot["counters"][f"llm_cost_total{{{labels}}}"] == pytest.approx((100 + 2 * output_tokens) / 1000)
+
+    logged = [json.loads(message) for message in caplog.messages]
+    assert [entry["cache_hit"] for entry in logged] == [False, True]
+    assert logged[0]["report_type"] == "daily"
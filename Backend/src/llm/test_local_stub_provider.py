@@ -0,0 +1,75 @@
+"""
+Tests for the offline LocalStubProvider
+"""
+import statistics
+import time
+
+import pytest
+
+from llm.LocalStubProvider import LocalStubProvider
+from llm.LLMProviderFactory import LLMProviderFactory
+
+
+def make_provider(**kwargs):
+    provider = LocalStubProvider(**{"latency_ms": 0, "latency_jitter_ms": 0, **kwargs})
+    provider.set_generation_model("gemini-pro")
+    return provider
+
+
+def test_output_is_deterministic_and_sized_to_the_request():
+    provider = make_provider()
+    short = provider.generate_text("weekly report", max_output_tokens=500)
+
+    assert short == make_provider().generate_text("weekly report", max_output_tokens=500)
+    assert short != provider.generate_text("monthly report", max_output_tokens=500)
+    assert short.startswith("EXECUTIVE SUMMARY\n")
+    long = provider.generate_text("weekly report", max_output_tokens=2500)
+    assert 4 < len(long.split()) / len(short.split()) < 6
+
+
+def test_stream_concatenates_to_the_generated_text():
+    provider = make_provider(stream_chunk_words=5)
+    chunks = list(provider.stream_text("daily report", max_output_tokens=800, temperature=0.7))
+
+    assert len(chunks) > 10
+    assert "".join(chunks) == provider.generate_text("daily report", max_output_tokens=800, temperature=0.7)
+
+
+def test_latency_distribution_matches_settings():
+    provider = make_provider(latency_ms=800, latency_jitter_ms=200, seed=3)
+    samples = [provider._sample_latency_ms() for _ in range(4000)]
+    assert statistics.mean(samples) == pytest.approx(800, rel=0.05)
+    assert statistics.stdev(samples) == pytest.approx(200, rel=0.1)
+
+    provider = make_provider(latency_ms=30, latency_distribution="fixed")
+    start = time.perf_counter()
+    provider.generate_text("report")
+    assert time.perf_counter() - start >= 0.03
+
+
+def test_failures_follow_the_failure_rate():
+    provider = make_provider(failure_rate=0.25, seed=7)
+    results = [provider.generate_text(f"report {i}") for i in range(400)]
+
+    assert results.count(None) == provider.failures
+    assert 60 < provider.failures < 140
+
+    failing = make_provider(failure_rate=1.0)
+    with pytest.raises(RuntimeError):
+        list(failing.stream_text("report"))
+
+
+def test_factory_selects_the_stub():
+    class Config:
+        gemini_api_key = None
+        llm_stub_latency_ms = 5
+        llm_stub_latency_jitter_ms = 1
+        llm_stub_latency_distribution = "normal"
+        llm_stub_failure_rate = 0.0
+        llm_stub_seed = 1
+
+    factory = LLMProviderFactory(Config())
+    assert isinstance(factory.create("local_stub"), LocalStubProvider)
+    assert factory.create("gemini") is None
+    with pytest.raises(ValueError):
+        factory.create("unknown")
@@ -0,0 +1,159 @@
+"""
+Tests for retries, the circuit breaker and deadlines around an LLM provider
+"""
+import asyncio
+import time
+
+import pytest
+from google.api_core import exceptions as api_exceptions
+
+from llm.GeminiClientPool import GeminiClientPool
+from llm.GeminiProvider import GeminiProvider
+from llm.LLMInterface import LLMInterface
+from llm.LLMMetrics import LLMMetrics
+from llm.ResilientProvider import (CircuitBreaker, CircuitOpenError, LLMUnavailableError,
+                                   ResilientProvider)
+import llm.LLMConcurrency as concurrency_module
+
+
+class ScriptedProvider(LLMInterface):
+    """Plays back a list of outcomes: a string, None, an exception or a delay in seconds"""
+
+    def __init__(self, outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = 0
+
+    def set_generation_model(self, model_id: str):
+        pass
+
+    def generate_text(self, prompt: str, chat_history: list = None,
+                      max_output_tokens: int = None, temperature: float = None):
+        self.calls += 1
+        outcome = self.outcomes.pop(0) if self.outcomes else "ok"
+        if isinstance(outcome, Exception):
+            raise outcome
+        if isinstance(outcome, float):
+            time.sleep(outcome)
+            return "slow"
+        return outcome
+
+    def construct_prompt(self, prompt: str, role: str):
+        return {"role": role, "text": prompt}
+
+
+class RaisingModel:
+    """A Gemini model whose generate_content raises the given errors in turn"""
+
+    def __init__(self, errors):
+        self.errors = list(errors)
+        self.calls = 0
+
+    def generate_content(self, contents, stream=False):
+        self.calls += 1
+        raise self.errors.pop(0)
+
+
+class RaisingClientPool(GeminiClientPool):
+    def __init__(self, errors):
+        super().__init__()
+        self.raising_model = RaisingModel(errors)
+
+    def model(self, model_id, max_output_tokens, temperature):
+        return self.raising_model
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture(autouse=True)
+def limiter():
+    limiter = concurrency_module.configure_llm_limiter(max_concurrency=4, default_timeout=5.0)
+    yield limiter
+    limiter.shutdown()
+    concurrency_module._limiter = None
+
+
+def make_resilient(outcomes, **kwargs):
+    metrics = LLMMetrics()
+    breaker = kwargs.pop("breaker", None) or CircuitBreaker(failure_threshold=3, reset_seconds=30, metrics=metrics)
+    provider = ScriptedProvider(outcomes)
+    return ResilientProvider(provider, base_delay=0, breaker=breaker, metrics=metrics, **kwargs), provider, metrics
+
+
+def test_retryable_failures_are_retried():
+    resilient, provider, metrics = make_resilient([None, api_exceptions.ServiceUnavailable("down"), "summary"])
+
+    assert asyncio.run(resilient.agenerate_text("report")) == "summary"
+    assert provider.calls == 3
+    counters = metrics.snapshot()["counters"]
+    assert counters["llm_retries_total"] == 2
+    assert counters['llm_attempts_total{outcome="success"}'] == 1
+
+
+def test_non_retryable_errors_fail_fast():
+    resilient, provider, _ = make_resilient([api_exceptions.InvalidArgument("bad prompt")])
+
+    with pytest.raises(LLMUnavailableError):
+        asyncio.run(resilient.agenerate_text("report"))
+    assert provider.calls == 1
+
+
+def test_gemini_errors_are_classified_by_the_wrapper():
+    metrics = LLMMetrics()
+    breaker = CircuitBreaker(failure_threshold=2, reset_seconds=30, metrics=metrics)
+    pool = RaisingClientPool([api_exceptions.InvalidArgument("bad prompt")] * 3
+                             + [api_exceptions.ServiceUnavailable("down")] * 2)
+    provider = GeminiProvider(api_key="key", client_pool=pool)
+    provider.set_generation_model("gemini-pro")
+    resilient = ResilientProvider(provider, max_attempts=3, base_delay=0, breaker=breaker, metrics=metrics)
+
+    # A rejected request fails after one attempt each time and leaves the breaker closed
+    for _ in range(3):
+        with pytest.raises(LLMUnavailableError, match="bad prompt"):
+            asyncio.run(resilient.agenerate_text("report"))
+    assert pool.raising_model.calls == 3
+    assert breaker.state == CircuitBreaker.CLOSED
+
+    # An unavailable service is retried until the breaker opens and cuts the call short
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(resilient.agenerate_text("report"))
+    assert pool.raising_model.calls == 5
+    assert breaker.state == CircuitBreaker.OPEN
+    assert metrics.snapshot()["counters"]["llm_retries_total"] == 2
+
+
+def test_breaker_opens_and_recovers_after_a_trial_call():
+    clock = FakeClock()
+    metrics = LLMMetrics()
+    breaker = CircuitBreaker(failure_threshold=3, reset_seconds=30, metrics=metrics, clock=clock)
+    resilient, provider, _ = make_resilient([None] * 3, breaker=breaker, max_attempts=3)
+
+    with pytest.raises(LLMUnavailableError):
+        asyncio.run(resilient.agenerate_text("report"))
+    assert breaker.state == CircuitBreaker.OPEN
+
+    # While open the provider is not called at all
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(resilient.agenerate_text("report"))
+    assert provider.calls == 3
+    assert metrics.snapshot()["gauges"]["llm_circuit_state"] == 2
+
+    clock.now = 31
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert asyncio.run(resilient.agenerate_text("report")) == "ok"
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_deadline_bounds_the_whole_call():
+    resilient, provider, metrics = make_resilient([0.5, 0.5, 0.5])
+
+    start = time.perf_counter()
+    with pytest.raises(LLMUnavailableError):
+        asyncio.run(resilient.agenerate_text("report", timeout=0.2))
+    assert time.perf_counter() - start < 0.45
+    assert metrics.snapshot()["counters"]['llm_attempts_total{outcome="timeout"}'] >= 1
@@ -0,0 +1,118 @@
+"""
+Tests for the LLM response cache
+"""
+import asyncio
+import threading
+
+from llm.LLMInterface import LLMInterface
+from llm.ResponseCache import ResponseCache
+from llm.CachedProvider import CachedProvider
+import llm.ResponseCache as response_cache_module
+
+
+class CountingProvider(LLMInterface):
+    def __init__(self):
+        self.generation_model_id = None
+        self.calls = 0
+
+    def set_generation_model(self, model_id: str):
+        self.generation_model_id = model_id
+
+    def generate_text(self, prompt: str, chat_history: list = None,
+                      max_output_tokens: int = None, temperature: float = None):
+        self.calls += 1
+        return f"{self.generation_model_id}:{prompt}:{temperature}:{self.calls}"
+
+    def construct_prompt(self, prompt: str, role: str):
+        return {"role": role, "text": prompt}
+
+
+def test_memory_tier_is_lru_bounded():
+    cache = ResponseCache(max_memory_entries=2)
+    cache.set("a", "A")
+    cache.set("b", "B")
+    assert cache.get("a") == "A"
+    cache.set("c", "C")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "A" and cache.get("c") == "C"
+    stats = cache.stats()
+    assert (stats["memory_hits"], stats["misses"], stats["evictions"]) == (3, 1, 1)
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(response_cache_module.time, "time", lambda: now[0])
+    cache = ResponseCache(ttl_seconds=60)
+    cache.set("k", "v")
+
+    now[0] += 59
+    assert cache.get("k") == "v"
+    now[0] += 2
+    assert cache.get("k") is None
+
+
+def test_disk_tier_persists_and_is_size_bounded(tmp_path):
+    path = str(tmp_path / "cache" / "llm.sqlite3")
+    cache = ResponseCache(disk_path=path, max_disk_entries=3)
+    for i in range(5):
+        cache.set(f"k{i}", f"v{i}")
+    cache.close()
+
+    reopened = ResponseCache(disk_path=path, max_disk_entries=3)
+    assert reopened.get("k0") is None
+    assert reopened.get("k4") == "v4"
+    stats = reopened.stats()
+    assert (stats["disk_hits"], stats["disk_entries"], stats["memory_entries"]) == (1, 3, 1)
+
+
+def test_async_access_keeps_the_disk_tier_off_the_event_loop(tmp_path):
+    threads = []
+
+    class RecordingCache(ResponseCache):
+        def get(self, key):
+            threads.append(threading.get_ident())
+            return super().get(key)
+
+        def set(self, key, response):
+            threads.append(threading.get_ident())
+            super().set(key, response)
+
+    cache = RecordingCache(disk_path=str(tmp_path / "llm.sqlite3"))
+
+    async def runner():
+        await cache.aset("k", "v")
+        return threading.get_ident(), await cache.aget("k"), await cache.astats()
+
+    loop_thread, value, stats = asyncio.run(runner())
+    assert value == "v" and stats["disk_entries"] == 1
+    assert len(threads) == 2 and loop_thread not in threads
+
+
+def test_cached_provider_reuses_identical_requests_and_honours_bypass():
+    provider = CountingProvider()
+    cached = CachedProvider(provider, ResponseCache())
+    cached.set_generation_model("model-a")
+
+    first = cached.generate_text("summarize", max_output_tokens=100, temperature=0.7)
+    assert cached.generate_text("summarize", max_output_tokens=100, temperature=0.7) == first
+    assert provider.calls == 1
+
+    # Any parameter that changes the generation is part of the key
+    cached.generate_text("summarize", max_output_tokens=100, temperature=0.2)
+    cached.set_generation_model("model-b")
+    cached.generate_text("summarize", max_output_tokens=100, temperature=0.7)
+    assert provider.calls == 3
+
+    refreshed = cached.generate_text("summarize", max_output_tokens=100, temperature=0.7, use_cache=False)
+    assert provider.calls == 4
+    assert cached.generate_text("summarize", max_output_tokens=100, temperature=0.7) == refreshed
+
+
+def test_cached_provider_without_cache_passes_through():
+    provider = CountingProvider()
+    cached = CachedProvider(provider, None)
+    cached.generate_text("p")
+    cached.generate_text("p")
+    assert provider.calls == 2
+    assert cached.construct_prompt("p", "user") == {"role": "user", "text": "p"}
@@ -1,3 +1,5 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 import os
@@ -8,8 +10,70 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 from routes import user_router, task_router, auth_router, task_status_history_router
 from routes.ai_report_routes import router as ai_report_router
 from routes.oauth_routes import router as oauth_router
+from config import settings
+from llm.LLMConcurrency import configure_llm_limiter
+from llm.LLMInstrumentation import configure_llm_instrumentation
+from agents.report_agent import ReportAgent
+from agents.doc_writer_agent import DocWriterAgent
+from agents.report_templates import get_report_templates
+from agents.report_jobs import ReportJobQueue
+from agents.report_scheduler import ReportScheduler, parse_report_types
+from database import AsyncSessionLocal
 
-app = FastAPI(title="Data2Paper API",description="API for managing tasks and generating reports",version="0.1.0"
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # LLM calls run in a bounded thread pool so report generation never blocks the event loop
+    limiter = configure_llm_limiter(settings.llm_max_concurrency, settings.llm_timeout_seconds)
+    # Per-call latency and token histograms, served by /ai-reports/llm-metrics
+    configure_llm_instrumentation(log_calls=settings.llm_call_log_enabled,
+                                  cost_per_1k_input_tokens=settings.llm_cost_per_1k_input_tokens,
+                                  cost_per_1k_output_tokens=settings.llm_cost_per_1k_output_tokens)
+    
+    # Built once and shared by every report request; only the DB session is per request
+    app.state.report_templates = get_report_templates()
+    app.state.doc_writer = DocWriterAgent(output_dir="reports")
+    app.state.report_agent = ReportAgent(doc_writer=app.state.doc_writer, templates=app.state.report_templates)
+    app.state.llm_provider = app.state.report_agent.llm_provider
+    app.state.report_agent.warm_up()
+    
+    # Background report jobs, persisted in report_jobs and run by in-process workers
+    app.state.report_jobs = ReportJobQueue(
+        AsyncSessionLocal, app.state.report_agent,
+        workers=settings.report_job_workers,
+        max_attempts=settings.report_job_max_attempts,
+        retry_delay_seconds=settings.report_job_retry_delay_seconds,
+        stale_seconds=settings.report_job_stale_seconds,
+        poll_seconds=settings.report_job_poll_seconds,
+        use_rollups=settings.stats_use_rollups
+    )
+    await app.state.report_jobs.start()
+    
+    # Nightly reports for every active user, spread over an off-peak window
+    scheduled_reports = None
+    if settings.report_schedule_enabled:
+        app.state.report_scheduler = ReportScheduler(
+            AsyncSessionLocal, app.state.report_agent,
+            batch_size=settings.report_schedule_batch_size,
+            concurrency=settings.report_schedule_concurrency,
+            llm_calls_per_minute=settings.report_schedule_llm_calls_per_minute,
+            window_seconds=settings.report_schedule_window_minutes * 60,
+            generate_documents=settings.report_schedule_generate_documents,
+            retry_attempts=settings.report_schedule_retry_attempts,
+            retry_delay_seconds=settings.report_schedule_retry_delay_seconds,
+            use_rollups=settings.stats_use_rollups
+        )
+        scheduled_reports = asyncio.create_task(app.state.report_scheduler.run_scheduled(
+            parse_report_types(settings.report_schedule_types), settings.report_schedule_hour))
+    
+    yield
+    
+    if scheduled_reports is not None:
+        scheduled_reports.cancel()
+    await app.state.report_jobs.stop()
+    limiter.shutdown()
+
+app = FastAPI(title="Data2Paper API",description="API for managing tasks and generating reports",version="0.1.0",
+              lifespan=lifespan
 )
 
 # Configure CORS
@@ -19,6 +83,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 # Include routers
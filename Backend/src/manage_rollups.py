@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Maintenance commands for the user_daily_stats rollup table
+
+Usage:
+    python manage_rollups.py backfill [--user-id ID]   Rebuild rollups from tasks and task_status_history
+    python manage_rollups.py check [--user-id ID]      Compare rollups with the raw tables
+"""
+import argparse
+import sys
+import os
+
+# Add the current directory to the Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from database import SessionLocal
+from models.model.user_daily_stats import user_daily_stats
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Maintain the user_daily_stats rollup table")
+    parser.add_argument("command", choices=["backfill", "check"])
+    parser.add_argument("--user-id", type=int, default=None, help="limit to a single user")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        if args.command == "backfill":
+            rows = user_daily_stats.backfill(db, user_id=args.user_id)
+            print(f"Rebuilt {rows} rollup rows")
+            return 0
+
+        mismatches = user_daily_stats.check_consistency(db, user_id=args.user_id)
+        for mismatch in mismatches:
+            print(f"user {mismatch['user_id']} day {mismatch['day']}: {mismatch['fields']}")
+        print(f"{len(mismatches)} inconsistent rollup rows")
+        return 1 if mismatches else 0
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
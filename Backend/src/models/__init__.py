@@ -7,6 +7,7 @@ from .db_schemes.schemes.employment_task import Employment_Task
 from .db_schemes.schemes.certification_task import Certification_Task
 from .db_schemes.schemes.ai_report import AI_Report
 from .db_schemes.schemes.task_status_history import Task_Status_History
+from .db_schemes.schemes.user_daily_stats import User_Daily_Stats
 
 # Import enums
 from .enums.task_status import TaskStatus
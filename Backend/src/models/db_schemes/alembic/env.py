@@ -33,6 +33,7 @@ from models.db_schemes.schemes.employment_task import Employment_Task
 from models.db_schemes.schemes.certification_task import Certification_Task
 from models.db_schemes.schemes.ai_report import AI_Report
 from models.db_schemes.schemes.task_status_history import Task_Status_History
+from models.db_schemes.schemes.user_daily_stats import User_Daily_Stats
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
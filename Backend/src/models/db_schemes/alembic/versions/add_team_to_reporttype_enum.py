@@ -0,0 +1,26 @@
+"""add team to reporttype enum
+
+Revision ID: e5a9c3f7b1d4
+Revises: d2b8f4c6e1a7
+Create Date: 2026-10-17 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'e5a9c3f7b1d4'
+down_revision = 'd2b8f4c6e1a7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Add 'TEAM' to the reporttype enum for reports across many users
+    op.execute("ALTER TYPE reporttype ADD VALUE 'TEAM'")
+
+
+def downgrade():
+    # Note: Removing values from enums is not supported in PostgreSQL
+    # This is a placeholder for completeness
+    pass
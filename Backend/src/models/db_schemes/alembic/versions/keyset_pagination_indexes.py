@@ -0,0 +1,34 @@
+"""add (created_at, id) indexes for keyset pagination
+
+Revision ID: 9a3d5f1c7b2e
+Revises: 7e4b2c9d1a6f
+Create Date: 2026-10-17 15:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '9a3d5f1c7b2e'
+down_revision = '7e4b2c9d1a6f'
+branch_labels = None
+depends_on = None
+
+# List queries are ordered by (created_at, id) and continue with
+# WHERE (created_at, id) > (:created_at, :id), so each index ends in those columns.
+# The per-user and per-status tasks indexes (7e4b2c9d1a6f) already end in them.
+INDEXES = [
+    ('ix_tasks_created_at_id', 'tasks', ['created_at', 'id']),
+    ('ix_users_created_at_id', 'users', ['created_at', 'id']),
+]
+
+
+def upgrade():
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, postgresql_concurrently=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, table, columns in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
@@ -0,0 +1,27 @@
+"""add data_fingerprint to ai_reports and force to report_jobs
+
+Revision ID: d2b8f4c6e1a7
+Revises: c7f1e3a5d9b2
+Create Date: 2026-10-17 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd2b8f4c6e1a7'
+down_revision = 'c7f1e3a5d9b2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Existing reports have no fingerprint, so they are never reused
+    op.add_column('ai_reports', sa.Column('data_fingerprint', sa.String(length=64), nullable=True))
+    op.add_column('report_jobs', sa.Column('force', sa.Boolean(), nullable=False, server_default=sa.false()))
+
+
+def downgrade():
+    op.drop_column('report_jobs', 'force')
+    op.drop_column('ai_reports', 'data_fingerprint')
@@ -0,0 +1,52 @@
+"""add report_jobs table
+
+Revision ID: b4e6d2a8c1f3
+Revises: 9a3d5f1c7b2e
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = 'b4e6d2a8c1f3'
+down_revision = '9a3d5f1c7b2e'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Background report generation jobs, see agents/report_jobs.py.
+    # The reporttype enum already exists; jobstatus is created with the table.
+    op.create_table('report_jobs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('report_type', postgresql.ENUM('DAILY', 'WEEKLY', 'MONTHLY', 'CUSTOM', name='reporttype', create_type=False), nullable=False),
+    sa.Column('parameters', sa.JSON(), nullable=True),
+    sa.Column('generate_document', sa.Boolean(), nullable=False, server_default=sa.false()),
+    sa.Column('use_cache', sa.Boolean(), nullable=False, server_default=sa.true()),
+    sa.Column('status', sa.Enum('QUEUED', 'RUNNING', 'SUCCEEDED', 'FAILED', name='jobstatus'), nullable=False),
+    sa.Column('progress', sa.Integer(), nullable=False, server_default='0'),
+    sa.Column('stage', sa.String(length=32), nullable=True),
+    sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'),
+    sa.Column('max_attempts', sa.Integer(), nullable=False, server_default='3'),
+    sa.Column('result', sa.JSON(), nullable=True),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('available_at', sa.DateTime(), nullable=False),
+    sa.Column('started_at', sa.DateTime(), nullable=True),
+    sa.Column('heartbeat_at', sa.DateTime(), nullable=True),
+    sa.Column('finished_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_report_jobs_status_available_at', 'report_jobs', ['status', 'available_at'], unique=False)
+    op.create_index('ix_report_jobs_user_id_created_at', 'report_jobs', ['user_id', 'created_at'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_report_jobs_user_id_created_at', table_name='report_jobs')
+    op.drop_index('ix_report_jobs_status_available_at', table_name='report_jobs')
+    op.drop_table('report_jobs')
+    sa.Enum(name='jobstatus').drop(op.get_bind(), checkfirst=True)
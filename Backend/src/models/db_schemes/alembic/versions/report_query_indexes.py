@@ -0,0 +1,52 @@
+"""add composite and partial indexes for report and listing queries
+
+Revision ID: 7e4b2c9d1a6f
+Revises: 5c1f7a9e2b3d
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '7e4b2c9d1a6f'
+down_revision = '5c1f7a9e2b3d'
+branch_labels = None
+depends_on = None
+
+NOTE_PRESENT = sa.text('note IS NOT NULL')
+
+# (index name, table, columns, extra kwargs)
+INDEXES = [
+    # Report windows and per-user listings: WHERE user_id = ? AND created_at >= ?.
+    # The trailing id also serves the keyset pagination of 9a3d5f1c7b2e.
+    ('ix_tasks_user_id_created_at_id', 'tasks', ['user_id', 'created_at', 'id'], {}),
+    # CRUDTask.get_multi_by_status and status-filtered custom reports
+    ('ix_tasks_status_created_at_id', 'tasks', ['status', 'created_at', 'id'], {}),
+    # History per task ordered by update time
+    ('ix_task_status_history_task_id_updated_at', 'task_status_history', ['task_id', 'updated_at'], {}),
+    # Status notes only: WHERE note IS NOT NULL
+    ('ix_task_status_history_task_id_notes', 'task_status_history', ['task_id', 'updated_at'],
+     {'postgresql_where': NOTE_PRESENT, 'sqlite_where': NOTE_PRESENT}),
+    # Recent reports: WHERE user_id = ? ORDER BY generated_at DESC
+    ('ix_ai_reports_user_id_generated_at', 'ai_reports', ['user_id', sa.text('generated_at DESC')], {}),
+    # Subtype lookups and EXISTS filters by task
+    ('ix_student_tasks_task_id', 'student_tasks', ['task_id'], {}),
+    ('ix_business_tasks_task_id', 'business_tasks', ['task_id'], {}),
+    ('ix_employment_tasks_task_id', 'employment_tasks', ['task_id'], {}),
+    ('ix_certification_tasks_task_id', 'certification_tasks', ['task_id'], {}),
+]
+
+
+def upgrade():
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction; building the
+    # indexes this way does not block writes to the tables on PostgreSQL.
+    with op.get_context().autocommit_block():
+        for name, table, columns, kwargs in INDEXES:
+            op.create_index(name, table, columns, postgresql_concurrently=True, **kwargs)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, table, columns, kwargs in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
@@ -0,0 +1,41 @@
+"""add report_schedule_runs table
+
+Revision ID: c7f1e3a5d9b2
+Revises: b4e6d2a8c1f3
+Create Date: 2026-10-17 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = 'c7f1e3a5d9b2'
+down_revision = 'b4e6d2a8c1f3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Checkpoints of scheduled bulk report runs, see agents/report_scheduler.py.
+    # Both enum types already exist.
+    op.create_table('report_schedule_runs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('report_type', postgresql.ENUM('DAILY', 'WEEKLY', 'MONTHLY', 'CUSTOM', name='reporttype', create_type=False), nullable=False),
+    sa.Column('period_start', sa.Date(), nullable=False),
+    sa.Column('status', postgresql.ENUM('QUEUED', 'RUNNING', 'SUCCEEDED', 'FAILED', name='jobstatus', create_type=False), nullable=False),
+    sa.Column('last_user_id', sa.Integer(), nullable=False, server_default='0'),
+    sa.Column('users_succeeded', sa.Integer(), nullable=False, server_default='0'),
+    sa.Column('users_failed', sa.Integer(), nullable=False, server_default='0'),
+    sa.Column('users_skipped', sa.Integer(), nullable=False, server_default='0'),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('started_at', sa.DateTime(), nullable=False),
+    sa.Column('heartbeat_at', sa.DateTime(), nullable=False),
+    sa.Column('finished_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('report_type', 'period_start', name='uq_report_schedule_runs_type_period')
+    )
+
+
+def downgrade():
+    op.drop_table('report_schedule_runs')
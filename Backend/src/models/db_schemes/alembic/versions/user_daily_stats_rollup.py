@@ -0,0 +1,39 @@
+"""add user_daily_stats rollup table
+
+Revision ID: 5c1f7a9e2b3d
+Revises: 2d8a3f8e4b5c
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '5c1f7a9e2b3d'
+down_revision = '2d8a3f8e4b5c'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Per-user, per-day rollup keyed by task creation day.
+    # Populate it with `python manage_rollups.py backfill` after upgrading.
+    op.create_table('user_daily_stats',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('created_count', sa.Integer(), nullable=False, server_default='0'),
+    sa.Column('completed_count', sa.Integer(), nullable=False, server_default='0'),
+    sa.Column('in_progress_count', sa.Integer(), nullable=False, server_default='0'),
+    sa.Column('pending_count', sa.Integer(), nullable=False, server_default='0'),
+    sa.Column('overdue_count', sa.Integer(), nullable=False, server_default='0'),
+    sa.Column('status_change_count', sa.Integer(), nullable=False, server_default='0'),
+    sa.Column('completion_hours_sum', sa.Float(), nullable=False, server_default='0'),
+    sa.Column('completion_hours_count', sa.Integer(), nullable=False, server_default='0'),
+    sa.Column('note_count', sa.Integer(), nullable=False, server_default='0'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('user_id', 'day')
+    )
+
+
+def downgrade():
+    op.drop_table('user_daily_stats')
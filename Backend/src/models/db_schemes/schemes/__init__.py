@@ -7,3 +7,6 @@ from .employment_task import Employment_Task
 from .certification_task import Certification_Task
 from .ai_report import AI_Report
 from .task_status_history import Task_Status_History
+from .user_daily_stats import User_Daily_Stats
+from .report_job import Report_Job
+from .report_schedule_run import Report_Schedule_Run
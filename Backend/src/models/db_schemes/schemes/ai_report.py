@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Enum
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Enum, Index, text
 from sqlalchemy.orm import relationship
 from .base import Base
 from ...enums.report_type import ReportType
@@ -7,6 +7,9 @@ from ...enums.report_type import ReportType
 
 class AI_Report(Base):
     __tablename__ = "ai_reports"
+    __table_args__ = (
+        Index("ix_ai_reports_user_id_generated_at", "user_id", text("generated_at DESC")),
+    )
 
     id = Column(Integer, primary_key=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -14,5 +17,7 @@ class AI_Report(Base):
     summary_text = Column(Text, nullable=False)
     file_path = Column(String(512))
     report_type = Column(Enum(ReportType), nullable=False)
+    # Digest of the data the report was generated from; None if it must not be reused (see MCPClient.get_data_fingerprint)
+    data_fingerprint = Column(String(64))
     
     user = relationship("User", back_populates="ai_reports")
\ No newline at end of file
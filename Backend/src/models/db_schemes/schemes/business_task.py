@@ -8,7 +8,7 @@ class Business_Task(Base):
     __tablename__ = "business_tasks"
 
     id = Column(Integer, primary_key=True)
-    task_id = Column(Integer, ForeignKey("tasks.id"), nullable=False)
+    task_id = Column(Integer, ForeignKey("tasks.id"), nullable=False, index=True)
     project_name = Column(String(255), nullable=False)
     priority = Column(Enum(Priority), nullable=False)
     due_date = Column(DateTime, nullable=False)
@@ -7,7 +7,7 @@ class Certification_Task(Base):
     __tablename__ = "certification_tasks"
 
     id = Column(Integer, primary_key=True)
-    task_id = Column(Integer, ForeignKey("tasks.id"), nullable=False)
+    task_id = Column(Integer, ForeignKey("tasks.id"), nullable=False, index=True)
     certification_name = Column(String(255), nullable=False)
     issuer = Column(String(255), nullable=False)
     expiry_date = Column(DateTime, nullable=True)
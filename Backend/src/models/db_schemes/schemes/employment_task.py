@@ -7,7 +7,7 @@ class Employment_Task(Base):
     __tablename__ = "employment_tasks"
 
     id = Column(Integer, primary_key=True)
-    task_id = Column(Integer, ForeignKey("tasks.id"), nullable=False)
+    task_id = Column(Integer, ForeignKey("tasks.id"), nullable=False, index=True)
     company = Column(String(255), nullable=False)
     position = Column(String(255), nullable=False)
     deadline = Column(DateTime, nullable=False)
@@ -0,0 +1,39 @@
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, ForeignKey, Enum, Index, JSON
+from .base import Base
+from ...enums.report_type import ReportType
+from ...enums.job_status import JobStatus
+
+
+class Report_Job(Base):
+    """A report generation request, run in the background by a worker
+
+    Workers claim the oldest queued job whose available_at has passed.
+    heartbeat_at is refreshed while a job runs, so jobs left running by a
+    worker that died can be recognized and queued again.
+    """
+    __tablename__ = "report_jobs"
+    __table_args__ = (
+        Index("ix_report_jobs_status_available_at", "status", "available_at"),
+        Index("ix_report_jobs_user_id_created_at", "user_id", "created_at"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    report_type = Column(Enum(ReportType), nullable=False)
+    parameters = Column(JSON)
+    generate_document = Column(Boolean, default=False, nullable=False)
+    use_cache = Column(Boolean, default=True, nullable=False)
+    force = Column(Boolean, default=False, nullable=False)
+    status = Column(Enum(JobStatus), default=JobStatus.QUEUED, nullable=False)
+    progress = Column(Integer, default=0, nullable=False)
+    stage = Column(String(32))
+    attempts = Column(Integer, default=0, nullable=False)
+    max_attempts = Column(Integer, default=3, nullable=False)
+    result = Column(JSON)
+    error = Column(Text)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    available_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    started_at = Column(DateTime)
+    heartbeat_at = Column(DateTime)
+    finished_at = Column(DateTime)
@@ -0,0 +1,31 @@
+from datetime import datetime
+from sqlalchemy import Column, Integer, Text, Date, DateTime, Enum, UniqueConstraint
+from .base import Base
+from ...enums.report_type import ReportType
+from ...enums.job_status import JobStatus
+
+
+class Report_Schedule_Run(Base):
+    """Checkpoint of a scheduled bulk report run
+
+    There is one row per report type and period. Users are processed in
+    ascending id order, and last_user_id is advanced after each batch, so a
+    run that stops part way resumes after the last finished batch.
+    """
+    __tablename__ = "report_schedule_runs"
+    __table_args__ = (
+        UniqueConstraint("report_type", "period_start", name="uq_report_schedule_runs_type_period"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    report_type = Column(Enum(ReportType), nullable=False)
+    period_start = Column(Date, nullable=False)
+    status = Column(Enum(JobStatus), default=JobStatus.RUNNING, nullable=False)
+    last_user_id = Column(Integer, default=0, nullable=False)
+    users_succeeded = Column(Integer, default=0, nullable=False)
+    users_failed = Column(Integer, default=0, nullable=False)
+    users_skipped = Column(Integer, default=0, nullable=False)
+    error = Column(Text)
+    started_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    heartbeat_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    finished_at = Column(DateTime)
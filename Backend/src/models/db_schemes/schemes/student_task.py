@@ -7,7 +7,7 @@ class Student_Task(Base):
     __tablename__ = "student_tasks"
 
     id = Column(Integer, primary_key=True)
-    task_id = Column(Integer, ForeignKey("tasks.id"), nullable=False)
+    task_id = Column(Integer, ForeignKey("tasks.id"), nullable=False, index=True)
     subject = Column(String(255), nullable=False)
     deadline = Column(DateTime, nullable=False)
     
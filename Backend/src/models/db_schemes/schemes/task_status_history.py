@@ -1,11 +1,16 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, Text, DateTime, ForeignKey, Enum
+from sqlalchemy import Column, Integer, Text, DateTime, ForeignKey, Enum, Index, text
 from sqlalchemy.orm import relationship
 from .base import Base
 from ...enums.task_status import TaskStatus
 
 class Task_Status_History(Base):
     __tablename__ = "task_status_history"
+    __table_args__ = (
+        Index("ix_task_status_history_task_id_updated_at", "task_id", "updated_at"),
+        Index("ix_task_status_history_task_id_notes", "task_id", "updated_at",
+              postgresql_where=text("note IS NOT NULL"), sqlite_where=text("note IS NOT NULL")),
+    )
 
     id = Column(Integer, primary_key=True)
     task_id = Column(Integer, ForeignKey("tasks.id"), nullable=False)
@@ -0,0 +1,24 @@
+from sqlalchemy import Column, Integer, Float, Date, ForeignKey
+from .base import Base
+
+
+class User_Daily_Stats(Base):
+    """Per-user, per-day rollup of task activity
+
+    Rows are keyed by the creation day of the tasks they describe, so summing
+    the rows of a day range gives the same figures as scanning the tasks
+    created in that range.
+    """
+    __tablename__ = "user_daily_stats"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    created_count = Column(Integer, default=0, nullable=False)
+    completed_count = Column(Integer, default=0, nullable=False)
+    in_progress_count = Column(Integer, default=0, nullable=False)
+    pending_count = Column(Integer, default=0, nullable=False)
+    overdue_count = Column(Integer, default=0, nullable=False)
+    status_change_count = Column(Integer, default=0, nullable=False)
+    completion_hours_sum = Column(Float, default=0.0, nullable=False)
+    completion_hours_count = Column(Integer, default=0, nullable=False)
+    note_count = Column(Integer, default=0, nullable=False)
@@ -4,3 +4,4 @@ from .task_status import TaskStatus
 from .report_type import ReportType
 from .user_role import UserRole
 from .user_status import UserStatus
+from .job_status import JobStatus
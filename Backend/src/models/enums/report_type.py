@@ -1,4 +1,3 @@
-
 from enum import Enum
 
 class ReportType(str, Enum):
@@ -6,3 +5,4 @@ class ReportType(str, Enum):
     WEEKLY = "Weekly"
     MONTHLY = "Monthly"
     CUSTOM = "Custom"
+    TEAM = "Team"
@@ -1,7 +1,9 @@
-from sqlalchemy.orm import Session
-from typing import Generic, TypeVar, Type, List, Optional
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Session, Query
+from typing import Generic, TypeVar, Type, List, Optional, Tuple
 from enum import Enum
 from ..db_schemes.schemes.base import Base
+from .pagination import encode_cursor, decode_cursor
 
 ModelType = TypeVar("ModelType", bound=Base)
 
@@ -15,16 +17,45 @@ class CRUDBase(Generic[ModelType]):
         """
         self.model = model
 
+    @property
+    def sort_columns(self) -> Tuple:
+        """Columns giving list queries a stable order: (created_at, id) when available"""
+        if hasattr(self.model, "created_at"):
+            return (self.model.created_at, self.model.id)
+        return (self.model.id,)
+
+    def paginate(self, query: Query, *, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> List[ModelType]:
+        """Order a query by the sort columns and return one page of it
+
+        With a cursor (from next_cursor) the page starts right after the row the
+        cursor points to, using an indexable keyset condition instead of OFFSET,
+        and skip is ignored. Raises InvalidCursorError for a malformed cursor.
+        """
+        query = query.order_by(*self.sort_columns)
+        if cursor is not None:
+            columns = self.sort_columns
+            query = query.filter(tuple_(*columns) > tuple_(*decode_cursor(cursor, columns)))
+        elif skip:
+            query = query.offset(skip)
+        return query.limit(limit).all()
+
+    def next_cursor(self, items: List[ModelType], limit: int) -> Optional[str]:
+        """Cursor for the page after items, or None if items was the last page"""
+        if not items or len(items) < limit:
+            return None
+        last = items[-1]
+        return encode_cursor([getattr(last, column.key) for column in self.sort_columns])
+
     def get(self, db: Session, id: int) -> Optional[ModelType]:
         """Get a record by ID"""
         return db.query(self.model).filter(self.model.id == id).first()
 
-    def get_multi(self, db: Session, *, skip: int = 0, limit: int = 100) -> List[ModelType]:
+    def get_multi(self, db: Session, *, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> List[ModelType]:
         """Get multiple records with pagination"""
-        return db.query(self.model).offset(skip).limit(limit).all()
+        return self.paginate(db.query(self.model), skip=skip, limit=limit, cursor=cursor)
 
-    def create(self, db: Session, *, obj_in) -> ModelType:
-        """Create a new record"""
+    def create(self, db: Session, *, obj_in, commit: bool = True) -> ModelType:
+        """Create a new record; with commit=False it is only flushed, for the caller to commit"""
         obj_data = obj_in.dict()
         # Handle enum values properly
         for key, value in obj_data.items():
@@ -32,12 +63,15 @@ class CRUDBase(Generic[ModelType]):
                 obj_data[key] = value.value
         db_obj = self.model(**obj_data)
         db.add(db_obj)
+        if not commit:
+            db.flush()
+            return db_obj
         db.commit()
         db.refresh(db_obj)
         return db_obj
 
-    def update(self, db: Session, *, db_obj: ModelType, obj_in) -> ModelType:
-        """Update an existing record"""
+    def update(self, db: Session, *, db_obj: ModelType, obj_in, commit: bool = True) -> ModelType:
+        """Update an existing record; with commit=False it is only flushed, for the caller to commit"""
         obj_data = obj_in.dict(exclude_unset=True)
         # Handle enum values properly
         for key, value in obj_data.items():
@@ -45,6 +79,9 @@ class CRUDBase(Generic[ModelType]):
                 obj_data[key] = value.value
             setattr(db_obj, key, obj_data[key])
         db.add(db_obj)
+        if not commit:
+            db.flush()
+            return db_obj
         db.commit()
         db.refresh(db_obj)
         return db_obj
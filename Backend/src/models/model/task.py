@@ -1,16 +1,25 @@
+from sqlalchemy import select
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import Iterator, List, Optional, TYPE_CHECKING
 from ..db_schemes.schemes.task import Task
+from ..db_schemes.schemes.task_status_history import Task_Status_History
 from .base import CRUDBase
 
+if TYPE_CHECKING:
+    from agents.report_records import TaskRecord
+
 class CRUDTask(CRUDBase[Task]):
-    def get_multi_by_user(self, db: Session, *, user_id: int, skip: int = 0, limit: int = 100) -> List[Task]:
+    def get_multi_by_user(self, db: Session, *, user_id: int, skip: int = 0, limit: int = 100,
+                          cursor: Optional[str] = None) -> List[Task]:
         """Get multiple tasks by user ID"""
-        return db.query(self.model).filter(self.model.user_id == user_id).offset(skip).limit(limit).all()
+        query = db.query(self.model).filter(self.model.user_id == user_id)
+        return self.paginate(query, skip=skip, limit=limit, cursor=cursor)
 
-    def get_multi_by_status(self, db: Session, *, status: str, skip: int = 0, limit: int = 100) -> List[Task]:
+    def get_multi_by_status(self, db: Session, *, status: str, skip: int = 0, limit: int = 100,
+                            cursor: Optional[str] = None) -> List[Task]:
         """Get multiple tasks by status"""
-        return db.query(self.model).filter(self.model.status == status).offset(skip).limit(limit).all()
+        query = db.query(self.model).filter(self.model.status == status)
+        return self.paginate(query, skip=skip, limit=limit, cursor=cursor)
 
     def get_multi_by_priority(self, db: Session, *, priority: str, skip: int = 0, limit: int = 100) -> List[Task]:
         """Get multiple tasks by priority"""
@@ -24,5 +33,34 @@ class CRUDTask(CRUDBase[Task]):
             self.model.status != 'completed'
         ).offset(skip).limit(limit).all()
 
+    def iter_with_history(self, db: Session, *, user_id: int, filters: Optional[List] = None,
+                          batch_size: int = 1000) -> Iterator["TaskRecord"]:
+        """Stream a user's tasks with their full status history, one task at a time
+
+        Tasks are joined with their history in a single ordered query fetched
+        in batches of batch_size rows through a server-side cursor, so memory
+        does not grow with the number of tasks or history rows.
+        """
+        # agents.report_records imports the models package, so import it lazily
+        from agents.report_records import TaskRecord, StatusEvent, TASK_RECORD_COLUMNS, STATUS_EVENT_COLUMNS
+
+        statement = select(*TASK_RECORD_COLUMNS, *STATUS_EVENT_COLUMNS)\
+            .outerjoin(Task_Status_History, Task_Status_History.task_id == Task.id)\
+            .where(Task.user_id == user_id, *(filters or []))\
+            .order_by(Task.id.asc(), Task_Status_History.updated_at.asc(), Task_Status_History.id.asc())\
+            .execution_options(yield_per=batch_size)
+
+        task_width = len(TASK_RECORD_COLUMNS)
+        current, history = None, []
+        for row in db.execute(statement):
+            if current is not None and row[0] != current[0]:
+                yield TaskRecord(*current, history=tuple(history))
+                history = []
+            current = row[:task_width]
+            if row[task_width] is not None:
+                history.append(StatusEvent(*row[task_width:]))
+        if current is not None:
+            yield TaskRecord(*current, history=tuple(history))
+
 # Create an instance of CRUDTask for direct use
 task = CRUDTask(Task)
\ No newline at end of file
@@ -0,0 +1,77 @@
+"""
+Tests for keyset pagination in CRUDBase
+"""
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from models.db_schemes.schemes.base import Base
+from models.db_schemes.schemes.user import User
+from models.db_schemes.schemes.task import Task
+from models.enums.task_status import TaskStatus
+from models.model.task import task
+from models.model.pagination import InvalidCursorError
+
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path}/pages.db")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+
+    user = User(name="Page User", email="pages@example.com")
+    db.add(user)
+    db.flush()
+    start = datetime(2024, 1, 1)
+    for i in range(25):
+        # Pairs of tasks share a timestamp so the id tie-breaker matters
+        db.add(Task(title=f"Task {i}", user_id=user.id, status=TaskStatus.PENDING,
+                    created_at=start + timedelta(minutes=i // 2)))
+    db.commit()
+    return db
+
+
+def read_all_pages(db, limit, **kwargs):
+    pages, cursor = [], None
+    while True:
+        items = task.get_multi_by_user(db, limit=limit, cursor=cursor, **kwargs)
+        pages.append([t.id for t in items])
+        cursor = task.next_cursor(items, limit)
+        if cursor is None:
+            return pages
+
+
+def test_cursor_pages_cover_every_row_once_in_order(db):
+    user_id = db.query(User).one().id
+    pages = read_all_pages(db, 10, user_id=user_id)
+
+    ids = [task_id for page in pages for task_id in page]
+    assert [len(page) for page in pages] == [10, 10, 5]
+    assert ids == [t.id for t in db.query(Task).order_by(Task.created_at, Task.id)]
+
+
+def test_cursor_is_stable_under_concurrent_inserts(db):
+    user_id = db.query(User).one().id
+    first = task.get_multi_by_user(db, user_id=user_id, limit=10)
+    cursor = task.next_cursor(first, 10)
+
+    # A row inserted before the cursor position must not shift the next page
+    db.add(Task(title="Backdated", user_id=user_id, status=TaskStatus.PENDING, created_at=datetime(2023, 1, 1)))
+    db.commit()
+
+    second = task.get_multi_by_user(db, user_id=user_id, limit=10, cursor=cursor)
+    assert not {t.id for t in first} & {t.id for t in second}
+    assert second[0].created_at >= first[-1].created_at
+
+
+def test_skip_and_limit_still_work(db):
+    all_ids = [t.id for t in task.get_multi(db, limit=100)]
+    assert [t.id for t in task.get_multi(db, skip=20, limit=10)] == all_ids[20:]
+
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", "WzEsMiwzXQ", "WyJ4IiwxXQ"])
+def test_invalid_cursor_is_rejected(db, cursor):
+    with pytest.raises(InvalidCursorError):
+        task.get_multi(db, cursor=cursor)
@@ -0,0 +1,49 @@
+"""
+Tests for CRUDTask streaming export
+"""
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from agents.task_filters import compile_task_filters
+from models.db_schemes.schemes.base import Base
+from models.db_schemes.schemes.user import User
+from models.db_schemes.schemes.task import Task
+from models.db_schemes.schemes.task_status_history import Task_Status_History
+from models.enums.task_status import TaskStatus
+from models.model.task import task
+
+
+def test_iter_with_history_groups_history_per_task(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path}/export.db")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+
+    owner = User(name="Owner", email="owner@example.com")
+    other = User(name="Other", email="other@example.com")
+    db.add_all([owner, other])
+    db.flush()
+
+    start = datetime(2024, 1, 1)
+    for i in range(5):
+        db.add(Task(title=f"Task {i}", user_id=owner.id, created_at=start + timedelta(days=i),
+                    status=TaskStatus.COMPLETED if i % 2 else TaskStatus.PENDING))
+    db.add(Task(title="Not mine", user_id=other.id, status=TaskStatus.PENDING, created_at=start))
+    db.flush()
+    for t in db.query(Task).filter(Task.user_id == owner.id, Task.title != "Task 4"):
+        for minutes in (5, 0, 10):
+            db.add(Task_Status_History(task_id=t.id, status=TaskStatus.PENDING, note=f"m{minutes}",
+                                       updated_at=t.created_at + timedelta(minutes=minutes)))
+    db.commit()
+
+    records = list(task.iter_with_history(db, user_id=owner.id, batch_size=2))
+
+    assert [r.title for r in records] == [f"Task {i}" for i in range(5)]
+    assert [len(r.history) for r in records] == [3, 3, 3, 3, 0]
+    assert [e.note for e in records[0].history] == ["m0", "m5", "m10"]
+    assert all(e.task_id == r.id for r in records for e in r.history)
+
+    completed = list(task.iter_with_history(db, user_id=owner.id,
+                                            filters=compile_task_filters({"status": "Completed"})))
+    assert [r.title for r in completed] == ["Task 1", "Task 3"]
@@ -0,0 +1,143 @@
+"""
+Tests for the user_daily_stats rollup maintenance
+"""
+import asyncio
+from datetime import datetime, time, timedelta
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+
+from agents.mcp_client import MCPClient
+from agents.report_agent import ReportAgent
+from models.db_schemes.schemes.base import Base
+from models.db_schemes.schemes.user import User
+from models.db_schemes.schemes.task import Task
+from models.db_schemes.schemes.task_status_history import Task_Status_History
+from models.db_schemes.schemes.user_daily_stats import User_Daily_Stats
+from models.enums.task_status import TaskStatus
+from models.model.user_daily_stats import user_daily_stats
+
+
+def create_task(db, user_id, title, created_at, note=None):
+    """Mirror the task creation routes: task, initial history entry, rollup update"""
+    task = Task(title=title, user_id=user_id, status=TaskStatus.PENDING, created_at=created_at)
+    db.add(task)
+    db.flush()
+    db.add(Task_Status_History(task_id=task.id, status=TaskStatus.PENDING, updated_at=created_at, note=note))
+    user_daily_stats.apply_change(db, None, user_daily_stats.contribution(db, task))
+    db.commit()
+    return task
+
+
+def change_status(db, task, status, updated_at, note=None):
+    """Mirror POST /task-status-history/: update the task status and append history"""
+    before = user_daily_stats.contribution(db, task)
+    task.status = status
+    db.add(Task_Status_History(task_id=task.id, status=status, updated_at=updated_at, note=note))
+    user_daily_stats.apply_change(db, before, user_daily_stats.contribution(db, task))
+    db.commit()
+
+
+def seed(tmp_path):
+    url = f"sqlite:///{tmp_path}/rollups.db"
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+
+    user = User(name="Rollup User", email="rollup@example.com")
+    db.add(user)
+    db.commit()
+
+    now = datetime.utcnow()
+    for i in range(8):
+        created_at = now - timedelta(days=i % 4, minutes=5)
+        task = create_task(db, user.id, f"Task {i}", created_at, note="created" if i % 2 else None)
+        if i % 3 != 2:
+            change_status(db, task, TaskStatus.IN_PROGRESS, created_at + timedelta(minutes=1), note="started")
+        if i % 3 == 0:
+            change_status(db, task, TaskStatus.COMPLETED, created_at + timedelta(minutes=2))
+    # Reopening a task removes it from the completion figures
+    change_status(db, task, TaskStatus.IN_PROGRESS, now, note="reopened")
+    return url, db, user.id
+
+
+def test_incremental_rollups_match_raw_tables(tmp_path):
+    url, db, user_id = seed(tmp_path)
+
+    assert user_daily_stats.check_consistency(db) == []
+    assert sum(row.created_count for row in db.query(User_Daily_Stats).all()) == 8
+
+
+def test_consistency_checker_detects_drift_and_backfill_repairs(tmp_path):
+    url, db, user_id = seed(tmp_path)
+
+    row = db.query(User_Daily_Stats).first()
+    row.note_count += 3
+    db.commit()
+
+    mismatches = user_daily_stats.check_consistency(db, user_id=user_id)
+    assert len(mismatches) == 1
+    assert set(mismatches[0]["fields"]) == {"note_count"}
+
+    assert user_daily_stats.backfill(db, user_id=user_id) == 4
+    assert user_daily_stats.check_consistency(db) == []
+
+
+def test_rollup_statistics_match_raw_statistics(tmp_path):
+    url, db, user_id = seed(tmp_path)
+    async_engine = create_async_engine(url.replace("sqlite://", "sqlite+aiosqlite://"), poolclass=NullPool)
+    session_factory = sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def statistics(use_rollups):
+        async with session_factory() as session:
+            client = MCPClient(session, session_factory=session_factory, use_rollups=use_rollups)
+            return await client.get_task_statistics(user_id, "weekly")
+
+    assert asyncio.run(statistics(True)) == asyncio.run(statistics(False))
+
+
+def test_report_snapshots_read_statistics_from_rollups(tmp_path):
+    url, db, user_id = seed(tmp_path)
+    async_engine = create_async_engine(url.replace("sqlite://", "sqlite+aiosqlite://"), poolclass=NullPool)
+    session_factory = sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def statistics(use_rollups):
+        async with session_factory() as session:
+            client = MCPClient(session, session_factory=session_factory, use_rollups=use_rollups)
+            snapshot = await client.load_report_snapshot(user_id, "weekly")
+            return snapshot.statistics()
+
+    assert asyncio.run(statistics(True)) == asyncio.run(statistics(False))
+
+    # Drift in the rollups shows up in rollup-backed reports only
+    db.query(User_Daily_Stats).first().pending_count += 1
+    db.commit()
+    assert asyncio.run(statistics(True))["pending_tasks"] == asyncio.run(statistics(False))["pending_tasks"] + 1
+
+
+def test_period_reports_match_single_period_reports_with_rollups(tmp_path):
+    url, db, user_id = seed(tmp_path)
+    # Inside the weekly window aligned to midnight, but older than exactly seven days
+    cutoff = datetime.utcnow() - timedelta(days=7)
+    aligned = datetime.combine(cutoff.date(), time.min)
+    create_task(db, user_id, "Edge of the week", aligned + (cutoff - aligned) / 2)
+    db.query(User_Daily_Stats).first().pending_count += 1
+    db.commit()
+    async_engine = create_async_engine(url.replace("sqlite://", "sqlite+aiosqlite://"), poolclass=NullPool)
+    session_factory = sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
+    agent = ReportAgent()
+    agent.llm_provider = None
+
+    async def runner():
+        async with session_factory() as session:
+            client = MCPClient(session, session_factory=session_factory, use_rollups=True)
+            reports = await agent.bind(client).generate_period_reports(user_id)
+            separate = await agent.bind(client).generate_weekly_report(user_id, force=True)
+            return reports, separate
+
+    reports, separate = asyncio.run(runner())
+    # Cut at the same start and answered by the same rollups, drift included
+    assert reports["weekly"]["statistics"] == separate["statistics"]
+    assert len(reports["weekly"]["tasks"]) == len(separate["tasks"]) == 9
@@ -16,9 +16,11 @@ class CRUDUser(CRUDBase[User]):
         """Get a user by username"""
         return db.query(self.model).filter(self.model.username == username).first()
 
-    def get_multi_by_role(self, db: Session, *, role: str, skip: int = 0, limit: int = 100) -> List[User]:
+    def get_multi_by_role(self, db: Session, *, role: str, skip: int = 0, limit: int = 100,
+                          cursor: Optional[str] = None) -> List[User]:
         """Get multiple users by role"""
-        return db.query(self.model).filter(self.model.role == role).offset(skip).limit(limit).all()
+        query = db.query(self.model).filter(self.model.role == role)
+        return self.paginate(query, skip=skip, limit=limit, cursor=cursor)
 
     def authenticate(self, db: Session, *, email: str, password: str) -> Optional[User]:
         """Authenticate a user by email and password"""
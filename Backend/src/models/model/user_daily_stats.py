@@ -0,0 +1,196 @@
+from sqlalchemy import insert
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from typing import Dict, List, Optional, NamedTuple, Tuple
+from datetime import date
+from ..db_schemes.schemes.task import Task
+from ..db_schemes.schemes.task_status_history import Task_Status_History
+from ..db_schemes.schemes.user_daily_stats import User_Daily_Stats
+from ..enums.task_status import TaskStatus
+from .base import CRUDBase
+
+# Rollup columns that hold additive counters
+COUNTER_FIELDS = (
+    "created_count",
+    "completed_count",
+    "in_progress_count",
+    "pending_count",
+    "overdue_count",
+    "status_change_count",
+    "completion_hours_sum",
+    "completion_hours_count",
+    "note_count",
+)
+
+# INSERT constructs with ON CONFLICT support, by dialect
+UPSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+STATUS_FIELDS = {
+    TaskStatus.COMPLETED: "completed_count",
+    TaskStatus.IN_PROGRESS: "in_progress_count",
+    TaskStatus.PENDING: "pending_count",
+    TaskStatus.OVERDUE: "overdue_count",
+}
+
+
+class TaskContribution(NamedTuple):
+    """What a single task adds to the rollup row of its creation day"""
+    user_id: int
+    day: date
+    counters: Dict[str, float]
+
+
+def task_contribution_from_rows(task: Task, history: List[Task_Status_History]) -> TaskContribution:
+    """Compute a task's rollup contribution from the task and its status history
+
+    Uses the same definitions as the raw statistics: one status change per
+    history row after the first, and the first COMPLETED entry as the
+    completion time of tasks that are currently completed.
+    """
+    counters = dict.fromkeys(COUNTER_FIELDS, 0)
+    counters["created_count"] = 1
+    counters[STATUS_FIELDS[TaskStatus(task.status)]] = 1
+    counters["status_change_count"] = len(history) - 1
+    counters["note_count"] = sum(1 for h in history if h.note is not None)
+
+    if TaskStatus(task.status) == TaskStatus.COMPLETED and len(history) > 1:
+        completed = [h.updated_at for h in history if TaskStatus(h.status) == TaskStatus.COMPLETED]
+        if completed:
+            counters["completion_hours_sum"] = (min(completed) - task.created_at).total_seconds() / 3600
+            counters["completion_hours_count"] = 1
+
+    return TaskContribution(task.user_id, task.created_at.date(), counters)
+
+
+class CRUDUserDailyStats(CRUDBase[User_Daily_Stats]):
+    def contribution(self, db: Session, task: Optional[Task]) -> Optional[TaskContribution]:
+        """Compute the current rollup contribution of a task, including pending changes"""
+        if task is None:
+            return None
+        db.flush()
+        history = db.query(Task_Status_History).filter(Task_Status_History.task_id == task.id).all()
+        return task_contribution_from_rows(task, history)
+
+    def apply_change(self, db: Session, before: Optional[TaskContribution], after: Optional[TaskContribution]) -> None:
+        """Apply the difference between a task's contribution before and after a write
+
+        Pass before=None for a newly created task and after=None for a deleted one.
+        The caller commits.
+        """
+        deltas: Dict[Tuple[int, date], Dict[str, float]] = {}
+        for contribution, sign in ((before, -1), (after, 1)):
+            if contribution is None:
+                continue
+            row_deltas = deltas.setdefault((contribution.user_id, contribution.day), {})
+            for field, value in contribution.counters.items():
+                row_deltas[field] = row_deltas.get(field, 0) + sign * value
+        for (user_id, day), row_deltas in deltas.items():
+            self._add(db, user_id, day, {field: value for field, value in row_deltas.items() if value})
+
+    def _add(self, db: Session, user_id: int, day: date, deltas: Dict[str, float]) -> None:
+        """Add deltas to a rollup row in one atomic upsert, creating the row if needed
+
+        Concurrent writes for the same user and day are summed by the database
+        instead of overwriting each other.
+        """
+        if not deltas:
+            return
+        table = self.model.__table__
+        values = dict.fromkeys(COUNTER_FIELDS, 0)
+        values.update(deltas)
+        statement = UPSERTS[db.get_bind().dialect.name](table).values(user_id=user_id, day=day, **values)
+        db.execute(statement.on_conflict_do_update(
+            index_elements=[table.c.user_id, table.c.day],
+            set_={field: table.c[field] + statement.excluded[field] for field in deltas}
+        ))
+
+    def get_range(self, db: Session, *, user_id: int, start_day: date) -> List[User_Daily_Stats]:
+        """Get a user's rollup rows from start_day onwards"""
+        return db.query(self.model)\
+                 .filter(self.model.user_id == user_id, self.model.day >= start_day)\
+                 .order_by(self.model.day.asc())\
+                 .all()
+
+    def compute_from_raw(self, db: Session, *, user_id: Optional[int] = None,
+                         batch_size: int = 1000) -> Dict[Tuple[int, date], Dict[str, float]]:
+        """Recompute rollup counters from the tasks and task_status_history tables
+
+        Streams tasks joined with their history in task order, so memory grows
+        with the number of (user, day) pairs rather than with the history size.
+        """
+        query = db.query(Task, Task_Status_History)\
+                  .outerjoin(Task_Status_History, Task_Status_History.task_id == Task.id)
+        if user_id is not None:
+            query = query.filter(Task.user_id == user_id)
+        query = query.order_by(Task.id.asc(), Task_Status_History.updated_at.asc())\
+                     .yield_per(batch_size)
+
+        expected: Dict[Tuple[int, date], Dict[str, float]] = {}
+
+        def accumulate(task, history):
+            contribution = task_contribution_from_rows(task, history)
+            totals = expected.setdefault((contribution.user_id, contribution.day), dict.fromkeys(COUNTER_FIELDS, 0))
+            for field, value in contribution.counters.items():
+                totals[field] += value
+
+        current_task, current_history = None, []
+        for task, history in query:
+            if current_task is not None and task.id != current_task.id:
+                accumulate(current_task, current_history)
+                current_history = []
+            current_task = task
+            if history is not None:
+                current_history.append(history)
+        if current_task is not None:
+            accumulate(current_task, current_history)
+
+        return expected
+
+    def backfill(self, db: Session, *, user_id: Optional[int] = None) -> int:
+        """Rebuild rollup rows from the raw tables; returns the number of rows written"""
+        expected = self.compute_from_raw(db, user_id=user_id)
+
+        delete_query = db.query(self.model)
+        if user_id is not None:
+            delete_query = delete_query.filter(self.model.user_id == user_id)
+        # "fetch" also drops the deleted rows from the identity map, so rows
+        # loaded earlier in the session do not clash with the reinserted keys
+        delete_query.delete(synchronize_session="fetch")
+
+        if expected:
+            # One executemany rather than an ORM object per row
+            db.execute(insert(self.model), [
+                {"user_id": row_user_id, "day": day, **counters}
+                for (row_user_id, day), counters in expected.items()
+            ])
+        db.commit()
+        return len(expected)
+
+    def check_consistency(self, db: Session, *, user_id: Optional[int] = None,
+                          tolerance: float = 1e-6) -> List[Dict]:
+        """Compare stored rollups with the raw tables and return every mismatch"""
+        expected = self.compute_from_raw(db, user_id=user_id)
+
+        query = db.query(self.model)
+        if user_id is not None:
+            query = query.filter(self.model.user_id == user_id)
+        stored = {
+            (row.user_id, row.day): {field: getattr(row, field) for field in COUNTER_FIELDS}
+            for row in query.all()
+        }
+
+        empty = dict.fromkeys(COUNTER_FIELDS, 0)
+        mismatches = []
+        for key in sorted(set(expected) | set(stored)):
+            want = expected.get(key, empty)
+            have = stored.get(key, empty)
+            diff = {
+                field: {"expected": want[field], "stored": have[field]}
+                for field in COUNTER_FIELDS
+                if abs(want[field] - have[field]) > tolerance
+            }
+            if diff:
+                mismatches.append({"user_id": key[0], "day": key[1].isoformat(), "fields": diff})
+        return mismatches
+
+user_daily_stats = CRUDUserDailyStats(User_Daily_Stats)
@@ -1,16 +1,26 @@
 """
 AI Report routes for generating different types of reports using AI agents
 """
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import Dict, Any, Optional
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Awaitable, Callable, Dict, Any, List, Optional
 from pydantic import BaseModel
+import asyncio
+import json
 
-from database import get_db
+from database import get_async_db, AsyncSessionLocal
+from config import settings
 from models.model.auth import get_current_active_user
 from models.db_schemes.schemes.user import User
 from agents.mcp_client import MCPClient
-from agents.report_agent import ReportAgent
+from agents.report_agent import ReportAgent, PERIOD_REPORTS, get_response_cache, get_llm_provider
+from llm.LLMMetrics import llm_metrics
+from agents.report_records import report_to_dict
+from agents.task_filters import TaskFilterError, compile_custom_report_filters
+from agents.report_jobs import ReportJobQueue
+from models.enums.report_type import ReportType
+from models.enums.user_role import UserRole
 
 router = APIRouter(
     prefix="/ai-reports",
@@ -18,6 +28,24 @@ router = APIRouter(
     dependencies=[Depends(get_current_active_user)]
 )
 
+def get_mcp_client(db: AsyncSession = Depends(get_async_db)) -> MCPClient:
+    """Data access for one request, on the request's session"""
+    return MCPClient(db, session_factory=AsyncSessionLocal, use_rollups=settings.stats_use_rollups)
+
+def get_report_agent(request: Request) -> ReportAgent:
+    """The application's ReportAgent, built and warmed up at startup (see main.lifespan)"""
+    agent = getattr(request.app.state, "report_agent", None)
+    if agent is None:
+        agent = request.app.state.report_agent = ReportAgent()
+    return agent
+
+def get_report_job_queue(request: Request) -> ReportJobQueue:
+    """The application's report job queue, started by main.lifespan"""
+    queue = getattr(request.app.state, "report_jobs", None)
+    if queue is None:
+        raise HTTPException(status_code=503, detail="Report jobs are not available")
+    return queue
+
 class CustomReportRequest(BaseModel):
     start_date: Optional[str] = None
     end_date: Optional[str] = None
@@ -31,30 +59,53 @@ class ReportResponse(BaseModel):
     details: Dict[str, Any]
     document_path: Optional[str] = None
 
+class ReportJobRequest(BaseModel):
+    report_type: str  # daily, weekly, monthly or custom
+    generate_document: bool = False
+    use_cache: bool = True
+    force: bool = False
+    parameters: Optional[CustomReportRequest] = None  # custom reports only
+
+class PeriodReportsRequest(BaseModel):
+    report_types: List[str] = ["daily", "weekly", "monthly"]
+    generate_document: bool = False
+    use_cache: bool = True
+    force: bool = False
+    combine_llm_calls: bool = False  # True asks for every summary in a single LLM call
+
+class TeamReportRequest(BaseModel):
+    period: str = "weekly"  # daily, weekly or monthly
+    role: Optional[str] = None  # only active users with this role, e.g. "Employee"
+    user_ids: Optional[List[int]] = None  # only these users; all active users if neither is given
+    generate_document: bool = False
+    use_cache: bool = True
+
 class DocumentGenerationRequest(BaseModel):
     generate_document: bool = False
+    use_cache: bool = True  # False regenerates the summary instead of reusing a cached one
+    force: bool = False  # True generates a new report even if the latest one was made from the same data
 
 @router.post("/daily", response_model=ReportResponse)
 async def generate_daily_report(
     doc_request: DocumentGenerationRequest = None,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    mcp_client: MCPClient = Depends(get_mcp_client),
+    report_agent: ReportAgent = Depends(get_report_agent)
 ):
     """Generate a daily report for the current user"""
     try:
         generate_doc = doc_request.generate_document if doc_request else False
+        use_cache = doc_request.use_cache if doc_request else True
+        force = doc_request.force if doc_request else False
         
-        mcp_client = MCPClient(db)
-        report_agent = ReportAgent(mcp_client)
-        
-        report_data = await report_agent.generate_daily_report(current_user.id, generate_doc)
+        report_data = await report_agent.bind(mcp_client, use_llm_cache=use_cache).generate_daily_report(current_user.id, generate_doc, force=force)
         
         return ReportResponse(
             report_id=report_data["report_id"],
             report_type=report_data["report_type"],
             generated_at=report_data["generated_at"],
             summary=report_data["summary"],
-            details=report_data,
+            details=report_to_dict(report_data),
             document_path=report_data.get("document_path")
         )
     except Exception as e:
@@ -64,23 +115,23 @@ async def generate_daily_report(
 async def generate_weekly_report(
     doc_request: DocumentGenerationRequest = None,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    mcp_client: MCPClient = Depends(get_mcp_client),
+    report_agent: ReportAgent = Depends(get_report_agent)
 ):
     """Generate a weekly report for the current user"""
     try:
         generate_doc = doc_request.generate_document if doc_request else False
+        use_cache = doc_request.use_cache if doc_request else True
+        force = doc_request.force if doc_request else False
         
-        mcp_client = MCPClient(db)
-        report_agent = ReportAgent(mcp_client)
-        
-        report_data = await report_agent.generate_weekly_report(current_user.id, generate_doc)
+        report_data = await report_agent.bind(mcp_client, use_llm_cache=use_cache).generate_weekly_report(current_user.id, generate_doc, force=force)
         
         return ReportResponse(
             report_id=report_data["report_id"],
             report_type=report_data["report_type"],
             generated_at=report_data["generated_at"],
             summary=report_data["summary"],
-            details=report_data,
+            details=report_to_dict(report_data),
             document_path=report_data.get("document_path")
         )
     except Exception as e:
@@ -90,23 +141,23 @@ async def generate_weekly_report(
 async def generate_monthly_report(
     doc_request: DocumentGenerationRequest = None,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    mcp_client: MCPClient = Depends(get_mcp_client),
+    report_agent: ReportAgent = Depends(get_report_agent)
 ):
     """Generate a monthly report for the current user"""
     try:
         generate_doc = doc_request.generate_document if doc_request else False
+        use_cache = doc_request.use_cache if doc_request else True
+        force = doc_request.force if doc_request else False
         
-        mcp_client = MCPClient(db)
-        report_agent = ReportAgent(mcp_client)
-        
-        report_data = await report_agent.generate_monthly_report(current_user.id, generate_doc)
+        report_data = await report_agent.bind(mcp_client, use_llm_cache=use_cache).generate_monthly_report(current_user.id, generate_doc, force=force)
         
         return ReportResponse(
             report_id=report_data["report_id"],
             report_type=report_data["report_type"],
             generated_at=report_data["generated_at"],
             summary=report_data["summary"],
-            details=report_data,
+            details=report_to_dict(report_data),
             document_path=report_data.get("document_path")
         )
     except Exception as e:
@@ -117,37 +168,297 @@ async def generate_custom_report(
     request: CustomReportRequest,
     doc_request: DocumentGenerationRequest = None,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    mcp_client: MCPClient = Depends(get_mcp_client),
+    report_agent: ReportAgent = Depends(get_report_agent)
 ):
     """Generate a custom report for the current user based on parameters"""
     try:
         generate_doc = doc_request.generate_document if doc_request else False
+        use_cache = doc_request.use_cache if doc_request else True
+        force = doc_request.force if doc_request else False
         
-        mcp_client = MCPClient(db)
-        report_agent = ReportAgent(mcp_client)
-        
-        report_data = await report_agent.generate_custom_report(current_user.id, request.dict(), generate_doc)
+        report_data = await report_agent.bind(mcp_client, use_llm_cache=use_cache).generate_custom_report(current_user.id, request.dict(), generate_doc, force=force)
         
         return ReportResponse(
             report_id=report_data["report_id"],
             report_type=report_data["report_type"],
             generated_at=report_data["generated_at"],
             summary=report_data["summary"],
-            details=report_data,
+            details=report_to_dict(report_data),
             document_path=report_data.get("document_path")
         )
+    except TaskFilterError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to generate custom report: {str(e)}")
 
+@router.post("/batch", response_model=Dict[str, ReportResponse])
+async def generate_period_reports(
+    batch_request: PeriodReportsRequest = None,
+    current_user: User = Depends(get_current_active_user),
+    mcp_client: MCPClient = Depends(get_mcp_client),
+    report_agent: ReportAgent = Depends(get_report_agent)
+):
+    """Generate the daily, weekly and monthly reports for the current user from a single data fetch"""
+    batch_request = batch_request or PeriodReportsRequest()
+    periods = {period: report_type for report_type, period in PERIOD_REPORTS.items()}
+    unknown = [name for name in batch_request.report_types if name.lower() not in periods]
+    if unknown or not batch_request.report_types:
+        raise HTTPException(status_code=400, detail=f"report_types must be some of daily, weekly and monthly, got {unknown or 'none'}")
+    
+    try:
+        agent = report_agent.bind(mcp_client, use_llm_cache=batch_request.use_cache)
+        reports = await agent.generate_period_reports(
+            current_user.id,
+            report_types=list(dict.fromkeys(periods[name.lower()] for name in batch_request.report_types)),
+            generate_doc=batch_request.generate_document,
+            combine_llm_calls=batch_request.combine_llm_calls,
+            force=batch_request.force
+        )
+        
+        return {
+            period: ReportResponse(
+                report_id=report_data["report_id"],
+                report_type=report_data["report_type"],
+                generated_at=report_data["generated_at"],
+                summary=report_data["summary"],
+                details=report_to_dict(report_data),
+                document_path=report_data.get("document_path")
+            )
+            for period, report_data in reports.items()
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to generate reports: {str(e)}")
+
+@router.post("/team", response_model=ReportResponse)
+async def generate_team_report(
+    team_request: TeamReportRequest = None,
+    current_user: User = Depends(get_current_active_user),
+    mcp_client: MCPClient = Depends(get_mcp_client),
+    report_agent: ReportAgent = Depends(get_report_agent)
+):
+    """Generate a report across many users (admins only)"""
+    if current_user.role != UserRole.ADMIN:
+        raise HTTPException(status_code=403, detail="Team reports are available to admins only")
+    
+    team_request = team_request or TeamReportRequest()
+    if team_request.period.lower() not in PERIOD_REPORTS.values():
+        raise HTTPException(status_code=400, detail=f"Unknown period: {team_request.period}")
+    role = None
+    if team_request.role:
+        role = next((r for r in UserRole if team_request.role.lower() in (r.name.lower(), r.value.lower())), None)
+        if role is None:
+            raise HTTPException(status_code=400, detail=f"Unknown role: {team_request.role}")
+    
+    try:
+        report_data = await report_agent.bind(mcp_client, use_llm_cache=team_request.use_cache).generate_team_report(
+            current_user.id,
+            period=team_request.period.lower(),
+            role=role,
+            user_ids=team_request.user_ids,
+            generate_doc=team_request.generate_document,
+            chunk_size=settings.team_report_chunk_size,
+            concurrency=settings.team_report_concurrency
+        )
+        
+        return ReportResponse(
+            report_id=report_data["report_id"],
+            report_type=report_data["report_type"],
+            generated_at=report_data["generated_at"],
+            summary=report_data["summary"],
+            details=report_to_dict(report_data),
+            document_path=report_data.get("document_path")
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to generate team report: {str(e)}")
+
+def _sse(event: str, data: Dict[str, Any]) -> str:
+    """Format one Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+def _stream_report(generate: Callable[[ReportAgent, Callable], Awaitable[Dict[str, Any]]],
+                   report_agent: ReportAgent, use_cache: bool, failure: str) -> StreamingResponse:
+    """Run a ReportAgent generate_* call and relay its progress as Server-Sent Events
+    
+    Events: stats, token (summary chunks as the LLM produces them), summary
+    (the final text, which replaces the tokens if the LLM failed part-way and
+    the template fallback was used), saved, document, then done with the same
+    details as the non-streaming endpoint, or error. When the latest report is
+    reused because its data has not changed, stats and token are skipped.
+    """
+    async def events():
+        queue: asyncio.Queue = asyncio.Queue()
+        
+        async def on_event(event: str, data: Dict[str, Any]):
+            await queue.put((event, data))
+        
+        async def run():
+            try:
+                # The request's session may be closed before the stream ends, so use our own
+                async with AsyncSessionLocal() as db:
+                    mcp_client = MCPClient(db, session_factory=AsyncSessionLocal, use_rollups=settings.stats_use_rollups)
+                    result = await generate(report_agent.bind(mcp_client, use_llm_cache=use_cache), on_event)
+                await queue.put(("done", result))
+            except Exception as e:
+                await queue.put(("error", {"detail": f"{failure}: {str(e)}"}))
+        
+        producer = asyncio.create_task(run())
+        try:
+            while True:
+                event, data = await queue.get()
+                yield _sse(event, report_to_dict(data))
+                if event in ("done", "error"):
+                    break
+        finally:
+            # Stop generating when the client disconnects
+            producer.cancel()
+    
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@router.post("/daily/stream")
+async def stream_daily_report(
+    doc_request: DocumentGenerationRequest = None,
+    current_user: User = Depends(get_current_active_user),
+    report_agent: ReportAgent = Depends(get_report_agent)
+):
+    """Generate a daily report for the current user, streamed as Server-Sent Events"""
+    generate_doc = doc_request.generate_document if doc_request else False
+    use_cache = doc_request.use_cache if doc_request else True
+    force = doc_request.force if doc_request else False
+    user_id = current_user.id
+    return _stream_report(
+        lambda agent, on_event: agent.generate_daily_report(user_id, generate_doc, on_event=on_event, force=force),
+        report_agent, use_cache, "Failed to generate daily report"
+    )
+
+@router.post("/weekly/stream")
+async def stream_weekly_report(
+    doc_request: DocumentGenerationRequest = None,
+    current_user: User = Depends(get_current_active_user),
+    report_agent: ReportAgent = Depends(get_report_agent)
+):
+    """Generate a weekly report for the current user, streamed as Server-Sent Events"""
+    generate_doc = doc_request.generate_document if doc_request else False
+    use_cache = doc_request.use_cache if doc_request else True
+    force = doc_request.force if doc_request else False
+    user_id = current_user.id
+    return _stream_report(
+        lambda agent, on_event: agent.generate_weekly_report(user_id, generate_doc, on_event=on_event, force=force),
+        report_agent, use_cache, "Failed to generate weekly report"
+    )
+
+@router.post("/monthly/stream")
+async def stream_monthly_report(
+    doc_request: DocumentGenerationRequest = None,
+    current_user: User = Depends(get_current_active_user),
+    report_agent: ReportAgent = Depends(get_report_agent)
+):
+    """Generate a monthly report for the current user, streamed as Server-Sent Events"""
+    generate_doc = doc_request.generate_document if doc_request else False
+    use_cache = doc_request.use_cache if doc_request else True
+    force = doc_request.force if doc_request else False
+    user_id = current_user.id
+    return _stream_report(
+        lambda agent, on_event: agent.generate_monthly_report(user_id, generate_doc, on_event=on_event, force=force),
+        report_agent, use_cache, "Failed to generate monthly report"
+    )
+
+@router.post("/custom/stream")
+async def stream_custom_report(
+    request: CustomReportRequest,
+    doc_request: DocumentGenerationRequest = None,
+    current_user: User = Depends(get_current_active_user),
+    report_agent: ReportAgent = Depends(get_report_agent)
+):
+    """Generate a custom report for the current user, streamed as Server-Sent Events"""
+    parameters = request.dict()
+    try:
+        # Reject invalid filters before the stream starts
+        compile_custom_report_filters(parameters)
+    except TaskFilterError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    generate_doc = doc_request.generate_document if doc_request else False
+    use_cache = doc_request.use_cache if doc_request else True
+    force = doc_request.force if doc_request else False
+    user_id = current_user.id
+    return _stream_report(
+        lambda agent, on_event: agent.generate_custom_report(user_id, parameters, generate_doc, on_event=on_event, force=force),
+        report_agent, use_cache, "Failed to generate custom report"
+    )
+
+@router.post("/jobs", status_code=202)
+async def create_report_job(
+    job_request: ReportJobRequest,
+    current_user: User = Depends(get_current_active_user),
+    queue: ReportJobQueue = Depends(get_report_job_queue)
+):
+    """Queue a report for background generation; poll GET /ai-reports/jobs/{job_id} for the result"""
+    job_types = {"daily": ReportType.DAILY, "weekly": ReportType.WEEKLY,
+                 "monthly": ReportType.MONTHLY, "custom": ReportType.CUSTOM}
+    report_type = job_types.get(job_request.report_type.lower())
+    if report_type is None:
+        raise HTTPException(status_code=400, detail=f"Unknown report type: {job_request.report_type}")
+    
+    parameters = None
+    if report_type == ReportType.CUSTOM:
+        parameters = (job_request.parameters or CustomReportRequest()).dict()
+        try:
+            # Reject invalid filters now rather than in the worker
+            compile_custom_report_filters(parameters)
+        except TaskFilterError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    
+    try:
+        return await queue.enqueue(current_user.id, report_type, parameters,
+                                   generate_document=job_request.generate_document,
+                                   use_cache=job_request.use_cache, force=job_request.force)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to queue report job: {str(e)}")
+
+@router.get("/jobs/{job_id}")
+async def get_report_job(
+    job_id: int,
+    current_user: User = Depends(get_current_active_user),
+    queue: ReportJobQueue = Depends(get_report_job_queue)
+):
+    """Get the status, progress and, once it succeeded, the result of a report job"""
+    job = await queue.get(job_id, user_id=current_user.id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Report job not found")
+    return job
+
 @router.get("/history")
 async def get_report_history(
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    mcp_client: MCPClient = Depends(get_mcp_client)
 ):
     """Get report generation history for the current user"""
     try:
-        mcp_client = MCPClient(db)
         reports = await mcp_client.get_recent_reports(current_user.id)
         return reports
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to retrieve report history: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Failed to retrieve report history: {str(e)}")
+
+@router.get("/llm-cache")
+async def get_llm_cache_stats():
+    """Get hit/miss counters of the LLM response cache"""
+    cache = get_response_cache()
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **await cache.astats()}
+
+@router.get("/llm-metrics")
+async def get_llm_metrics():
+    """Get the circuit breaker state and the call counters and histograms of the LLM layer"""
+    try:
+        provider = get_llm_provider()
+    except Exception:
+        provider = None
+    breaker = getattr(provider, "breaker", None) if provider else None
+    return {
+        "provider": settings.llm_provider,
+        "circuit_state": breaker.state if breaker else None,
+        **llm_metrics.snapshot()
+    }
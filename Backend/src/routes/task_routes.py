@@ -1,9 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional, Iterator
+import csv
+import io
+import json
 
-from database import get_db
+from database import get_db, SessionLocal
 from models.model.task import task, CRUDTask
+from models.model.user_daily_stats import user_daily_stats
+from models.model.pagination import InvalidCursorError
 from schemas.task import Task, TaskCreate, TaskUpdate
 from schemas.student_task import StudentTaskCreate
 from schemas.business_task import BusinessTaskCreate
@@ -19,6 +25,8 @@ from models.db_schemes.schemes.task_status_history import Task_Status_History
 from models.enums.task_status import TaskStatus
 from models.enums.priority import Priority
 from models.db_schemes.schemes.user import User
+from agents.report_records import TaskRecord
+from agents.task_filters import compile_custom_report_filters, TaskFilterError
 
 router = APIRouter(
     prefix="/tasks",
@@ -27,8 +35,16 @@ router = APIRouter(
 )
 
 @router.get("/", response_model=List[Task])
-def read_tasks(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    tasks = task.get_multi(db, skip=skip, limit=limit)
+def read_tasks(response: Response, skip: int = 0, limit: int = 100, cursor: Optional[str] = None,
+               db: Session = Depends(get_db)):
+    # Pass the X-Next-Cursor header back as ?cursor= to get the next page
+    try:
+        tasks = task.get_multi(db, skip=skip, limit=limit, cursor=cursor)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    next_cursor = task.next_cursor(tasks, limit)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     # Convert SQLAlchemy models to Pydantic models
     return [
         Task(
@@ -40,6 +56,83 @@ def read_tasks(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
         ) for t in tasks
     ]
 
+EXPORT_CSV_COLUMNS = ["task_id", "title", "description", "task_status", "created_at", "updated_at",
+                      "history_id", "history_status", "history_updated_at", "note"]
+
+def _export_records(user_id: int, filters: List) -> Iterator[TaskRecord]:
+    """Stream export records on a session owned by the response body"""
+    db = SessionLocal()
+    try:
+        yield from task.iter_with_history(db, user_id=user_id, filters=filters)
+    finally:
+        db.close()
+
+def _ndjson_lines(records: Iterator[TaskRecord]) -> Iterator[str]:
+    """One JSON object per task, with its status history"""
+    for record in records:
+        data = record.to_dict(include_history=False)
+        data["status_history"] = [event.to_dict() for event in record.history]
+        yield json.dumps(data) + "\n"
+
+def _csv_lines(records: Iterator[TaskRecord]) -> Iterator[str]:
+    """One CSV row per status history entry, repeating the task columns"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def flush() -> str:
+        line = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return line
+
+    writer.writerow(EXPORT_CSV_COLUMNS)
+    yield flush()
+    for record in records:
+        task_data = record.to_dict(include_history=False)
+        task_columns = [task_data["id"], task_data["title"], task_data["description"], task_data["status"],
+                        task_data["created_at"], task_data["updated_at"]]
+        for event in record.history or [None]:
+            event_data = event.to_dict() if event else {}
+            writer.writerow(task_columns + [event_data.get("id"), event_data.get("status"),
+                                            event_data.get("updated_at"), event_data.get("note")])
+        yield flush()
+
+@router.get("/export")
+def export_tasks(
+    export_format: str = Query("ndjson", alias="format"),
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    status: Optional[List[str]] = Query(None),
+    task_type: Optional[List[str]] = Query(None),
+    priority: Optional[List[str]] = Query(None),
+    text: Optional[str] = None,
+    current_user: User = Depends(get_current_active_user)
+):
+    """Stream the current user's tasks with their full status history as NDJSON or CSV
+
+    Accepts the same date and task filters as custom reports.
+    """
+    if export_format not in ("ndjson", "csv"):
+        raise HTTPException(status_code=400, detail="format must be 'ndjson' or 'csv'")
+    task_filters = {
+        key: value for key, value in
+        (("status", status), ("task_type", task_type), ("priority", priority), ("text", text))
+        if value is not None
+    }
+    try:
+        filters = compile_custom_report_filters(
+            {"start_date": start_date, "end_date": end_date, "task_filters": task_filters}
+        )
+    except TaskFilterError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    records = _export_records(current_user.id, filters)
+    if export_format == "csv":
+        return StreamingResponse(_csv_lines(records), media_type="text/csv",
+                                 headers={"Content-Disposition": 'attachment; filename="tasks.csv"'})
+    return StreamingResponse(_ndjson_lines(records), media_type="application/x-ndjson",
+                             headers={"Content-Disposition": 'attachment; filename="tasks.ndjson"'})
+
 @router.post("/student", response_model=Task)
 def create_student_task(task_create: StudentTaskCreate, db: Session = Depends(get_db), current_user: User = Depends(get_current_active_user)):
     # Create the base task
@@ -55,7 +148,8 @@ def create_student_task(task_create: StudentTaskCreate, db: Session = Depends(ge
         def dict(self):
             return task_data
     
-    created_task = task.create(db, obj_in=TaskDataObject())
+    # Committed together with the subtype, history and rollup rows below
+    created_task = task.create(db, obj_in=TaskDataObject(), commit=False)
     
     # Create student task
     if not task_create.subject or not task_create.deadline:
@@ -77,6 +171,9 @@ def create_student_task(task_create: StudentTaskCreate, db: Session = Depends(ge
     status_history = Task_Status_History(**status_history_data)
     db.add(status_history)
     
+    # Count the new task in the daily rollup
+    user_daily_stats.apply_change(db, None, user_daily_stats.contribution(db, created_task))
+    
     # Commit all changes
     db.commit()
     db.refresh(created_task)
@@ -104,7 +201,8 @@ def create_business_task(task_create: BusinessTaskCreate, db: Session = Depends(
         def dict(self):
             return task_data
     
-    created_task = task.create(db, obj_in=TaskDataObject())
+    # Committed together with the subtype, history and rollup rows below
+    created_task = task.create(db, obj_in=TaskDataObject(), commit=False)
     
     # Create business task
     if not task_create.project_name or not task_create.due_date:
@@ -127,6 +225,9 @@ def create_business_task(task_create: BusinessTaskCreate, db: Session = Depends(
     status_history = Task_Status_History(**status_history_data)
     db.add(status_history)
     
+    # Count the new task in the daily rollup
+    user_daily_stats.apply_change(db, None, user_daily_stats.contribution(db, created_task))
+    
     # Commit all changes
     db.commit()
     db.refresh(created_task)
@@ -154,7 +255,8 @@ def create_employment_task(task_create: EmploymentTaskCreate, db: Session = Depe
         def dict(self):
             return task_data
     
-    created_task = task.create(db, obj_in=TaskDataObject())
+    # Committed together with the subtype, history and rollup rows below
+    created_task = task.create(db, obj_in=TaskDataObject(), commit=False)
     
     # Create employment task
     if not task_create.company or not task_create.position or not task_create.deadline:
@@ -177,6 +279,9 @@ def create_employment_task(task_create: EmploymentTaskCreate, db: Session = Depe
     status_history = Task_Status_History(**status_history_data)
     db.add(status_history)
     
+    # Count the new task in the daily rollup
+    user_daily_stats.apply_change(db, None, user_daily_stats.contribution(db, created_task))
+    
     # Commit all changes
     db.commit()
     db.refresh(created_task)
@@ -204,7 +309,8 @@ def create_certification_task(task_create: CertificationTaskCreate, db: Session
         def dict(self):
             return task_data
     
-    created_task = task.create(db, obj_in=TaskDataObject())
+    # Committed together with the subtype, history and rollup rows below
+    created_task = task.create(db, obj_in=TaskDataObject(), commit=False)
     
     # Create certification task
     if not task_create.certification_name or not task_create.issuer:
@@ -227,6 +333,9 @@ def create_certification_task(task_create: CertificationTaskCreate, db: Session
     status_history = Task_Status_History(**status_history_data)
     db.add(status_history)
     
+    # Count the new task in the daily rollup
+    user_daily_stats.apply_change(db, None, user_daily_stats.contribution(db, created_task))
+    
     # Commit all changes
     db.commit()
     db.refresh(created_task)
@@ -270,12 +379,18 @@ def update_task(task_id: int, task_update: TaskUpdate, db: Session = Depends(get
     class UpdateDataObject:
         def dict(self, exclude_unset=True):
             return update_data
-        
+    
+    rollup_before = user_daily_stats.contribution(db, db_task)
     updated_task = task.update(
         db, 
         db_obj=db_task, 
-        obj_in=UpdateDataObject()
+        obj_in=UpdateDataObject(),
+        commit=False
     )
+    # The task and its rollup change are committed together
+    user_daily_stats.apply_change(db, rollup_before, user_daily_stats.contribution(db, updated_task))
+    db.commit()
+    db.refresh(updated_task)
     return Task(
         id=updated_task.id,
         title=updated_task.title,
@@ -289,5 +404,6 @@ def delete_task(task_id: int, db: Session = Depends(get_db)):
     db_task = task.get(db, id=task_id)
     if db_task is None:
         raise HTTPException(status_code=404, detail="Task not found")
+    user_daily_stats.apply_change(db, user_daily_stats.contribution(db, db_task), None)
     task.remove(db, id=task_id)
     return {"message": "Task deleted successfully"}
\ No newline at end of file
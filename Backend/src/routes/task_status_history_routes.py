@@ -4,6 +4,7 @@ from typing import List
 
 from database import get_db
 from models.model.task_status_history import task_status_history
+from models.model.user_daily_stats import user_daily_stats
 from schemas.task_status_history import TaskStatusHistory, TaskStatusHistoryCreate, TaskStatusHistoryUpdate
 from models.model.auth import get_current_active_user
 from models.db_schemes.schemes.task_status_history import Task_Status_History
@@ -37,6 +38,7 @@ def create_task_status_history(history_create: TaskStatusHistoryCreate, db: Sess
     db_task = task.get(db, id=history_create.task_id)
     if db_task is None:
         raise HTTPException(status_code=404, detail="Task not found")
+    rollup_before = user_daily_stats.contribution(db, db_task)
     
     # Update the task status if provided
     if history_create.status:
@@ -48,11 +50,12 @@ def create_task_status_history(history_create: TaskStatusHistoryCreate, db: Sess
             def dict(self, exclude_unset=True):
                 return {"status": history_create.status}
         
-        task_crud.update(db, db_obj=db_task, obj_in=TaskUpdateObject())
+        task_crud.update(db, db_obj=db_task, obj_in=TaskUpdateObject(), commit=False)
     
     # Create the history entry
     db_history = Task_Status_History(**history_create.dict())
     db.add(db_history)
+    user_daily_stats.apply_change(db, rollup_before, user_daily_stats.contribution(db, db_task))
     db.commit()
     db.refresh(db_history)
     
@@ -71,10 +74,12 @@ def update_task_status_history(history_id: int, history_update: TaskStatusHistor
     if db_history is None:
         raise HTTPException(status_code=404, detail="Task status history entry not found")
     
+    from models.model.task import task
+    db_task = task.get(db, id=db_history.task_id)
+    rollup_before = user_daily_stats.contribution(db, db_task)
+    
     # Update the task status if provided
     if history_update.status:
-        from models.model.task import task
-        db_task = task.get(db, id=db_history.task_id)
         if db_task:
             from models.model.base import CRUDBase
             from models.db_schemes.schemes.task import Task as TaskModel
@@ -84,13 +89,14 @@ def update_task_status_history(history_id: int, history_update: TaskStatusHistor
                 def dict(self, exclude_unset=True):
                     return {"status": history_update.status}
             
-            task_crud.update(db, db_obj=db_task, obj_in=TaskUpdateObject())
+            task_crud.update(db, db_obj=db_task, obj_in=TaskUpdateObject(), commit=False)
     
     # Update fields that are provided
     update_data = history_update.dict(exclude_unset=True)
     for field, value in update_data.items():
         setattr(db_history, field, value)
     
+    user_daily_stats.apply_change(db, rollup_before, user_daily_stats.contribution(db, db_task))
     db.commit()
     db.refresh(db_history)
     
@@ -109,7 +115,12 @@ def delete_task_status_history(history_id: int, db: Session = Depends(get_db)):
     if db_history is None:
         raise HTTPException(status_code=404, detail="Task status history entry not found")
     
+    from models.model.task import task
+    db_task = task.get(db, id=db_history.task_id)
+    rollup_before = user_daily_stats.contribution(db, db_task)
+    
     db.delete(db_history)
+    user_daily_stats.apply_change(db, rollup_before, user_daily_stats.contribution(db, db_task))
     db.commit()
     
     return {"message": "Task status history entry deleted successfully"}
\ No newline at end of file
@@ -0,0 +1,59 @@
+"""
+Tests for the access and validation rules of the team report route
+"""
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from agents.mcp_client import MCPClient
+from agents.report_agent import ReportAgent
+from models.db_schemes.schemes.user import User
+from models.enums.user_role import UserRole
+from models.model.auth import get_current_active_user
+from routes.ai_report_routes import router, get_mcp_client
+
+
+def seed_users(db):
+    admin = User(name="Admin", email="admin@example.com", role=UserRole.ADMIN)
+    employee = User(name="Employee", email="employee@example.com", role=UserRole.EMPLOYEE)
+    db.add_all([admin, employee])
+    return {UserRole.ADMIN: admin, UserRole.EMPLOYEE: employee}
+
+
+def make_client(database, role: UserRole) -> TestClient:
+    current_user = database.seed(seed_users)[role]
+    session_factory = database.session_factory
+
+    async def mcp_client():
+        async with session_factory() as db:
+            yield MCPClient(db, session_factory=session_factory)
+
+    app = FastAPI()
+    app.include_router(router)
+    app.state.report_agent = ReportAgent()
+    app.state.report_agent.llm_provider = None
+    app.dependency_overrides[get_current_active_user] = lambda: current_user
+    app.dependency_overrides[get_mcp_client] = mcp_client
+    return TestClient(app)
+
+
+def test_team_reports_are_for_admins_only(database):
+    client = make_client(database, UserRole.EMPLOYEE)
+
+    response = client.post("/ai-reports/team", json={})
+    assert response.status_code == 403
+
+
+def test_team_report_rejects_unknown_roles_and_periods(database):
+    client = make_client(database, UserRole.ADMIN)
+
+    assert client.post("/ai-reports/team", json={"role": "manager"}).status_code == 400
+    assert client.post("/ai-reports/team", json={"period": "yearly"}).status_code == 400
+
+
+def test_team_report_accepts_role_names_and_values(database):
+    client = make_client(database, UserRole.ADMIN)
+
+    response = client.post("/ai-reports/team", json={"period": "Monthly", "role": "employee"})
+    assert response.status_code == 200
+    assert response.json()["report_type"] == "Team"
+    assert response.json()["details"]["parameters"] == {"period": "monthly", "role": "Employee", "user_ids": None}
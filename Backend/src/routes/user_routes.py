@@ -1,9 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 
 from database import get_db
 from models.model.user import user, CRUDUser
+from models.model.pagination import InvalidCursorError
 from schemas.user import User, UserCreate, UserUpdate
 from models.model.auth import get_current_active_user  # Fixed import
 
@@ -14,8 +15,16 @@ router = APIRouter(
 )
 
 @router.get("/", response_model=List[User])
-def read_users(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    users = user.get_multi(db, skip=skip, limit=limit)
+def read_users(response: Response, skip: int = 0, limit: int = 100, cursor: Optional[str] = None,
+               db: Session = Depends(get_db)):
+    # Pass the X-Next-Cursor header back as ?cursor= to get the next page
+    try:
+        users = user.get_multi(db, skip=skip, limit=limit, cursor=cursor)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    next_cursor = user.next_cursor(users, limit)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
 
     return [
         User(
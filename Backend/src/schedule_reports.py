@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Generate reports for every active user, e.g. from cron
+
+Usage:
+    python schedule_reports.py daily [--date YYYY-MM-DD]    Run (or resume) today's daily reports
+    python schedule_reports.py weekly,monthly               Run several report types side by side
+
+Pacing, batch size and concurrency come from the report_schedule_* settings.
+Runs are checkpointed in report_schedule_runs, so running the command again
+after a crash resumes where it stopped, and a finished run is not repeated.
+Reports are built from the current data, so --date must fall in the current
+period of every report type.
+"""
+import argparse
+import asyncio
+import json
+import sys
+import os
+from datetime import date
+
+# Add the current directory to the Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from config import settings
+from database import AsyncSessionLocal
+from llm.LLMConcurrency import configure_llm_limiter
+from agents.doc_writer_agent import DocWriterAgent
+from agents.report_agent import ReportAgent
+from agents.report_scheduler import ReportScheduler, check_run_day, parse_report_types
+
+
+async def run(report_types, day) -> int:
+    limiter = configure_llm_limiter(settings.llm_max_concurrency, settings.llm_timeout_seconds)
+    scheduler = ReportScheduler(
+        AsyncSessionLocal, ReportAgent(doc_writer=DocWriterAgent(output_dir="reports")),
+        batch_size=settings.report_schedule_batch_size,
+        concurrency=settings.report_schedule_concurrency,
+        llm_calls_per_minute=settings.report_schedule_llm_calls_per_minute,
+        window_seconds=settings.report_schedule_window_minutes * 60,
+        generate_documents=settings.report_schedule_generate_documents,
+        retry_attempts=settings.report_schedule_retry_attempts,
+        retry_delay_seconds=settings.report_schedule_retry_delay_seconds,
+        use_rollups=settings.stats_use_rollups
+    )
+    try:
+        runs = await asyncio.gather(*(scheduler.run(report_type, day) for report_type in report_types))
+    finally:
+        limiter.shutdown()
+    for summary in runs:
+        print(json.dumps(summary))
+    return 0 if all(summary["status"] == "Succeeded" for summary in runs) else 1
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Generate reports for every active user")
+    parser.add_argument("report_types", help="comma-separated: daily, weekly, monthly")
+    parser.add_argument("--date", type=date.fromisoformat, default=None,
+                        help="day of the run, in the current period (default today, UTC)")
+    args = parser.parse_args()
+
+    try:
+        report_types = parse_report_types(args.report_types)
+        if args.date is not None:
+            for report_type in report_types:
+                check_run_day(report_type, args.date)
+    except ValueError as e:
+        parser.error(str(e))
+    return asyncio.run(run(report_types, args.date))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,19 @@
+"""
+Tests that the report and listing hot queries are served by indexes
+"""
+from sqlalchemy import create_engine
+
+from explain_queries import explain_all, is_full_scan
+from models.db_schemes.schemes.base import Base
+
+
+def test_hot_queries_use_indexes():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+
+    with engine.connect() as connection:
+        plans = explain_all(connection, user_id=1, task_id=1)
+
+    assert len(plans) == 11
+    full_scans = [name for name, plan in plans if any(is_full_scan(line) for line in plan)]
+    assert full_scans == []
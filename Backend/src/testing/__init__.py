@@ -0,0 +1,3 @@
+"""
+Helpers shared by the test modules: the SQLite test database and stub LLM providers
+"""
@@ -0,0 +1,46 @@
+"""
+SQLite database for tests of the async data access code
+"""
+from pathlib import Path
+from typing import Any, Callable, TypeVar
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import NullPool
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+
+from models.db_schemes.schemes.base import Base
+
+T = TypeVar("T")
+
+
+class SQLiteDatabase:
+    """A SQLite file with every table, written with sync sessions and read with async ones"""
+
+    def __init__(self, path: Path):
+        """
+        Args:
+            path (Path): Database file; created with the full schema
+        """
+        self.url = f"sqlite:///{path}"
+        self.engine = create_engine(self.url)
+        Base.metadata.create_all(self.engine)
+        # NullPool: each async session gets its own connection, as sessions from a server pool would
+        self.async_engine = create_async_engine(self.url.replace("sqlite://", "sqlite+aiosqlite://"),
+                                                poolclass=NullPool)
+        self.session_factory = sessionmaker(self.async_engine, class_=AsyncSession, expire_on_commit=False)
+        self._sync_sessions = sessionmaker(bind=self.engine, expire_on_commit=False)
+
+    def session(self) -> Session:
+        """A sync session; the caller closes it"""
+        return self._sync_sessions()
+
+    def seed(self, seed: Callable[[Session], T]) -> T:
+        """Run seed on a sync session, commit, and return what it returned"""
+        with self.session() as db:
+            result = seed(db)
+            db.commit()
+            return result
+
+    def dispose(self):
+        self.engine.dispose()
@@ -0,0 +1,50 @@
+"""
+Stub LLM providers for report tests
+"""
+from llm.LLMInterface import LLMInterface
+
+SUMMARY = "Executive Summary: steady progress."
+
+
+class ChunkedProvider(LLMInterface):
+    """Returns a fixed summary, streamed in three chunks"""
+
+    def __init__(self, fail_after: int = None):
+        """
+        Args:
+            fail_after (int): Raise instead of streaming this chunk; None streams them all
+        """
+        self.fail_after = fail_after
+
+    def set_generation_model(self, model_id: str):
+        pass
+
+    def generate_text(self, prompt: str, chat_history: list = None,
+                      max_output_tokens: int = None, temperature: float = None):
+        return SUMMARY
+
+    def stream_text(self, prompt: str, chat_history: list = None,
+                    max_output_tokens: int = None, temperature: float = None):
+        for i, chunk in enumerate(["Executive Summary:", " steady", " progress."]):
+            if self.fail_after is not None and i == self.fail_after:
+                raise RuntimeError("connection reset")
+            yield chunk
+
+    def construct_prompt(self, prompt: str, role: str):
+        return {"role": role, "text": prompt}
+
+
+class CountingProvider(ChunkedProvider):
+    """Counts the summaries it generates, and optionally fails every one"""
+
+    def __init__(self, fail: bool = False):
+        super().__init__()
+        self.fail = fail
+        self.calls = 0
+
+    def generate_text(self, prompt: str, chat_history: list = None,
+                      max_output_tokens: int = None, temperature: float = None):
+        self.calls += 1
+        if self.fail:
+            raise RuntimeError("quota exceeded")
+        return super().generate_text(prompt)